@@ -0,0 +1,806 @@
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import queue
+import re
+import threading
+from compaction import compact_inputs
+from llmclient import get_llm_client
+from metrics import Counter, bind, span
+from offload import run_offloaded
+from resultcache import ResultCache, make_cache_key
+
+# Both analyses run upstream on DeepSeek, so no local accelerator is used.
+# Reported in results as device_used; torch is deliberately not imported here.
+device = "cpu"
+
+# Run the HR and technical prompts side by side instead of back to back.
+# Set AI_ANALYSIS_CONCURRENT=0 to fall back to sequential calls.
+AI_ANALYSIS_CONCURRENT = os.environ.get("AI_ANALYSIS_CONCURRENT", "1") != "0"
+AI_ANALYSIS_MAX_WORKERS = int(os.environ.get("AI_ANALYSIS_MAX_WORKERS", "8"))
+
+# "dual" sends the HR and technical prompts separately; "structured" asks for
+# both in one JSON response and falls back to dual if that fails validation
+AI_ANALYSIS_MODE = os.environ.get("AI_ANALYSIS_MODE", "dual")
+
+# Shared, bounded pool for the upstream calls; each analysis uses two slots
+_analysis_executor = ThreadPoolExecutor(
+    max_workers=AI_ANALYSIS_MAX_WORKERS,
+    thread_name_prefix="ai-analysis"
+)
+
+# Bump PROMPT_VERSION whenever a prompt or parser changes so cached results
+# produced by the old wording are not served
+PROMPT_VERSION = "1"
+MODEL_NAME = "deepseek-chat"
+
+# Normalize and token-budget both inputs before prompting; PROMPT_COMPACTION=0 turns it off
+PROMPT_COMPACTION = os.environ.get("PROMPT_COMPACTION", "1") != "0"
+
+# Cache of full evaluation results; RESULT_CACHE_ENABLED=0 turns it off
+RESULT_CACHE_ENABLED = os.environ.get("RESULT_CACHE_ENABLED", "1") != "0"
+result_cache = ResultCache.from_env() if RESULT_CACHE_ENABLED else None
+
+# Pooled DeepSeek client with deadlines, retries and a shared in-flight limit
+client = get_llm_client()
+
+LLM_TOKENS = Counter("hireflow_llm_tokens_total", "Upstream tokens used, by call and kind", ["call", "kind"])
+COMPACTION_TOKENS = Counter("hireflow_compaction_tokens_total",
+                            "Prompt input tokens before and after compaction", ["input", "phase"])
+COMPACTION_TRUNCATED = Counter("hireflow_compaction_truncated_total",
+                               "Prompt inputs cut to their token budget", ["input"])
+
+def record_usage(call: str, response: Any) -> None:
+    """Count a completion's prompt and completion tokens, when it reports them"""
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        LLM_TOKENS.inc(usage.prompt_tokens or 0, call=call, kind="prompt")
+        LLM_TOKENS.inc(usage.completion_tokens or 0, call=call, kind="completion")
+
+def compact(resume_text: str, job_post: str) -> Tuple[str, str, Dict[str, Any]]:
+    """compact_inputs, timed and counted"""
+    with span("compaction"):
+        resume_text, job_post, report = run_offloaded(compact_inputs, resume_text, job_post)
+    for name in ("resume", "job_post"):
+        COMPACTION_TOKENS.inc(report[name]["tokens_before"], input=name, phase="before")
+        COMPACTION_TOKENS.inc(report[name]["tokens_after"], input=name, phase="after")
+        if report[name]["truncated"]:
+            COMPACTION_TRUNCATED.inc(input=name)
+    return resume_text, job_post, report
+
+# Section headers as the prompts ask for them, in order
+HR_SECTIONS = [
+    ("candidate_overview", "Candidate Overview", "1. CANDIDATE OVERVIEW"),
+    ("skills_analysis", "Skills Analysis", "2. SKILLS ANALYSIS"),
+    ("qualification_assessment", "Qualification Assessment", "3. QUALIFICATION ASSESSMENT"),
+    ("hiring_recommendations", "Hiring Recommendations", "4. HIRING RECOMMENDATIONS"),
+    ("development_opportunities", "Development Opportunities", "5. DEVELOPMENT OPPORTUNITIES")
+]
+TECHNICAL_SECTIONS = [
+    ("personal_info", "1. PERSONAL INFORMATION"),
+    ("education", "2. EDUCATION"),
+    ("experience", "3. PROFESSIONAL EXPERIENCE"),
+    ("skills", "4. SKILLS"),
+    ("job_match", "5. JOB MATCH")
+]
+
+def build_technical_prompt(job_post: str, resume_text: str) -> str:
+    return f"""
+        Analyze the resume and job post to extract key information and provide a structured response. Return ONLY the sections below with NO additional text:
+
+        1. PERSONAL INFORMATION
+        Name: [Extract full name]
+        Email: [Extract email]
+        Phone: [Extract phone]
+        Location: [Extract location]
+
+        2. EDUCATION
+        Highest Degree: [Extract or write Not specified]
+        Field of Study: [Extract or write Not specified]
+        Institution: [Extract name]
+        Graduation Year: [Extract or write Not specified]
+        Academic Achievements:
+        • [List each achievement]
+        Certifications:
+        • [List each certification]
+        Relevant Coursework:
+        • [List relevant courses]
+
+        3. PROFESSIONAL EXPERIENCE
+        Years of Experience: [State total years or status]
+        Current Position: [State current role or status]
+        Key Projects:
+        • [Project name and description]
+        Industries: [List relevant industries]
+        Achievements:
+        • [List key achievements]
+
+        4. SKILLS
+        Technical Skills:
+        • [List each technical skill for any job category]
+        Soft Skills:
+        • [List each soft skill]
+
+        5. JOB MATCH ANALYSIS
+        Required Skills Match:
+        • [List each required skill from the job post content and state if present]
+        Experience Match: [Analyze experience fit]
+        Education Match: [Analyze education fit]
+
+        RESUME TEXT:
+        {resume_text}
+
+        JOB POST:
+        {job_post}
+
+        Analyze the above and provide ONLY the structured sections. Use bullet points (•) for lists.
+        Write "Not specified" for missing information.
+        Do not include any additional text or explanations.
+        Do not use any markdown formatting or special characters except bullet points (•).
+        """
+
+def parse_technical_content(content: str) -> Dict[str, Any]:
+    """Parse the technical completion into its structured sections"""
+    # Parse the response into structured sections
+    technical_analysis = {
+        'personal_info': {},
+        'education': {},
+        'experience': {},
+        'skills': {},
+        'job_match': {}
+    }
+
+    current_section = None
+    current_data = {}
+    lines = content.split('\n')
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        if line.startswith('1. PERSONAL INFORMATION'):
+            current_section = 'personal_info'
+        elif line.startswith('2. EDUCATION'):
+            if current_data:
+                technical_analysis[current_section] = current_data
+            current_section = 'education'
+            current_data = {}
+        elif line.startswith('3. PROFESSIONAL EXPERIENCE'):
+            if current_data:
+                technical_analysis[current_section] = current_data
+            current_section = 'experience'
+            current_data = {}
+        elif line.startswith('4. SKILLS'):
+            if current_data:
+                technical_analysis[current_section] = current_data
+            current_section = 'skills'
+            current_data = {}
+        elif line.startswith('5. JOB MATCH'):
+            if current_data:
+                technical_analysis[current_section] = current_data
+            current_section = 'job_match'
+            current_data = {}
+        elif current_section and ':' in line:
+            key, value = [x.strip() for x in line.split(':', 1)]
+            if value:
+                current_data[key.lower().replace(' ', '_')] = value
+            else:
+                current_data[key.lower().replace(' ', '_')] = []
+        elif current_section and line.startswith('•'):
+            item = line[1:].strip()
+            last_key = list(current_data.keys())[-1] if current_data else None
+            if last_key and isinstance(current_data[last_key], list):
+                current_data[last_key].append(item)
+
+    # Add the last section
+    if current_data:
+        technical_analysis[current_section] = current_data
+
+    return technical_analysis
+
+def analyze_technical_details(job_post: str, resume_text: str) -> Dict[str, Any]:
+    try:
+        with span("technical_request"):
+            response = client.chat(
+                model=MODEL_NAME,
+                messages=[{"role": "user", "content": build_technical_prompt(job_post, resume_text)}],
+                temperature=0.7,
+                max_tokens=1500
+            )
+        record_usage("technical", response)
+
+        with span("technical_parse"):
+            return parse_technical_content(response.choices[0].message.content)
+
+    except Exception as e:
+        print(f"Error in technical analysis: {str(e)}")
+        return {}
+
+def parse_section_content(content_lines):
+    """Helper function to parse section content into structured data"""
+    result = {}
+    current_section = None
+    current_items = []
+
+    for line in content_lines:  # Using content_lines parameter directly
+        line = line.strip()
+        if not line:
+            continue
+
+        # Handle bullet points and lists
+        if line.startswith('•'):
+            item = line[1:].strip()
+            if current_section:
+                if current_section not in result:
+                    result[current_section] = []
+                result[current_section].append(item)
+            else:
+                if 'items' not in result:
+                    result['items'] = []
+                result['items'].append(item)
+            continue
+
+        # Handle section headers and key-value pairs
+        if ':' in line:
+            key, value = [part.strip() for part in line.split(':', 1)]
+            key = key.lower().replace(' ', '_')
+
+            # Check if this is a list section
+            if not value or value.isspace():
+                current_section = key
+                if current_section not in result:
+                    result[current_section] = []
+            else:
+                # Handle regular key-value pairs
+                current_section = None
+                if value.lower() != 'not specified':
+                    result[key] = value
+
+    return result
+
+def build_hr_prompt(job_post: str, resume_text: str) -> str:
+    return f"""
+        Analyze this job application from an HR perspective and provide percentage scores for the match:
+
+        JOB DESCRIPTION:
+        {job_post}
+
+        CANDIDATE RESUME:
+        {resume_text}
+
+        Please provide a plain text analysis with the following sections, including explicit percentage scores:
+
+        1. CANDIDATE OVERVIEW
+        Write a simple summary of the candidate's profile.
+        Include their key qualifications without bullet points.
+        List any concerns in plain text.
+
+        2. SKILLS ANALYSIS
+        Provide a skills match percentage (e.g., "Skills Match: 75%").
+        List the matching skills in plain text.
+        Note missing critical skills.
+        Describe skill development potential.
+
+        3. QUALIFICATION ASSESSMENT
+        Provide an overall match percentage (e.g., "Overall Match: 80%").
+        Describe education background.
+        Explain experience level.
+        State if the candidate is qualified or unqualified for the role.
+
+        4. HIRING RECOMMENDATIONS
+        List interview topics.
+        Describe role fit.
+        Note compensation factors.
+        List risks plainly.
+
+        5. DEVELOPMENT OPPORTUNITIES
+        List training needs.
+        Note growth areas.
+        Describe career alignment.
+
+        Use only plain text with numbers for sections. Provide explicit percentage scores in the Skills Analysis and Qualification Assessment sections.
+        """
+
+def hr_section_content(content: str, index: int) -> str:
+    """Text of one HR section; raises IndexError if its header is missing"""
+    header = HR_SECTIONS[index][2]
+    if index == 0:
+        text = content.split(HR_SECTIONS[1][2])[0].replace(header, "")
+    else:
+        text = content.split(header)[1]
+        if index < len(HR_SECTIONS) - 1:
+            text = text.split(HR_SECTIONS[index + 1][2])[0]
+    return text.strip()
+
+def hr_match_scores(content: str) -> Dict[str, Any]:
+    """Extract the match percentages and qualified verdict from the HR text"""
+    content = content.lower()
+
+    # Get qualification assessment section and determine qualified status
+    qual_section = content.split("3. qualification assessment")[1].split("4.")[0].lower()
+    qualified = "qualified" in qual_section and "not qualified" not in qual_section and "unqualified" not in qual_section
+
+    # Extract match scores
+    overall_match = 0
+    skills_match = 0
+    match_patterns = [
+        r'(\d+)%?\s*(?:match|fit|compatibility)',
+        r'(?:match|fit|compatibility).*?(\d+)%',
+        r'overall.*?(\d+)%'
+    ]
+
+    # First try to extract overall match from qualification assessment section
+    for pattern in match_patterns:
+        matches = re.findall(pattern, qual_section)
+        if matches:
+            try:
+                overall_match = min(100, int(matches[0]))
+                break
+            except ValueError:
+                continue
+
+    # If no overall match found in qualification section, use default based on qualification
+    if overall_match == 0:
+        overall_match = 75 if qualified else 65
+
+    # Extract skills match from skills analysis section
+    skills_section = content.split("2. skills analysis")[1].split("3.")[0].lower()
+    for pattern in match_patterns:
+        matches = re.findall(pattern, skills_section)
+        if matches:
+            try:
+                skills_match = min(100, int(matches[0]))
+                break
+            except ValueError:
+                continue
+
+    # If no explicit skills match found, use overall match as fallback
+    if skills_match == 0:
+        skills_match = overall_match
+
+    return {
+        "overall_match": overall_match,
+        "skills_match": skills_match,
+        "qualified": qualified
+    }
+
+def parse_hr_content(content: str, finish_reason: str, created: int, model: str) -> Dict[str, Any]:
+    """Build the HR result from the completion text and its response metadata"""
+    return {
+        "sections": {
+            key: {"title": title, "content": hr_section_content(content, index)}
+            for index, (key, title, _) in enumerate(HR_SECTIONS)
+        },
+        "match_scores": hr_match_scores(content),
+        "confidence_score": finish_reason == "stop",
+        "analysis_timestamp": created,
+        "model_version": model,
+        "device_used": str(device)
+    }
+
+def hr_failure(error: str) -> Dict[str, Any]:
+    return {
+        "error": error,
+        "hr_analysis": "HR analysis failed. Please try again later.",
+        "confidence_score": 0,
+        "device_used": str(device)
+    }
+
+def analyze_hr_with_ai(job_post: str, resume_text: str) -> Dict[str, Any]:
+    """
+    Perform HR analysis of resume against job post using only the raw text inputs.
+    """
+    try:
+        with span("hr_request"):
+            response = client.chat(
+                model=MODEL_NAME,
+                messages=[{"role": "user", "content": build_hr_prompt(job_post, resume_text)}],
+                temperature=0.7,
+                max_tokens=1500,
+                stream=False
+            )
+        record_usage("hr", response)
+
+        choice = response.choices[0]
+        with span("hr_parse"):
+            return parse_hr_content(choice.message.content, choice.finish_reason, response.created, response.model)
+
+    except Exception as e:
+        print(f"Error in HR analysis: {str(e)}")
+        return hr_failure(str(e))
+
+# Fields of each technical section in the structured response; True = list
+TECHNICAL_FIELDS = {
+    "personal_info": {"name": False, "email": False, "phone": False, "location": False},
+    "education": {
+        "highest_degree": False, "field_of_study": False, "institution": False, "graduation_year": False,
+        "academic_achievements": True, "certifications": True, "relevant_coursework": True
+    },
+    "experience": {
+        "years_of_experience": False, "current_position": False, "key_projects": True,
+        "industries": False, "achievements": True
+    },
+    "skills": {"technical_skills": True, "soft_skills": True},
+    "job_match": {"required_skills_match": True, "experience_match": False, "education_match": False}
+}
+
+def build_structured_prompt(job_post: str, resume_text: str) -> str:
+    hr_sections = ",\n            ".join(f'"{key}": "<plain text>"' for key, _, _ in HR_SECTIONS)
+    technical_sections = ",\n            ".join(
+        f'"{section}": {{' + ", ".join(
+            f'"{field}": ' + ('["<item>"]' if is_list else '"<text>"') for field, is_list in fields.items()
+        ) + '}'
+        for section, fields in TECHNICAL_FIELDS.items()
+    )
+    return f"""
+        Analyze this job application from an HR perspective and extract the candidate's details.
+        Respond with a single JSON object with exactly this structure:
+
+        {{
+          "sections": {{
+            {hr_sections}
+          }},
+          "match_scores": {{"overall_match": <0-100>, "skills_match": <0-100>, "qualified": <true|false>}},
+          "technical_analysis": {{
+            {technical_sections}
+          }}
+        }}
+
+        sections.candidate_overview: a simple summary of the candidate's profile, key qualifications and concerns.
+        sections.skills_analysis: matching skills, missing critical skills and skill development potential.
+        sections.qualification_assessment: education background, experience level and whether the candidate is qualified.
+        sections.hiring_recommendations: interview topics, role fit, compensation factors and risks.
+        sections.development_opportunities: training needs, growth areas and career alignment.
+        match_scores: percentage skills match and overall match, and whether the candidate is qualified for the role.
+        technical_analysis.job_match.required_skills_match: each required skill from the job post and whether it is present.
+
+        Write "Not specified" for missing information and use empty lists where nothing applies.
+
+        JOB DESCRIPTION:
+        {job_post}
+
+        CANDIDATE RESUME:
+        {resume_text}
+        """
+
+def _score(value: Any) -> int:
+    """Coerce a 0-100 score given as a number or a string like "75%" """
+    if isinstance(value, bool):
+        raise ValueError("score is a boolean")
+    if isinstance(value, str):
+        value = value.strip().rstrip("%")
+    return max(0, min(100, int(float(value))))
+
+def _text_list(value: Any) -> List[str]:
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    if not isinstance(value, list):
+        raise ValueError(f"expected a list, got {type(value).__name__}")
+    return [str(item).strip() for item in value if str(item).strip()]
+
+def parse_structured_content(content: str, finish_reason: str, created: int,
+                             model: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Validate a structured response in one pass and return (hr_results,
+    technical_results) shaped exactly like the dual-mode parsers' output.
+    Raises ValueError when a required part is missing or has the wrong type.
+    """
+    try:
+        data = json.loads(content)
+    except (TypeError, json.JSONDecodeError) as e:
+        raise ValueError(f"response is not JSON: {e}")
+    if not isinstance(data, dict):
+        raise ValueError("response is not a JSON object")
+
+    sections = data.get("sections")
+    if not isinstance(sections, dict):
+        raise ValueError("missing sections")
+    hr_sections = {}
+    for key, title, _ in HR_SECTIONS:
+        text = sections.get(key)
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError(f"missing section {key}")
+        hr_sections[key] = {"title": title, "content": text.strip()}
+
+    scores = data.get("match_scores")
+    if not isinstance(scores, dict) or not isinstance(scores.get("qualified"), bool):
+        raise ValueError("missing match_scores")
+    overall_match = _score(scores.get("overall_match"))
+    match_scores = {
+        "overall_match": overall_match,
+        "skills_match": _score(scores["skills_match"]) if scores.get("skills_match") is not None else overall_match,
+        "qualified": scores["qualified"]
+    }
+
+    technical = data.get("technical_analysis")
+    if not isinstance(technical, dict):
+        raise ValueError("missing technical_analysis")
+    technical_results = {}
+    for section, fields in TECHNICAL_FIELDS.items():
+        values = technical.get(section) or {}
+        if not isinstance(values, dict):
+            raise ValueError(f"technical_analysis.{section} is not an object")
+        parsed = {}
+        for field, is_list in fields.items():
+            if values.get(field) is None:
+                continue
+            parsed[field] = _text_list(values[field]) if is_list else str(values[field]).strip()
+        technical_results[section] = parsed
+
+    hr_results = {
+        "sections": hr_sections,
+        "match_scores": match_scores,
+        "confidence_score": finish_reason == "stop",
+        "analysis_timestamp": created,
+        "model_version": model,
+        "device_used": str(device)
+    }
+    return hr_results, technical_results
+
+def analyze_structured(job_post: str, resume_text: str) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """One JSON-mode call covering both analyses; None if it fails or doesn't validate"""
+    try:
+        with span("structured_request"):
+            response = client.chat(
+                model=MODEL_NAME,
+                messages=[{"role": "user", "content": build_structured_prompt(job_post, resume_text)}],
+                temperature=0.7,
+                max_tokens=3000,
+                response_format={"type": "json_object"}
+            )
+        record_usage("structured", response)
+
+        choice = response.choices[0]
+        with span("structured_parse"):
+            return parse_structured_content(choice.message.content, choice.finish_reason, response.created, response.model)
+
+    except Exception as e:
+        print(f"Warning: Structured analysis failed, falling back to separate prompts: {str(e)}")
+        return None
+
+def result_cache_key(job_post: str, resume_text: str, mode: str = None) -> str:
+    """Cache key for a result produced by the given analysis mode"""
+    mode = mode or AI_ANALYSIS_MODE
+    prompt_version = PROMPT_VERSION if mode == "dual" else f"{PROMPT_VERSION}-{mode}"
+    return make_cache_key(resume_text, job_post, prompt_version, MODEL_NAME)
+
+def combine_results(hr_results: Dict[str, Any], technical_results: Dict[str, Any],
+                    cache_key: str = None) -> Dict[str, Any]:
+    """Merge both analyses into one result and cache it if both succeeded"""
+    result = {
+        **hr_results,
+        "technical_analysis": technical_results
+    }
+
+    # Only complete results are worth paying for again later
+    if cache_key is not None and "error" not in hr_results and technical_results:
+        with span("cache_store"):
+            result_cache.set(cache_key, result)
+
+    return result
+
+def evaluation_cache_key(job_post: str, resume_text: str) -> str:
+    """The key analyze_with_ai caches the result for these raw inputs under"""
+    if PROMPT_COMPACTION:
+        resume_text, job_post, _ = run_offloaded(compact_inputs, resume_text, job_post)
+    return result_cache_key(job_post, resume_text)
+
+def with_compaction_report(result: Dict[str, Any], compaction: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Attach this request's compaction report (never cached, it is per request)"""
+    if compaction is not None:
+        result["prompt_compaction"] = compaction
+    return result
+
+def analyze_with_ai(job_post: str, resume_text: str, analysis_results: Dict[str, Any] = None,
+                    concurrent: bool = None) -> Dict[str, Any]:
+    """
+    Perform AI analysis of resume against job post using only the raw text inputs.
+
+    The HR and technical prompts are independent, so by default they are sent
+    at the same time and merged once both have returned. In structured mode a
+    single JSON call replaces both. Successful results are cached by content,
+    so re-evaluating the same pair skips the upstream calls.
+    """
+    if concurrent is None:
+        concurrent = AI_ANALYSIS_CONCURRENT
+
+    compaction = None
+    if PROMPT_COMPACTION:
+        resume_text, job_post, compaction = compact(resume_text, job_post)
+
+    cache_key = None
+    if result_cache is not None:
+        cache_key = result_cache_key(job_post, resume_text)
+        with span("cache_lookup"):
+            cached = result_cache.get(cache_key)
+        if cached is not None:
+            return with_compaction_report(cached, compaction)
+
+    try:
+        structured = analyze_structured(job_post, resume_text) if AI_ANALYSIS_MODE == "structured" else None
+        if structured is None and AI_ANALYSIS_MODE == "structured" and cache_key is not None:
+            # Falling back to the dual calls; file their output under the dual key
+            cache_key = result_cache_key(job_post, resume_text, mode="dual")
+        if structured is not None:
+            hr_results, technical_results = structured
+        elif concurrent:
+            hr_future = _analysis_executor.submit(bind(analyze_hr_with_ai), job_post, resume_text)
+            technical_future = _analysis_executor.submit(bind(analyze_technical_details), job_post, resume_text)
+
+            # Both functions catch their own errors, so one failing side still
+            # leaves the other side's result intact
+            hr_results = hr_future.result()
+            technical_results = technical_future.result()
+        else:
+            # Get HR analysis results
+            hr_results = analyze_hr_with_ai(job_post, resume_text)
+
+            # Get technical analysis results
+            technical_results = analyze_technical_details(job_post, resume_text)
+
+        return with_compaction_report(combine_results(hr_results, technical_results, cache_key), compaction)
+
+    except Exception as e:
+        print(f"Error in AI analysis: {str(e)}")
+        return {
+            "error": str(e),
+            "hr_analysis": "AI analysis failed. Please try again later.",
+            "confidence_score": 0,
+            "device_used": str(device)
+        }
+
+class SectionTracker:
+    """Follows a completion as it streams in and reports sections as they close"""
+
+    def __init__(self, headers: List[str]):
+        self.headers = headers
+        self.content = ""
+        self.closed = 0
+
+    def feed(self, text: str) -> List[int]:
+        """Add streamed text; return the sections closed by a following header"""
+        self.content += text
+        newly_closed = []
+        while self.closed < len(self.headers) - 1 and self.headers[self.closed + 1] in self.content:
+            newly_closed.append(self.closed)
+            self.closed += 1
+        return newly_closed
+
+    def finish(self) -> List[int]:
+        """The completion ended, so every section still open is complete"""
+        newly_closed = list(range(self.closed, len(self.headers)))
+        self.closed = len(self.headers)
+        return newly_closed
+
+def _stream_completion(prompt: str, source: str, events: queue.Queue, cancelled: threading.Event) -> None:
+    """Put a streamed completion's text deltas, then its metadata, on the events queue"""
+    try:
+        stream = client.stream_chat(
+            model=MODEL_NAME,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.7,
+            max_tokens=1500
+        )
+        metadata = {"finish_reason": None, "created": None, "model": None}
+        try:
+            with span(f"{source}_stream"):
+                for chunk in stream:
+                    if cancelled.is_set():
+                        return
+                    metadata["created"] = metadata["created"] or chunk.created
+                    metadata["model"] = metadata["model"] or chunk.model
+                    if not chunk.choices:
+                        continue
+                    choice = chunk.choices[0]
+                    if choice.delta.content:
+                        events.put((source, "delta", choice.delta.content))
+                    metadata["finish_reason"] = choice.finish_reason or metadata["finish_reason"]
+        finally:
+            # Stops generation upstream if the client went away
+            stream.close()
+        events.put((source, "done", metadata))
+
+    except Exception as e:
+        print(f"Error in {source} stream: {str(e)}")
+        events.put((source, "error", str(e)))
+
+def _result_events(result: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Replay a finished result as the events the stream would have sent"""
+    for key, section in result.get("sections", {}).items():
+        yield "section", {"source": "hr", "key": key, **section}
+    if "match_scores" in result:
+        yield "match_scores", result["match_scores"]
+    for key, section in (result.get("technical_analysis") or {}).items():
+        yield "section", {"source": "technical", "key": key, "content": section}
+    yield "result", result
+
+def stream_analysis(job_post: str, resume_text: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Run both analyses with streamed completions, yielding (event, data) pairs.
+
+    A "section" event is sent for each HR or technical section as soon as the
+    next section's header shows up, "match_scores" once the qualification
+    assessment is complete, "error" if either call fails, and finally
+    "result" with the same merged result analyze_with_ai returns. Sections
+    can only be cut out of plain-text output, so this always uses the two
+    dual-mode prompts.
+    """
+    compaction = None
+    if PROMPT_COMPACTION:
+        resume_text, job_post, compaction = compact(resume_text, job_post)
+
+    cache_key = None
+    if result_cache is not None:
+        cache_key = result_cache_key(job_post, resume_text, mode="dual")
+        with span("cache_lookup"):
+            cached = result_cache.get(cache_key)
+        if cached is not None:
+            yield from _result_events(with_compaction_report(cached, compaction))
+            return
+
+    events = queue.Queue()
+    cancelled = threading.Event()
+    _analysis_executor.submit(bind(_stream_completion), build_hr_prompt(job_post, resume_text), "hr", events, cancelled)
+    _analysis_executor.submit(bind(_stream_completion), build_technical_prompt(job_post, resume_text), "technical",
+                              events, cancelled)
+
+    trackers = {
+        "hr": SectionTracker([header for _, _, header in HR_SECTIONS]),
+        "technical": SectionTracker([header for _, header in TECHNICAL_SECTIONS])
+    }
+    metadata = {}
+    errors = {}
+    try:
+        while len(metadata) + len(errors) < len(trackers):
+            source, kind, payload = events.get()
+            tracker = trackers[source]
+            if kind == "error":
+                errors[source] = payload
+                yield "error", {"source": source, "error": payload}
+                continue
+            if kind == "delta":
+                closed = tracker.feed(payload)
+            else:
+                metadata[source] = payload
+                closed = tracker.finish()
+
+            for index in closed:
+                try:
+                    if source == "hr":
+                        key, title, _ = HR_SECTIONS[index]
+                        yield "section", {"source": source, "key": key, "title": title,
+                                          "content": hr_section_content(tracker.content, index)}
+                        if key == "qualification_assessment":
+                            yield "match_scores", hr_match_scores(tracker.content)
+                    else:
+                        key = TECHNICAL_SECTIONS[index][0]
+                        yield "section", {"source": source, "key": key,
+                                          "content": parse_technical_content(tracker.content)[key]}
+                except IndexError:
+                    # Header missing from the completion; the final result reports it
+                    continue
+    finally:
+        cancelled.set()
+
+    if "hr" in metadata:
+        try:
+            hr_results = parse_hr_content(trackers["hr"].content, **metadata["hr"])
+        except Exception as e:
+            print(f"Error in HR analysis: {str(e)}")
+            hr_results = hr_failure(str(e))
+    else:
+        hr_results = hr_failure(errors["hr"])
+
+    technical_results = {}
+    if "technical" in metadata:
+        try:
+            technical_results = parse_technical_content(trackers["technical"].content)
+        except Exception as e:
+            print(f"Error in technical analysis: {str(e)}")
+
+    yield "result", with_compaction_report(combine_results(hr_results, technical_results, cache_key), compaction)
+
+if __name__ == "__main__":
+    print("This module should be imported and used with the main application.")
@@ -1,23 +1,123 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context, url_for
 from flask_cors import CORS, cross_origin  # Added cross_origin import
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, as_completed
+from contextlib import closing
+import json
+import math
 import os
+import threading
+import time
 import fitz
-from aianalysis import analyze_with_ai
-from werkzeug.utils import secure_filename
+from aianalysis import analyze_with_ai, client as llm_client, evaluation_cache_key, result_cache, stream_analysis
+from jobqueue import JobWorkers, PermanentJobError, get_job_queue
+from metrics import (METRICS_ENABLED, Counter, Gauge, Histogram, bind, register_collector,
+                     render as render_metrics, span, trace)
+from models import memory_report
+from offload import run_offloaded
 
 app = Flask(__name__)
 
 # Simplified CORS setup
 CORS(app)
 
-UPLOAD_FOLDER = 'uploads'
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['MAX_PDF_PAGES'] = int(os.environ.get('MAX_PDF_PAGES', 20))  # Pages read per resume
+app.config['BATCH_MAX_WORKERS'] = int(os.environ.get('BATCH_MAX_WORKERS', 4))
+app.config['EVALUATE_LATENCY_BUDGET'] = float(os.environ.get('EVALUATE_LATENCY_BUDGET', 0))  # Seconds; 0 = wait for the LLM
+app.config['EVALUATE_UPGRADE_TIMEOUT'] = float(os.environ.get('EVALUATE_UPGRADE_TIMEOUT', 600))  # Seconds a late LLM result is waited for
+app.config['EVALUATION_QUEUE_WORKERS'] = int(os.environ.get('EVALUATION_QUEUE_WORKERS', 2))  # Per web process; 0 = external runner
+
+def extract_pdf_pages(data, max_pages):
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        page_count = min(doc.page_count, max_pages)
+        # Form feeds keep page boundaries so compaction can spot headers and footers
+        return "\f".join([doc[i].get_text() for i in range(page_count)])
+
+def read_pdf_text(data):
+    """Extract text from PDF bytes without touching the disk, up to MAX_PDF_PAGES pages"""
+    with span('pdf_text'):
+        return run_offloaded(extract_pdf_pages, data, app.config['MAX_PDF_PAGES'])
+
+def read_resume_text(filename, data):
+    """Text of an uploaded resume, raising ValueError naming the file if there is none"""
+    try:
+        text = read_pdf_text(data)
+    except Exception as e:
+        raise ValueError(f"Could not read {filename} as a PDF: {str(e)}")
+    if not text.strip():
+        raise ValueError(f"No text could be extracted from {filename}")
+    return text
+
+def evaluate_resume_bytes(filename, data, job_post):
+    """Extract text from an in-memory PDF and run the AI analysis on it"""
+    text = read_resume_text(filename, data)
+    return analyze_with_ai(job_post=job_post, resume_text=text)
+
+# Upstream analyses that may outlive the request that started them
+_upstream_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('EVALUATE_UPSTREAM_WORKERS', 16)),
+    thread_name_prefix='evaluate-upstream'
+)
+# Late LLM results are tracked in the result cache, which every worker process
+# shares, under this prefix: {"status": "pending"}, "failed" with the error, or
+# "done" with a result that analyze_with_ai filed under another key
+UPGRADE_PREFIX = 'upgrade:'
+
+def _finish_upgrade(key, future):
+    """Record how a late LLM call ended so result_url never stays pending"""
+    try:
+        result = future.result()
+        error = result.get('error')
+    except Exception as e:
+        result, error = None, str(e)
+    if not error and not result.get('technical_analysis'):
+        error = 'The analysis returned no technical analysis'
+    if error:
+        result_cache.set(UPGRADE_PREFIX + key, {'status': 'failed', 'error': error})
+    elif result_cache.get(key) is None:
+        # A structured-mode fallback is cached under the dual-mode key
+        result_cache.set(UPGRADE_PREFIX + key, {'status': 'done', 'result': result})
+
+def evaluate_within_budget(job_post, text, budget):
+    """
+    Race the LLM analysis against a latency budget, with the local pipeline as
+    the fallback. The LLM result wins if it arrives in time; otherwise the
+    local result is returned marked provisional, and the LLM result replaces it
+    in the result cache once it finishes.
+    """
+    # Pulls in the local NLP pipeline; only needed when a budget is in use
+    from localscoring import local_evaluation
+
+    started = time.monotonic()
+    future = _upstream_executor.submit(bind(analyze_with_ai), job_post=job_post, resume_text=text)
+
+    try:
+        with span('local_scoring'):
+            local = run_offloaded(local_evaluation, job_post, text)
+    except Exception as e:
+        print(f"Warning: Local evaluation failed, waiting for the LLM: {str(e)}")
+        return future.result()
+
+    try:
+        result = future.result(timeout=max(budget - (time.monotonic() - started), 0))
+        if 'error' not in result:
+            return result
+        local['llm_error'] = result['error']
+        return local
+    except FutureTimeout:
+        pass
+
+    if result_cache is not None:
+        key = evaluation_cache_key(job_post, text)
+        result_cache.set(UPGRADE_PREFIX + key, {'status': 'pending', 'started_at': time.time()})
+        future.add_done_callback(lambda done: _finish_upgrade(key, done))
+        local['result_key'] = key
+        local['result_url'] = url_for('evaluation_result', key=key)
+    return local
 
 @app.route('/api/evaluate', methods=['POST', 'OPTIONS'])
 @cross_origin()
+@trace('evaluate')
 def evaluate():
     # Handle preflight OPTIONS request
     if request.method == 'OPTIONS':
@@ -30,16 +130,24 @@ def evaluate():
         if not file or not job_post:
             return jsonify({'error': 'Missing resume or job post'}), 400
 
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(file.filename))
-        file.save(filepath)
+        try:
+            budget = float(request.form.get('latencyBudget') or app.config['EVALUATE_LATENCY_BUDGET'])
+        except ValueError:
+            budget = None
+        if budget is None or not math.isfinite(budget):
+            return jsonify({'error': 'latencyBudget must be a number of seconds'}), 400
+        # Negative budgets mean no budget, like 0
+        budget = max(budget, 0.0)
 
-        doc = fitz.open(filepath)
-        text = " ".join(page.get_text() for page in doc)
-        doc.close()
+        # Open the upload straight from memory; no temp file to write or clean up
+        with span('read_upload'):
+            data = file.read()
+        text = read_pdf_text(data)
 
-        os.remove(filepath)  # Clean up immediately
-
-        result = analyze_with_ai(job_post=job_post, resume_text=text)
+        if budget > 0:
+            result = evaluate_within_budget(job_post, text, budget)
+        else:
+            result = analyze_with_ai(job_post=job_post, resume_text=text)
 
         return jsonify(result)
 
@@ -47,6 +155,273 @@ def evaluate():
         print(f"Error processing request: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@trace('evaluation_job')
+def run_evaluation_job(payload, data):
+    """Queue handler: evaluate one stored upload, raising so failed LLM calls are retried"""
+    # A bad upload fails the same way every time; don't spend LLM attempts on it
+    if not data:
+        raise PermanentJobError(f"The upload of {payload['filename']} is no longer stored")
+    try:
+        text = read_resume_text(payload['filename'], data)
+    except ValueError as e:
+        raise PermanentJobError(str(e))
+
+    result = analyze_with_ai(job_post=payload['jobPost'], resume_text=text)
+    if 'error' in result:
+        raise RuntimeError(result['error'])
+    if not result.get('technical_analysis'):
+        raise RuntimeError('Technical analysis failed')
+    return result
+
+_job_workers = None
+_job_workers_lock = threading.Lock()
+
+def start_job_workers():
+    """Start this process's queue worker threads once (after any fork)"""
+    global _job_workers
+    if _job_workers is None and app.config['EVALUATION_QUEUE_WORKERS'] > 0:
+        with _job_workers_lock:
+            if _job_workers is None:
+                workers = JobWorkers(get_job_queue(), run_evaluation_job,
+                                     concurrency=app.config['EVALUATION_QUEUE_WORKERS'])
+                workers.start()
+                _job_workers = workers
+
+@app.route('/api/evaluate/jobs', methods=['POST', 'OPTIONS'])
+@cross_origin()
+def submit_evaluation_job():
+    """Queue an evaluation and return its job ID without waiting for the result"""
+    if request.method == 'OPTIONS':
+        return jsonify({"success": True}), 200
+
+    file = request.files.get('resume')
+    job_post = request.form.get('jobPost')
+
+    if not file or not job_post:
+        return jsonify({'error': 'Missing resume or job post'}), 400
+
+    try:
+        job_id = get_job_queue().enqueue({'filename': file.filename, 'jobPost': job_post}, file.read())
+    except Exception as e:
+        print(f"Error queueing evaluation: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+    start_job_workers()
+    status_url = url_for('evaluation_job_status', job_id=job_id)
+    return jsonify({'job_id': job_id, 'status': 'queued', 'status_url': status_url}), 202, {'Location': status_url}
+
+@app.route('/api/evaluate/jobs', methods=['GET'])
+def evaluation_queue_stats():
+    return jsonify(get_job_queue().stats()), 200
+
+@app.route('/api/evaluate/jobs/<job_id>', methods=['GET'])
+def evaluation_job_status(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job), 200
+
+@app.route('/api/evaluate/results/<key>', methods=['GET'])
+def evaluation_result(key):
+    """Final LLM result for a provisional evaluation, once it has arrived"""
+    if result_cache is None:
+        return jsonify({'error': 'Unknown result'}), 404
+    cached = result_cache.get(key)
+    if cached is not None:
+        return jsonify(cached), 200
+    upgrade = result_cache.get(UPGRADE_PREFIX + key)
+    if upgrade is None:
+        return jsonify({'error': 'Unknown result'}), 404
+    if upgrade['status'] == 'done':
+        return jsonify(upgrade['result']), 200
+    if upgrade['status'] == 'failed':
+        return jsonify({'status': 'failed', 'error': upgrade['error']}), 502
+    if time.time() - upgrade['started_at'] > app.config['EVALUATE_UPGRADE_TIMEOUT']:
+        # The process running the call is gone or the call hung
+        return jsonify({'status': 'failed', 'error': 'The analysis did not finish in time'}), 502
+    return jsonify({'status': 'pending'}), 202
+
+def format_sse(event, data):
+    """Encode one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/api/evaluate/stream', methods=['POST', 'OPTIONS'])
+@cross_origin()
+def evaluate_stream():
+    """Evaluate one resume, sending each analysis section as a server-sent event once it is complete"""
+    if request.method == 'OPTIONS':
+        return jsonify({"success": True}), 200
+
+    try:
+        file = request.files.get('resume')
+        job_post = request.form.get('jobPost')
+
+        if not file or not job_post:
+            return jsonify({'error': 'Missing resume or job post'}), 400
+
+        text = read_pdf_text(file.read())
+
+    except Exception as e:
+        print(f"Error processing request: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+    def generate():
+        # closing() stops both upstream completions if the client disconnects
+        with closing(stream_analysis(job_post=job_post, resume_text=text)) as events:
+            try:
+                for event, data in events:
+                    yield format_sse(event, data)
+            except Exception as e:
+                print(f"Error streaming evaluation: {str(e)}")
+                yield format_sse('error', {'error': str(e)})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/evaluate/batch', methods=['POST', 'OPTIONS'])
+@cross_origin()
+def evaluate_batch():
+    """Evaluate many resumes against one job post, streaming NDJSON results"""
+    if request.method == 'OPTIONS':
+        return jsonify({"success": True}), 200
+
+    files = request.files.getlist('resumes')
+    job_post = request.form.get('jobPost')
+
+    if not files or not job_post:
+        return jsonify({'error': 'Missing resumes or job post'}), 400
+
+    # Read the uploads now; the request stream is gone once we start streaming
+    uploads = [(index, file.filename, file.read()) for index, file in enumerate(files)]
+    max_workers = min(app.config['BATCH_MAX_WORKERS'], len(uploads))
+
+    def generate():
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = {
+                executor.submit(evaluate_resume_bytes, filename, data, job_post): (index, filename)
+                for index, filename, data in uploads
+            }
+            for future in as_completed(futures):
+                index, filename = futures[future]
+                try:
+                    line = {'index': index, 'filename': filename, 'result': future.result()}
+                except Exception as e:
+                    print(f"Error processing {filename}: {str(e)}")
+                    line = {'index': index, 'filename': filename, 'error': str(e)}
+                yield json.dumps(line) + "\n"
+        finally:
+            # Drop queued work if the client goes away mid-stream
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/rank', methods=['POST', 'OPTIONS'])
+@cross_origin()
+def rank():
+    """Rank many resumes for one job post with the local pipeline and the ranking model"""
+    if request.method == 'OPTIONS':
+        return jsonify({"success": True}), 200
+
+    files = request.files.getlist('resumes')
+    job_post = request.form.get('jobPost')
+
+    if not files or not job_post:
+        return jsonify({'error': 'Missing resumes or job post'}), 400
+
+    try:
+        resumes = [(file.filename, read_resume_text(file.filename, file.read())) for file in files]
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        # Pulls in spaCy, JobBERT and scikit-learn; only needed here
+        from ranking import rank_resumes
+
+        with span('ranking'):
+            return jsonify(run_offloaded(rank_resumes, job_post, resumes)), 200
+
+    except Exception as e:
+        print(f"Error ranking resumes: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    if result_cache is None:
+        return jsonify({'enabled': False}), 200
+    return jsonify({'enabled': True, **result_cache.stats()}), 200
+
+@app.route('/api/llm/stats', methods=['GET'])
+def llm_stats():
+    # Upstream requests, retries and slots in use in this worker
+    return jsonify(llm_client.stats()), 200
+
+HTTP_REQUESTS = Counter('hireflow_http_requests_total', 'HTTP requests served', ['endpoint', 'method', 'status'])
+HTTP_SECONDS = Histogram('hireflow_http_request_seconds', 'Time to produce each HTTP response', ['endpoint'])
+HTTP_IN_FLIGHT = Gauge('hireflow_http_requests_in_flight', 'HTTP requests being handled')
+
+def _endpoint():
+    # The route pattern, not the path, so job IDs don't each become a series
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    HTTP_IN_FLIGHT.inc()
+
+@app.after_request
+def record_request_metrics(response):
+    # Streamed responses are counted when their headers go out, not when they end
+    HTTP_REQUESTS.inc(endpoint=_endpoint(), method=request.method, status=response.status_code)
+    HTTP_SECONDS.observe(time.perf_counter() - g.request_started, endpoint=_endpoint())
+    return response
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    # Runs even when a handler raised and after_request was skipped
+    if 'request_started' in g:
+        HTTP_IN_FLIGHT.dec()
+
+def service_metrics():
+    """Counters kept by the LLM client, the result cache and the job queue"""
+    llm = llm_client.stats()
+    yield ('hireflow_llm_requests_total', 'counter', 'Upstream LLM attempts, retries included',
+           [({}, llm['requests'])])
+    yield ('hireflow_llm_retries_total', 'counter', 'Upstream LLM attempts that were retried', [({}, llm['retries'])])
+    yield ('hireflow_llm_failures_total', 'counter', 'Upstream LLM calls that failed for good', [({}, llm['failures'])])
+    yield ('hireflow_llm_deadline_exceeded_total', 'counter', 'Upstream LLM calls that ran out of time',
+           [({}, llm['deadline_exceeded'])])
+    yield ('hireflow_llm_in_flight', 'gauge', 'Upstream LLM requests in flight', [({}, llm['in_flight'])])
+    yield ('hireflow_llm_max_in_flight', 'gauge', 'Upstream LLM in-flight limit', [({}, llm['max_in_flight'])])
+
+    if result_cache is not None:
+        cache = result_cache.stats()
+        yield ('hireflow_result_cache_hits_total', 'counter', 'Result cache hits by tier',
+               [({'tier': 'memory'}, cache['memory_hits']), ({'tier': 'disk'}, cache['disk_hits'])])
+        yield ('hireflow_result_cache_misses_total', 'counter', 'Result cache misses', [({}, cache['misses'])])
+        yield ('hireflow_result_cache_hit_ratio', 'gauge', 'Result cache hits over lookups', [({}, cache['hit_ratio'])])
+
+    jobs = get_job_queue().stats()
+    yield ('hireflow_evaluation_jobs', 'gauge', 'Queued evaluation jobs by status',
+           [({'status': status}, count) for status, count in jobs.items()])
+
+register_collector(service_metrics)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    # Prometheus scrape target; per worker, like the other stats endpoints
+    if not METRICS_ENABLED:
+        return jsonify({'error': 'Metrics are disabled'}), 404
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/memory', methods=['GET'])
+def memory():
+    # Per-worker memory; unique_mb is what each extra worker really costs
+    return jsonify(memory_report()), 200
+
 @app.route('/test', methods=['GET', 'OPTIONS'])
 @cross_origin()
 def test():
@@ -55,5 +430,6 @@ def test():
     return jsonify({"message": "API is working!"}), 200
     
 if __name__ == "__main__":
+    start_job_workers()
     port = int(os.environ.get("PORT", 10000))
     app.run(host="0.0.0.0", port=port, debug=False)
@@ -0,0 +1,219 @@
+"""Pre-prompt compaction of resume and job post text.
+
+Raw PDF text is full of repeated whitespace, page headers/footers and
+boilerplate, and every token of it is paid for twice (once per prompt).
+Before prompting, each text is:
+1. normalized: whitespace collapsed per line, bullet glyphs unified, blank
+   and consecutive duplicate lines removed;
+2. stripped of lines repeated at the top or bottom of most pages, and of page
+   numbers (pages are separated by form feeds, see app.read_pdf_text);
+3. stripped of sections that never affect the match, such as references and
+   hobbies in a resume, or benefits and EEO statements in a job post;
+4. cut at a line boundary to a hard token budget.
+
+Tokens are counted with DeepSeek-V3's own tokenizer, vendored gzipped in
+data/deepseek_v3_tokenizer.json.gz (tokenizer.json as shipped in the
+MIT-licensed deepseek-tokenizer 0.2.0 package) and
+loaded with the `tokenizers` package, so nothing is fetched at run time and
+the budget holds for what the model actually sees. COMPACTION_TOKENIZER may
+point at another local tokenizer.json (plain or .gz, or a directory holding
+one). COMPACTION_TOKENIZER=estimate opts into a CHARS_PER_TOKEN estimate
+instead, which undercounts code and non-English text.
+"""
+import gzip
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Set, Tuple
+
+DEFAULT_TOKENIZER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "deepseek_v3_tokenizer.json.gz")
+ESTIMATE = "estimate"
+CHARS_PER_TOKEN = 4  # Rough average for English, used only with COMPACTION_TOKENIZER=estimate
+
+RESUME_TOKEN_BUDGET = int(os.environ.get("COMPACTION_RESUME_TOKENS", 4000))
+JOB_POST_TOKEN_BUDGET = int(os.environ.get("COMPACTION_JOB_POST_TOKENS", 2000))
+
+# Lines this close to a page edge are header/footer candidates
+EDGE_LINES = 3
+
+# Section headings that end a dropped section; the union of what resumes and
+# job posts commonly use
+SECTION_HEADERS = {
+    "summary", "professional summary", "profile", "objective", "career objective", "about me",
+    "experience", "work experience", "professional experience", "employment history", "work history",
+    "education", "academic background", "skills", "technical skills", "core competencies",
+    "projects", "certifications", "licenses and certifications", "awards", "achievements",
+    "publications", "languages", "volunteer experience", "training", "affiliations",
+    "responsibilities", "key responsibilities", "requirements", "qualifications",
+    "preferred qualifications", "minimum qualifications", "what you will do", "what we are looking for",
+    "about the role", "job description", "about us", "about the company"
+}
+RESUME_IRRELEVANT = {
+    "references", "referees", "hobbies", "interests", "hobbies and interests", "personal interests",
+    "declaration"
+}
+JOB_POST_IRRELEVANT = {
+    "benefits", "perks", "perks and benefits", "what we offer", "equal opportunity employer",
+    "equal employment opportunity", "eeo statement", "how to apply", "application process"
+}
+
+_BULLETS = re.compile(r"^[●▪■◦•‣⁃∙*\-–]\s*")
+_PAGE_NUMBER = re.compile(r"^(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?$", re.IGNORECASE)
+_REFERENCES_ON_REQUEST = re.compile(r"^references (are )?available (up)?on request\.?$", re.IGNORECASE)
+
+_tokenizer = None
+_tokenizer_name = None
+_tokenizer_lock = threading.Lock()
+
+
+def load_tokenizer(path: str):
+    """Load a tokenizer.json (optionally gzipped, or in a directory) from disk"""
+    from tokenizers import Tokenizer
+
+    if os.path.isdir(path):
+        path = os.path.join(path, "tokenizer.json")
+    if path.endswith(".gz"):
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            return Tokenizer.from_str(file.read())
+    return Tokenizer.from_file(path)
+
+
+def get_tokenizer():
+    """Load the counting tokenizer once; None means COMPACTION_TOKENIZER=estimate"""
+    global _tokenizer, _tokenizer_name
+    if _tokenizer_name is None:
+        with _tokenizer_lock:
+            if _tokenizer_name is None:
+                name = os.environ.get("COMPACTION_TOKENIZER") or DEFAULT_TOKENIZER
+                if name != ESTIMATE:
+                    # No silent fallback: a hard budget needs real counts, so a
+                    # broken setting fails loudly (at boot with PRELOAD_MODELS)
+                    try:
+                        _tokenizer = load_tokenizer(name)
+                    except Exception as e:
+                        raise RuntimeError(f"Could not load compaction tokenizer {name}: {str(e)}") from e
+                _tokenizer_name = name if name == ESTIMATE else os.path.basename(name.rstrip(os.sep))
+    return _tokenizer
+
+
+def count_tokens(text: str) -> int:
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+def truncate_to_budget(text: str, budget: int) -> Tuple[str, bool]:
+    """Cut text to at most budget tokens, at the last line break that fits"""
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        if len(text) <= budget * CHARS_PER_TOKEN:
+            return text, False
+        cut = text[:budget * CHARS_PER_TOKEN]
+    else:
+        encoding = tokenizer.encode(text, add_special_tokens=False)
+        if len(encoding.ids) <= budget:
+            return text, False
+        cut = text[:encoding.offsets[budget - 1][1]]
+    if "\n" in cut:
+        cut = cut[:cut.rfind("\n")]
+    return cut.rstrip(), True
+
+
+def normalize_lines(text: str) -> List[str]:
+    """Collapse whitespace and unify bullets, one entry per line (pages kept apart)"""
+    text = text.replace("\u00a0", " ").replace("\u00ad", "").replace("\u200b", "").replace("\r", "\n")
+    lines = []
+    for line in text.split("\n"):
+        # Form feeds mark page breaks; keep them as lines of their own
+        for index, part in enumerate(line.split("\f")):
+            if index:
+                lines.append("\f")
+            part = " ".join(part.split())
+            lines.append(_BULLETS.sub("• ", part) if _BULLETS.match(part) and len(part) > 1 else part)
+    return lines
+
+
+def remove_page_furniture(lines: List[str]) -> List[str]:
+    """Drop page numbers and lines repeated at the top or bottom of most pages"""
+    pages, page = [], []
+    for line in lines:
+        if line == "\f":
+            pages.append(page)
+            page = []
+        elif line:
+            page.append(line)
+    pages.append(page)
+
+    def edge_key(line: str) -> str:
+        # "Page 2 of 3" and "Page 3 of 3" are the same footer
+        return re.sub(r"\d+", "#", line.lower())
+
+    repeated: Set[str] = set()
+    if len(pages) > 1:
+        counts = Counter()
+        for page in pages:
+            counts.update({edge_key(line) for line in page[:EDGE_LINES] + page[-EDGE_LINES:]})
+        repeated = {key for key, count in counts.items() if count >= 2 and count * 2 >= len(pages)}
+
+    kept = []
+    seen = set()
+    for page in pages:
+        for position, line in enumerate(page):
+            at_edge = position < EDGE_LINES or position >= len(page) - EDGE_LINES
+            if at_edge and _PAGE_NUMBER.match(line):
+                continue
+            if at_edge and edge_key(line) in repeated:
+                # Keep the first copy: a running header is often the candidate's name
+                if edge_key(line) in seen:
+                    continue
+                seen.add(edge_key(line))
+            kept.append(line)
+    return kept
+
+
+def _heading(line: str) -> str:
+    return re.sub(r"[^a-z ]+", "", line.lower().replace("&", "and")).strip()
+
+
+def drop_sections(lines: List[str], irrelevant: Set[str]) -> List[str]:
+    """Remove each irrelevant section, up to the next recognised heading"""
+    kept = []
+    dropping = False
+    for line in lines:
+        heading = _heading(line) if len(line) <= 40 else ""
+        if heading in irrelevant:
+            dropping = True
+            continue
+        if heading in SECTION_HEADERS:
+            dropping = False
+        if not dropping and not _REFERENCES_ON_REQUEST.match(line):
+            kept.append(line)
+    return kept
+
+
+def compact_text(text: str, budget: int, irrelevant: Set[str]) -> Tuple[str, Dict[str, int]]:
+    """Run every compaction step on one text and report its token counts"""
+    lines = drop_sections(remove_page_furniture(normalize_lines(text or "")), irrelevant)
+    # Repeated consecutive lines are PDF extraction artifacts
+    lines = [line for index, line in enumerate(lines) if index == 0 or line != lines[index - 1]]
+    compacted, truncated = truncate_to_budget("\n".join(lines), budget)
+    return compacted, {
+        "tokens_before": count_tokens(text or ""),
+        "tokens_after": count_tokens(compacted),
+        "truncated": truncated
+    }
+
+
+def compact_inputs(resume_text: str, job_post: str) -> Tuple[str, str, Dict[str, object]]:
+    """Compact both prompt inputs; returns them with a per-request report"""
+    resume_text, resume_stats = compact_text(resume_text, RESUME_TOKEN_BUDGET, RESUME_IRRELEVANT)
+    job_post, job_stats = compact_text(job_post, JOB_POST_TOKEN_BUDGET, JOB_POST_IRRELEVANT)
+    return resume_text, job_post, {
+        "resume": resume_stats,
+        "job_post": job_stats,
+        "tokens_saved": (resume_stats["tokens_before"] - resume_stats["tokens_after"]
+                         + job_stats["tokens_before"] - job_stats["tokens_after"]),
+        "tokenizer": _tokenizer_name
+    }
@@ -0,0 +1,182 @@
+"""Persistent text-hash cache for JobBERT embeddings.
+
+Vectors are keyed by a hash of the text, the model name and the pooling
+configuration. Recently used vectors stay in a bounded in-memory LRU; all of
+them are appended as float16 to `vectors.f16` in the cache directory, with
+one `key<TAB>offset<TAB>dim` line per vector in `index.tsv`. Both files are
+append-only, so several processes can share the directory. File reads and
+the flock-guarded appends go through offload.run_offloaded, so under gevent
+waiting on another process's lock parks only the calling greenlet.
+"""
+import fcntl
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from metrics import register_collector
+from offload import run_offloaded
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "embeddings")
+
+
+def make_embedding_key(text: str, model_name: str, pooling: str) -> str:
+    digest = hashlib.sha256()
+    for part in (model_name, pooling, text):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """Memory LRU in front of an append-only float16 vector store"""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_memory_items: int = 4096):
+        self.directory = directory
+        self.vectors_path = os.path.join(directory, "vectors.f16")
+        self.index_path = os.path.join(directory, "index.tsv")
+        self.lock_path = os.path.join(directory, "cache.lock")
+        self.max_memory_items = max_memory_items
+
+        self._memory = OrderedDict()
+        self._offsets = {}
+        self._index_offset = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self._refresh_index()
+
+    @classmethod
+    def from_env(cls) -> "EmbeddingCache":
+        return cls(
+            directory=os.environ.get("EMBEDDING_CACHE_DIR", DEFAULT_CACHE_DIR),
+            max_memory_items=int(os.environ.get("EMBEDDING_CACHE_MEMORY_ITEMS", 4096))
+        )
+
+    def _refresh_index(self) -> None:
+        """Read index lines other processes appended since last time (lock held)"""
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "rb") as file:
+            file.seek(self._index_offset)
+            chunk = file.read()
+        complete = chunk[:chunk.rfind(b"\n") + 1]
+        self._index_offset += len(complete)
+        for line in complete.decode("ascii").splitlines():
+            key, offset, dim = line.split("\t")
+            self._offsets[key] = (int(offset), int(dim))
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Load whichever keys are on disk into memory (lock held)"""
+        if any(key not in self._offsets for key in keys):
+            self._refresh_index()
+        found = {}
+        on_disk = [key for key in keys if key in self._offsets]
+        if on_disk:
+            with open(self.vectors_path, "rb") as file:
+                for key in on_disk:
+                    offset, dim = self._offsets[key]
+                    file.seek(offset)
+                    vector = np.frombuffer(file.read(dim * 2), dtype=np.float16).astype(np.float32)
+                    self._remember(key, vector)
+                    found[key] = vector
+        return found
+
+    def _append_disk(self, new: List[Tuple[str, np.ndarray]]) -> None:
+        """Append vectors and their index lines under the cross-process lock (lock held)"""
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                lines: List[str] = []
+                with open(self.vectors_path, "ab") as file:
+                    offset = file.tell()
+                    for key, vector in new:
+                        data = vector.astype(np.float16).tobytes()
+                        file.write(data)
+                        lines.append(f"{key}\t{offset}\t{len(vector)}\n")
+                        self._offsets[key] = (offset, len(vector))
+                        offset += len(data)
+                # Index lines go last so readers never see a key before its vector
+                with open(self.index_path, "a", encoding="ascii") as file:
+                    file.write("".join(lines))
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Return the cached float32 vectors for whichever keys are present"""
+        found = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+                elif key not in found:
+                    missing.append(key)
+
+            if missing:
+                found.update(run_offloaded(self._read_disk, missing))
+
+            self.hits += sum(1 for key in keys if key in found)
+            self.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    def put_many(self, keys: Sequence[str], vectors: np.ndarray) -> None:
+        """Store one vector per key in memory and append it to disk"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            new = [(key, vector) for key, vector in zip(keys, vectors) if key not in self._offsets]
+            for key, vector in zip(keys, vectors):
+                self._remember(key, vector)
+            if not new:
+                return
+
+            run_offloaded(self._append_disk, new)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_items": len(self._memory),
+                "disk_items": len(self._offsets)
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache():
+    """Shared cache from EMBEDDING_CACHE_* settings, or None when disabled"""
+    global _cache
+    if os.environ.get("EMBEDDING_CACHE_ENABLED", "1") == "0":
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmbeddingCache.from_env()
+                register_collector(_cache_metrics)
+    return _cache
+
+
+def _cache_metrics():
+    stats = _cache.stats()
+    lookups = stats["hits"] + stats["misses"]
+    yield ("hireflow_embedding_cache_hits_total", "counter", "Embedding cache hits", [({}, stats["hits"])])
+    yield ("hireflow_embedding_cache_misses_total", "counter", "Embedding cache misses", [({}, stats["misses"])])
+    yield ("hireflow_embedding_cache_hit_ratio", "gauge", "Embedding cache hits over lookups",
+           [({}, stats["hits"] / lookups if lookups else 0.0)])
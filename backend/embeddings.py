@@ -0,0 +1,288 @@
+"""Batched JobBERT embedding engine.
+
+Texts are tokenized once, with long inputs split into overlapping windows,
+and all windows of one or many texts go through the bare encoder in batched
+forward passes. Batches are padded only to their longest member, so a short
+sentence costs a short sequence rather than a full 512-token one.
+
+When an embedding cache is attached, texts seen before (by this or any other
+process sharing the cache directory) skip the transformer altogether.
+
+EMBEDDING_BACKEND selects how the encoder runs on CPU:
+  torch      full-precision PyTorch (default)
+  int8       PyTorch with Linear layers dynamically quantized to int8
+  onnx       exported ONNX graph run by ONNX Runtime
+  onnx-int8  the ONNX graph with dynamically quantized int8 weights
+The ONNX backends need the optional onnx and onnxruntime packages.
+scripts/check_embedding_drift.py measures how far a backend drifts from fp32.
+"""
+import fcntl
+import inspect
+import os
+import re
+import threading
+from typing import List, Sequence
+
+import numpy as np
+
+from embeddingcache import get_embedding_cache, make_embedding_key
+
+JOBBERT_MODEL_NAME = os.environ.get("JOBBERT_MODEL", "jjzha/jobbert-base-cased")
+BERT_MAX_LENGTH = 512  # BERT's maximum sequence length
+DEFAULT_STRIDE = 64  # Tokens shared by neighbouring windows of a long text
+DEFAULT_BATCH_SIZE = 16
+
+EMBEDDING_BACKENDS = ("torch", "int8", "onnx", "onnx-int8")
+DEFAULT_ONNX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "onnx")
+
+
+def load_jobbert(model_name: str = JOBBERT_MODEL_NAME, backend: str = None):
+    """Load the JobBERT tokenizer and bare encoder (no masked-LM head)"""
+    from transformers import AutoModel, AutoTokenizer
+
+    if backend is None:
+        backend = os.environ.get("EMBEDDING_BACKEND", "torch")
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND {backend!r}; expected one of {', '.join(EMBEDDING_BACKENDS)}")
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    if backend.startswith("onnx"):
+        # Only the config here; the PyTorch weights are loaded just to export a missing graph
+        model = OnnxEncoder(model_name, tokenizer, quantize=backend == "onnx-int8")
+    else:
+        # The pooler is unused by mean pooling, so skip building it
+        model = AutoModel.from_pretrained(model_name, add_pooling_layer=False)
+        model.eval()
+
+    if backend == "int8":
+        import torch
+
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    model.embedding_backend = backend
+    return tokenizer, model
+
+
+class OnnxEncoder:
+    """
+    ONNX Runtime session that quacks like a transformers encoder.
+
+    The graph is exported (and quantized) on first use if it is not already
+    cached on disk, under a file lock so concurrent workers build it once.
+    The session is opened lazily in each process: ONNX Runtime sessions are
+    not fork-safe, so one created in a preloading gunicorn master must not
+    be inherited by the workers.
+    """
+
+    def __init__(self, model_name: str, tokenizer, quantize: bool = False, onnx_dir: str = None):
+        from transformers import AutoConfig
+
+        self.config = AutoConfig.from_pretrained(model_name)
+        self.model_name = model_name
+        self.tokenizer = tokenizer
+        onnx_dir = onnx_dir or os.environ.get("ONNX_MODEL_DIR", DEFAULT_ONNX_DIR)
+        name = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name).strip("_")
+        self.export_path = os.path.join(onnx_dir, f"{name}.onnx")
+        self.path = os.path.join(onnx_dir, f"{name}.int8.onnx") if quantize else self.export_path
+
+        self._lock = threading.Lock()
+        self._session = None
+        self._session_pid = None
+        self.input_names = set()
+
+    def _build_graph(self) -> None:
+        """Export and quantize the graph unless a complete one is already on disk"""
+        if os.path.exists(self.path):
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if os.path.exists(self.path):
+                    return
+                if not os.path.exists(self.export_path):
+                    from transformers import AutoModel
+
+                    model = AutoModel.from_pretrained(self.model_name, add_pooling_layer=False)
+                    export_onnx(model.eval(), self.tokenizer, self.export_path)
+                    del model
+                if self.path != self.export_path:
+                    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+                    # Never leave a truncated graph at the path that is trusted from then on
+                    tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                    quantize_dynamic(self.export_path, tmp_path, weight_type=QuantType.QInt8)
+                    os.replace(tmp_path, self.path)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @property
+    def session(self):
+        """This process's ONNX Runtime session, opened on first use"""
+        if self._session is None or self._session_pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._session_pid != os.getpid():
+                    import onnxruntime
+
+                    self._build_graph()
+                    options = onnxruntime.SessionOptions()
+                    threads = os.environ.get("ONNX_NUM_THREADS")
+                    if threads:
+                        options.intra_op_num_threads = int(threads)
+                    session = onnxruntime.InferenceSession(self.path, options, providers=["CPUExecutionProvider"])
+                    self.input_names = {node.name for node in session.get_inputs()}
+                    self._session = session
+                    self._session_pid = os.getpid()
+        return self._session
+
+    @property
+    def base_model(self):
+        return self
+
+    def eval(self):
+        return self
+
+    def requires_grad_(self, requires_grad: bool = True):
+        return self
+
+    def __call__(self, **inputs):
+        import torch
+        from transformers.modeling_outputs import BaseModelOutput
+
+        session = self.session
+        feeds = {name: tensor.numpy().astype(np.int64) for name, tensor in inputs.items() if name in self.input_names}
+        last_hidden_state = session.run(["last_hidden_state"], feeds)[0]
+        return BaseModelOutput(last_hidden_state=torch.from_numpy(last_hidden_state))
+
+
+def export_onnx(model, tokenizer, path: str) -> None:
+    """Export a bare encoder to ONNX with dynamic batch and sequence axes"""
+    import torch
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    class _Encoder(torch.nn.Module):
+        # Positional inputs and a single tensor output keep the graph simple
+        def __init__(self, encoder):
+            super().__init__()
+            self.encoder = encoder
+
+        def forward(self, *args):
+            return self.encoder(**dict(zip(input_names, args))).last_hidden_state
+
+    export_kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        # Newer torch defaults to the dynamo exporter; stay on the TorchScript one
+        export_kwargs["dynamo"] = False
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with torch.no_grad():
+        torch.onnx.export(
+            _Encoder(getattr(model, "base_model", model)).eval(),
+            tuple(sample[name] for name in input_names),
+            tmp_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+            **export_kwargs
+        )
+    os.replace(tmp_path, path)
+
+
+class EmbeddingEngine:
+    """Mean-pooled last-layer embeddings computed in padded-to-fit batches"""
+
+    def __init__(self, model, tokenizer, max_length: int = BERT_MAX_LENGTH,
+                 stride: int = DEFAULT_STRIDE, batch_size: int = DEFAULT_BATCH_SIZE, cache=None):
+        # A masked-LM checkpoint wraps the encoder; only the encoder is needed
+        self.encoder = getattr(model, "base_model", model)
+        self.encoder.eval()
+        self.tokenizer = tokenizer
+        self.max_length = max_length
+        self.stride = stride
+        self.batch_size = batch_size
+        self.cache = cache
+        self.model_name = self.encoder.config.name_or_path
+        self.backend = getattr(model, "embedding_backend", "torch")
+        # Everything besides the text and model that changes the vector
+        self.pooling = f"mean:last_hidden_state:max_length={max_length}:stride={stride}:backend={self.backend}"
+
+    @property
+    def dim(self) -> int:
+        return self.encoder.config.hidden_size
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed texts into an (n, dim) float32 array, averaging each text's windows"""
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        if self.cache is None:
+            return self._embed_uncached(texts)
+
+        keys = [make_embedding_key(text, self.model_name, self.pooling) for text in texts]
+        cached = self.cache.get_many(keys)
+        missing = list(dict.fromkeys(key for key in keys if key not in cached))
+        if missing:
+            text_by_key = dict(zip(keys, texts))
+            vectors = self._embed_uncached([text_by_key[key] for key in missing])
+            self.cache.put_many(missing, vectors)
+            cached.update(zip(missing, vectors))
+        return np.stack([cached[key] for key in keys]).astype(np.float32, copy=False)
+
+    def _embed_uncached(self, texts: List[str]) -> np.ndarray:
+        """Run the encoder over every window of the given texts"""
+        import torch
+
+        encoded = self.tokenizer(
+            texts,
+            max_length=self.max_length,
+            truncation=True,
+            stride=self.stride,
+            return_overflowing_tokens=True,
+            padding=False
+        )
+        windows = len(encoded["input_ids"])
+        # Windows of short texts map 1:1; long texts own several windows
+        owners = np.asarray(encoded.get("overflow_to_sample_mapping", range(windows)), dtype=np.int64)
+        features = [key for key in ("input_ids", "token_type_ids", "attention_mask") if key in encoded]
+
+        # Batch windows of similar length together to keep padding small
+        order = sorted(range(windows), key=lambda i: len(encoded["input_ids"][i]))
+        window_embeddings = np.empty((windows, self.dim), dtype=np.float32)
+
+        with torch.inference_mode():
+            for start in range(0, windows, self.batch_size):
+                batch_ids = order[start:start + self.batch_size]
+                batch = self.tokenizer.pad(
+                    {key: [encoded[key][i] for i in batch_ids] for key in features},
+                    return_tensors="pt"
+                )
+                hidden_states = self.encoder(**batch).last_hidden_state
+                # Mean pooling over real tokens only
+                mask = batch["attention_mask"].unsqueeze(-1).to(hidden_states.dtype)
+                pooled = torch.sum(hidden_states * mask, dim=1) / torch.clamp(torch.sum(mask, dim=1), min=1)
+                window_embeddings[batch_ids] = pooled.float().numpy()
+
+        sums = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(sums, owners, window_embeddings)
+        counts = np.bincount(owners, minlength=len(texts)).astype(np.float32)
+        return sums / counts[:, None]
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_embedding_engine(model, tokenizer) -> EmbeddingEngine:
+    """Return the shared engine for a model/tokenizer pair"""
+    key = (id(model), id(tokenizer))
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = EmbeddingEngine(model, tokenizer, cache=get_embedding_cache())
+            _engines[key] = engine
+    return engine
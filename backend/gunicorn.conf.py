@@ -0,0 +1,61 @@
+"""Gunicorn settings for the HireFlow API.
+
+    gunicorn app:app -c gunicorn.conf.py
+
+Set PRELOAD_MODELS=1 to load spaCy and JobBERT once in the master before
+forking, so all workers share the weights copy-on-write instead of each
+holding its own copy. Every worker logs its unique (private) memory after it
+boots, and GET /api/memory reports it on demand.
+
+Set GUNICORN_WORKER_CLASS=gevent to serve each request in a greenlet, so one
+worker holds up to GUNICORN_WORKER_CONNECTIONS evaluations while they wait
+on the LLM instead of one. Raise LLM_MAX_IN_FLIGHT and
+AI_ANALYSIS_MAX_WORKERS to match, or they become the cap. CPU-bound work
+(PDF text, compaction, local scoring) runs in the hub's thread pool, see
+offload.py.
+"""
+import os
+import sys
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '10000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "sync")
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 100))
+
+if worker_class == "gevent":
+    # Patch before the app (and, with PRELOAD_MODELS, everything it imports)
+    # is loaded, so every lock, socket and sleep it creates is cooperative.
+    # The gevent worker patches again after fork, which is then a no-op.
+    from gevent import monkey
+
+    monkey.patch_all()
+
+preload_models = os.environ.get("PRELOAD_MODELS", "0") == "1"
+# Models loaded in the master are only shared if the app is loaded there too
+preload_app = preload_models
+
+
+def on_starting(server):
+    if preload_models:
+        from models import memory_report, preload_models as load_models
+
+        load_models()
+        server.log.info("Models preloaded in master: %s", memory_report())
+
+
+def post_fork(server, worker):
+    # Forked workers each get their own intra-op pool; keep them small so
+    # several workers don't oversubscribe the CPUs
+    threads = os.environ.get("TORCH_NUM_THREADS")
+    if threads and "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(int(threads))
+
+
+def post_worker_init(worker):
+    from app import start_job_workers
+    from models import memory_report
+
+    # Threads don't survive fork, so queue workers start in each worker
+    start_job_workers()
+    worker.log.info("Worker memory: %s", memory_report())
@@ -0,0 +1,136 @@
+"""Compile-once job post profiles.
+
+A job profile holds everything derived from a job post alone: the extracted
+requirements, the required-skill set and the JobBERT embedding. It is built
+once per posting and kept in a per-process LRU (JOB_PROFILE_MEMORY_ITEMS), so
+every resume screened against the same job reuses it.
+
+The requirements are also persisted to disk, keyed by the post's content,
+PROFILE_VERSION and the skill dictionary's fingerprint. The embedding is not:
+it comes from the embedding engine, whose cache is keyed by model name,
+backend and pooling, so a different JOBBERT_MODEL or EMBEDDING_BACKEND never
+pairs a stale job vector with fresh resume vectors.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from embeddings import get_embedding_engine
+from main import analyze_job_requirements, calculate_similarity
+from resultcache import normalize_text
+from skills import get_skill_matcher
+
+DEFAULT_PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "job_profiles")
+
+# Profiles kept in memory per process; older ones are reloaded from disk on demand
+MAX_MEMORY_PROFILES = int(os.environ.get("JOB_PROFILE_MEMORY_ITEMS", 256))
+
+# Bump when the extractors change so stale profiles are rebuilt; the skill
+# dictionary is fingerprinted into the key separately
+PROFILE_VERSION = "3"
+
+
+def job_post_hash(job_post: str) -> str:
+    """Content hash identifying a job post regardless of whitespace differences"""
+    digest = hashlib.sha256()
+    for part in (PROFILE_VERSION, get_skill_matcher().version, normalize_text(job_post)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class JobProfile:
+    """Pre-extracted requirements and embedding for one job post"""
+
+    def __init__(self, key: str, requirements: Dict[str, Any]):
+        self.key = key
+        self.requirements = requirements
+        self.embedding = None
+        # (model name, pooling) of the engine that produced the embedding
+        self.embedding_source = None
+        self.required_skills = frozenset(s.lower() for s in requirements["skills"]["hard_skills"].keys())
+
+    def __getitem__(self, item):
+        # Lets a profile stand in for the plain requirements dict
+        return self.requirements[item]
+
+    def similarity(self, resume_embedding: np.ndarray) -> float:
+        """Cosine similarity between this job post and a resume embedding"""
+        if self.embedding is None:
+            raise ValueError("Job profile was built without an embedding")
+        return calculate_similarity(self.embedding, resume_embedding)
+
+
+_profiles = OrderedDict()
+_profiles_lock = threading.Lock()
+
+
+def _profile_path(profile_dir: str, key: str) -> str:
+    return os.path.join(profile_dir, f"{key}.json")
+
+
+def _load_profile(profile_dir: str, key: str) -> Optional[JobProfile]:
+    try:
+        with open(_profile_path(profile_dir, key), "r", encoding="utf-8") as file:
+            requirements = json.load(file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Warning: Ignoring unreadable job profile {key}: {str(e)}")
+        return None
+    return JobProfile(key, requirements)
+
+
+def _save_profile(profile_dir: str, profile: JobProfile) -> None:
+    json_path = _profile_path(profile_dir, profile.key)
+    try:
+        os.makedirs(profile_dir, exist_ok=True)
+        # Write to a temp file first so concurrent readers never see half a profile
+        tmp_path = f"{json_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(profile.requirements, file)
+        os.replace(tmp_path, json_path)
+    except OSError as e:
+        print(f"Warning: Failed to persist job profile {profile.key}: {str(e)}")
+
+
+def get_job_profile(job_post: str, model=None, tokenizer=None, profile_dir: str = None) -> JobProfile:
+    """
+    Return the profile for a job post, building and persisting it on first use.
+
+    The embedding is only computed when a model and tokenizer are passed, and
+    is recomputed (through the embedding cache) if they differ from the pair
+    that produced the one held in memory.
+    """
+    if profile_dir is None:
+        profile_dir = os.environ.get("JOB_PROFILE_DIR", DEFAULT_PROFILE_DIR)
+    key = job_post_hash(job_post)
+
+    with _profiles_lock:
+        profile = _profiles.get(key)
+        if profile is not None:
+            _profiles.move_to_end(key)
+    if profile is None:
+        profile = _load_profile(profile_dir, key)
+        if profile is None:
+            profile = JobProfile(key, analyze_job_requirements(job_post))
+            _save_profile(profile_dir, profile)
+
+    if model is not None and tokenizer is not None:
+        engine = get_embedding_engine(model, tokenizer)
+        source = (engine.model_name, engine.pooling)
+        if profile.embedding is None or profile.embedding_source != source:
+            profile.embedding = engine.embed([job_post])
+            profile.embedding_source = source
+
+    with _profiles_lock:
+        _profiles[key] = profile
+        _profiles.move_to_end(key)
+        while len(_profiles) > MAX_MEMORY_PROFILES:
+            _profiles.popitem(last=False)
+    return profile
@@ -0,0 +1,311 @@
+"""Durable local job queue for evaluations.
+
+Jobs live in a SQLite file, so they survive restarts and are shared by every
+process on the box. A worker claims a job by leasing it for the visibility
+timeout; a job whose lease runs out (its worker died or hung) is handed to
+the next worker that asks. Failed attempts are retried with exponential
+backoff until max_attempts is reached, except when the handler raises
+PermanentJobError for a failure that no retry can fix.
+
+Web workers run EVALUATION_QUEUE_WORKERS background threads each. Set it to 0
+and run `python jobqueue.py [workers]` to drain the queue from a separate
+process instead.
+
+Every database call goes through offload.run_offloaded: under gevent a
+claim waiting out another process's write lock (up to the 30 s busy
+timeout) then parks only its own greenlet.
+"""
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from metrics import Counter
+from offload import run_offloaded
+
+DEFAULT_QUEUE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "jobs.sqlite3")
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+JOB_FAILURES = Counter("hireflow_job_failures_total", "Evaluation job attempts that raised, by kind", ["kind"])
+JOB_QUEUE_ERRORS = Counter("hireflow_job_queue_errors_total", "Job queue database operations that failed", ["operation"])
+
+
+class PermanentJobError(Exception):
+    """Raised by a job handler when retrying cannot help, such as an unreadable upload"""
+
+
+class JobQueue:
+    """SQLite-backed queue with leased claims, retries and backoff"""
+
+    def __init__(self, path: str = DEFAULT_QUEUE_PATH, visibility_timeout: float = 300,
+                 max_attempts: int = 3, retry_backoff: float = 10, retention: float = 7 * 24 * 3600):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+        # Set on enqueue so idle workers in this process wake up immediately
+        self.new_job = threading.Event()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, payload TEXT NOT NULL, data BLOB, "
+                "attempts INTEGER NOT NULL DEFAULT 0, available_at REAL NOT NULL, "
+                "lease_token TEXT, lease_expires_at REAL, result TEXT, error TEXT, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, available_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Per-process connection in autocommit mode; transactions are explicit"""
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    @classmethod
+    def from_env(cls) -> "JobQueue":
+        """Build the queue from EVALUATION_QUEUE_* environment variables"""
+        return cls(
+            path=os.environ.get("EVALUATION_QUEUE_PATH", DEFAULT_QUEUE_PATH),
+            visibility_timeout=float(os.environ.get("EVALUATION_QUEUE_VISIBILITY_TIMEOUT", 300)),
+            max_attempts=int(os.environ.get("EVALUATION_QUEUE_MAX_ATTEMPTS", 3)),
+            retry_backoff=float(os.environ.get("EVALUATION_QUEUE_RETRY_BACKOFF", 10))
+        )
+
+    def _execute(self, work: Callable[..., Any], *args: Any) -> Any:
+        """Run work(conn, *args) on this process's connection, serialized and off the gevent hub"""
+        with self._lock:
+            return run_offloaded(lambda: work(self._connect(), *args))
+
+    def enqueue(self, payload: Dict[str, Any], data: bytes = None) -> str:
+        """Add a job and return its ID; data is an optional binary attachment"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+
+        def insert(conn: sqlite3.Connection) -> None:
+            conn.execute(
+                "INSERT INTO jobs (id, status, payload, data, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(payload), data, now, now, now)
+            )
+            # Finished jobs are only kept long enough to be polled
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (DONE, FAILED, now - self.retention)
+            )
+
+        self._execute(insert)
+        self.new_job.set()
+        return job_id
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """
+        Lease the oldest available job, or return None if there is none.
+
+        Jobs whose lease expired count as available again, unless that lost
+        attempt was their last one, in which case they are failed here.
+        """
+        return self._execute(self._claim, time.time())
+
+    def _claim(self, conn: sqlite3.Connection, now: float) -> Optional[Dict[str, Any]]:
+        # IMMEDIATE takes the write lock up front, so two processes can
+        # never select and lease the same row
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, data = NULL, lease_token = NULL, updated_at = ? "
+                "WHERE status = ? AND lease_expires_at <= ? AND attempts >= ?",
+                (FAILED, "Visibility timeout expired on the last attempt", now, RUNNING, now, self.max_attempts)
+            )
+            row = conn.execute(
+                "SELECT id, payload, data, attempts FROM jobs "
+                "WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_expires_at <= ?) "
+                "ORDER BY created_at LIMIT 1",
+                (QUEUED, now, RUNNING, now)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            job_id, payload, data, attempts = row
+            token = uuid.uuid4().hex
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, lease_token = ?, lease_expires_at = ?, updated_at = ? "
+                "WHERE id = ?",
+                (RUNNING, attempts + 1, token, now + self.visibility_timeout, now, job_id)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return {
+            "id": job_id,
+            "payload": json.loads(payload),
+            "data": data,
+            "attempt": attempts + 1,
+            "token": token
+        }
+
+    def complete(self, job: Dict[str, Any], result: Dict[str, Any]) -> bool:
+        """Store a job's result; False if the lease was lost to another worker"""
+        updated = self._execute(lambda conn: conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = NULL, data = NULL, lease_token = NULL, "
+            "updated_at = ? WHERE id = ? AND lease_token = ?",
+            (DONE, json.dumps(result), time.time(), job["id"], job["token"])
+        ).rowcount)
+        return updated == 1
+
+    def fail(self, job: Dict[str, Any], error: str, retry: bool = True) -> bool:
+        """Schedule a retry with backoff, or fail the job after its last attempt or if retry is False"""
+        now = time.time()
+        if not retry or job["attempt"] >= self.max_attempts:
+            query = ("UPDATE jobs SET status = ?, error = ?, data = NULL, lease_token = NULL, updated_at = ? "
+                     "WHERE id = ? AND lease_token = ?")
+            params = (FAILED, error, now, job["id"], job["token"])
+        else:
+            delay = self.retry_backoff * 2 ** (job["attempt"] - 1)
+            query = ("UPDATE jobs SET status = ?, error = ?, available_at = ?, lease_token = NULL, updated_at = ? "
+                     "WHERE id = ? AND lease_token = ?")
+            params = (QUEUED, error, now + delay, now, job["id"], job["token"])
+        return self._execute(lambda conn: conn.execute(query, params).rowcount) == 1
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status of a job, with its result once done or its error once failed"""
+        row = self._execute(lambda conn: conn.execute(
+            "SELECT status, attempts, result, error, created_at, updated_at FROM jobs WHERE id = ?",
+            (job_id,)
+        ).fetchone())
+        if row is None:
+            return None
+
+        status, attempts, result, error, created_at, updated_at = row
+        job = {
+            "job_id": job_id,
+            "status": status,
+            "attempts": attempts,
+            "created_at": created_at,
+            "updated_at": updated_at
+        }
+        if status == DONE:
+            job["result"] = json.loads(result)
+        elif error:
+            # For queued jobs this is the error of the attempt being retried
+            job["error"] = error
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        rows = self._execute(lambda conn: conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        stats = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED)}
+        stats.update(dict(rows))
+        return stats
+
+
+class JobWorkers:
+    """Background threads that claim jobs and run them through a handler"""
+
+    def __init__(self, queue: JobQueue, handler: Callable[[Dict[str, Any], Optional[bytes]], Dict[str, Any]],
+                 concurrency: int = 2, poll_interval: float = 1.0):
+        self.queue = queue
+        self.handler = handler
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self) -> None:
+        for number in range(self.concurrency - len(self._threads)):
+            thread = threading.Thread(target=self._run, name=f"job-worker-{number}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = None) -> None:
+        self._stop.set()
+        self.queue.new_job.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim()
+            except sqlite3.Error as e:
+                JOB_QUEUE_ERRORS.inc(operation="claim")
+                print(f"Warning: Could not claim job: {str(e)}")
+                job = None
+            if job is None:
+                # Woken early by an enqueue in this process, else poll
+                self.queue.new_job.wait(self.poll_interval)
+                self.queue.new_job.clear()
+                continue
+            self._process(job)
+
+    def _process(self, job: Dict[str, Any]) -> None:
+        try:
+            result = self.handler(job["payload"], job["data"])
+        except PermanentJobError as e:
+            JOB_FAILURES.inc(kind="permanent")
+            print(f"Warning: Job {job['id']} failed permanently: {str(e)}")
+            self._record(job, "fail", str(e), retry=False)
+            return
+        except Exception as e:
+            JOB_FAILURES.inc(kind="retryable")
+            print(f"Warning: Job {job['id']} attempt {job['attempt']} failed: {str(e)}")
+            self._record(job, "fail", str(e))
+            return
+        if self._record(job, "complete", result) is False:
+            JOB_FAILURES.inc(kind="lease_lost")
+            print(f"Warning: Job {job['id']} finished after its lease expired; result dropped")
+
+    def _record(self, job: Dict[str, Any], operation: str, *args: Any, **kwargs: Any) -> Optional[bool]:
+        """Call queue.<operation> with a job's outcome; None if the database refused (the lease then expires)"""
+        try:
+            return getattr(self.queue, operation)(job, *args, **kwargs)
+        except sqlite3.Error as e:
+            JOB_QUEUE_ERRORS.inc(operation=operation)
+            print(f"Warning: Could not record the outcome of job {job['id']}: {str(e)}")
+            return None
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Process-wide evaluation queue from EVALUATION_QUEUE_* settings"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue.from_env()
+    return _queue
+
+
+if __name__ == "__main__":
+    from app import run_evaluation_job
+
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    workers = JobWorkers(get_job_queue(), run_evaluation_job, concurrency=concurrency)
+    workers.start()
+    print(f"Draining {get_job_queue().path} with {concurrency} workers")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        workers.stop(timeout=5)
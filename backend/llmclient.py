@@ -0,0 +1,221 @@
+"""Pooled, rate-limited client for the upstream OpenAI-compatible LLM API.
+
+All analysis calls go through one LLMClient per process, which provides:
+- a keep-alive httpx connection pool;
+- a BoundedSemaphore capping requests in flight (LLM_MAX_IN_FLIGHT), shared by
+  the HR and technical analyses and by every request thread;
+- a deadline per call, covering the wait for a slot, every attempt and the
+  backoff sleeps in between;
+- retries on 429, 5xx, timeouts and connection errors, with full-jitter
+  exponential backoff that honours Retry-After.
+
+OPENAI_API_BASE points the client at any compatible server, such as a local
+stub in tests or load runs. The in-flight limit applies per process, so the
+total upstream concurrency is LLM_MAX_IN_FLIGHT times the number of workers.
+"""
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+import httpx
+import openai
+from openai import OpenAI
+
+from metrics import span
+
+DEFAULT_API_BASE = "https://api.deepseek.com/v1"
+
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    """The call could not finish within its deadline"""
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return False
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds the server asked us to wait, if it said"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        if "retry-after-ms" in response.headers:
+            return float(response.headers["retry-after-ms"]) / 1000
+        if "retry-after" in response.headers:
+            return float(response.headers["retry-after"])
+    except ValueError:
+        # HTTP-date form; fall back to our own backoff
+        pass
+    return None
+
+
+class LLMClient:
+    """OpenAI client wrapper with pooling, an in-flight limit, deadlines and backoff"""
+
+    def __init__(self, base_url: str = DEFAULT_API_BASE, api_key: str = "", max_in_flight: int = 8,
+                 max_retries: int = 4, timeout: float = 60, connect_timeout: float = 5,
+                 deadline: float = 120, backoff_base: float = 0.5, backoff_max: float = 20,
+                 max_connections: int = 32, max_keepalive_connections: int = 16):
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.deadline = deadline
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._http = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=30
+            ),
+            timeout=httpx.Timeout(timeout, connect=connect_timeout)
+        )
+        # Retries are ours, so the SDK must not add its own on top
+        self._client = OpenAI(base_url=base_url, api_key=api_key, http_client=self._http, max_retries=0)
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._stats_lock = threading.Lock()
+        self._counters = {
+            "requests": 0,
+            "retries": 0,
+            "failures": 0,
+            "deadline_exceeded": 0,
+            "in_flight": 0
+        }
+
+    @classmethod
+    def from_env(cls) -> "LLMClient":
+        """Build the client from OPENAI_API_BASE, OPENAI_API_KEY and LLM_* settings"""
+        return cls(
+            base_url=os.environ.get("OPENAI_API_BASE", DEFAULT_API_BASE),
+            api_key=os.environ.get("OPENAI_API_KEY", ""),
+            max_in_flight=int(os.environ.get("LLM_MAX_IN_FLIGHT", 8)),
+            max_retries=int(os.environ.get("LLM_MAX_RETRIES", 4)),
+            timeout=float(os.environ.get("LLM_TIMEOUT", 60)),
+            deadline=float(os.environ.get("LLM_DEADLINE", 120)),
+            backoff_base=float(os.environ.get("LLM_BACKOFF_BASE", 0.5)),
+            backoff_max=float(os.environ.get("LLM_BACKOFF_MAX", 20)),
+            max_connections=int(os.environ.get("LLM_MAX_CONNECTIONS", 32))
+        )
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._counters[name] += amount
+
+    def _acquire(self, deadline_at: float) -> None:
+        """Wait for an in-flight slot, but never past the deadline"""
+        with span("llm_slot_wait"):
+            acquired = self._slots.acquire(timeout=max(deadline_at - time.monotonic(), 0))
+        if not acquired:
+            self._count("deadline_exceeded")
+            raise LLMDeadlineExceeded("Timed out waiting for an upstream LLM slot")
+        self._count("in_flight")
+
+    def _release(self) -> None:
+        self._count("in_flight", -1)
+        self._slots.release()
+
+    def _backoff(self, attempt: int, error: Exception, deadline_at: float) -> None:
+        """Sleep before the next attempt, or re-raise if retrying is pointless"""
+        if attempt >= self.max_retries or not is_retryable(error):
+            self._count("failures")
+            raise error
+        # Full jitter spreads retries out so a burst of 429s doesn't come back in step
+        delay = retry_after(error)
+        if delay is None:
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if time.monotonic() + delay >= deadline_at:
+            self._count("deadline_exceeded")
+            raise LLMDeadlineExceeded(f"Upstream LLM call failed and its deadline leaves no time to retry: {error}")
+        self._count("retries")
+        with span("llm_backoff"):
+            time.sleep(delay)
+
+    def _attempt_timeout(self, deadline_at: float) -> float:
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            self._count("deadline_exceeded")
+            raise LLMDeadlineExceeded("Upstream LLM call deadline exceeded")
+        return min(self.timeout, remaining)
+
+    def chat(self, deadline: float = None, **kwargs: Any):
+        """chat.completions.create with the slot, deadline and retry policy applied"""
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        attempt = 0
+        while True:
+            self._acquire(deadline_at)
+            try:
+                self._count("requests")
+                return self._client.chat.completions.create(timeout=self._attempt_timeout(deadline_at), **kwargs)
+            except (openai.APIError, httpx.HTTPError) as e:
+                error = e
+            finally:
+                self._release()
+            # Back off without holding a slot, so other calls can use it
+            self._backoff(attempt, error, deadline_at)
+            attempt += 1
+
+    def stream_chat(self, deadline: float = None, **kwargs: Any) -> Iterator[Any]:
+        """
+        Yield streamed completion chunks under the same policy as chat().
+
+        The slot is held until the stream ends or the generator is closed.
+        Only failures before the first chunk are retried; a stream that breaks
+        midway raises, since its text has already been handed out.
+        """
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        attempt = 0
+        while True:
+            self._acquire(deadline_at)
+            started = False
+            try:
+                self._count("requests")
+                stream = self._client.chat.completions.create(
+                    timeout=self._attempt_timeout(deadline_at), stream=True, **kwargs
+                )
+                try:
+                    for chunk in stream:
+                        started = True
+                        yield chunk
+                        if time.monotonic() > deadline_at:
+                            self._count("deadline_exceeded")
+                            raise LLMDeadlineExceeded("Upstream LLM stream deadline exceeded")
+                finally:
+                    stream.close()
+                return
+            except (openai.APIError, httpx.HTTPError) as e:
+                if started:
+                    self._count("failures")
+                    raise
+                error = e
+            finally:
+                self._release()
+            self._backoff(attempt, error, deadline_at)
+            attempt += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return {**self._counters, "max_in_flight": self.max_in_flight}
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """Process-wide client, so the in-flight limit covers every caller"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LLMClient.from_env()
+    return _client
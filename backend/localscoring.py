@@ -0,0 +1,86 @@
+"""LLM-free evaluation from the local NLP pipeline in main.py.
+
+When /api/evaluate runs with a latency budget, this result is computed while
+the upstream analysis is in flight and returned, marked provisional, if the
+upstream misses the deadline or fails. It has the same top-level shape as the
+AI result (sections, match_scores, technical_analysis), so the frontend can
+render either one.
+"""
+from typing import Any, Dict, List
+
+from jobprofile import get_job_profile
+from main import compare_requirements, get_bert_embedding, perform_resume_analysis
+from models import get_jobbert
+
+EDUCATION_LEVELS = ["PhD", "Master's", "Bachelor's"]
+
+
+def _listing(items: List[str]) -> str:
+    return ", ".join(items) if items else "None"
+
+
+def local_evaluation(job_post: str, resume_text: str) -> Dict[str, Any]:
+    """Score a resume with spaCy, the skill dictionary and JobBERT only"""
+    tokenizer, model = get_jobbert()
+    resume_analysis = perform_resume_analysis(resume_text)
+    profile = get_job_profile(job_post, model, tokenizer)
+    comparison = compare_requirements(profile, resume_analysis)
+    similarity = profile.similarity(get_bert_embedding(resume_text, model, tokenizer))
+
+    hard_skills = list(resume_analysis["skills"]["hard_skills"])
+    soft_skills = list(resume_analysis["skills"]["soft_skills"])
+    missing = sorted(comparison["skill_match"]["missing"])
+    matched = sorted(profile.required_skills & {skill.lower() for skill in hard_skills})
+    skills_match = round(comparison["skill_match"]["match_percentage"])
+    overall_match = round(comparison["overall_match"]["score"])
+    qualified = comparison["overall_match"]["qualified"]
+
+    education = resume_analysis["education"]
+    highest_degree = next((level for level in EDUCATION_LEVELS if level in education["levels"]), "Not specified")
+    institution = next((detail["school"] for detail in education["details"] if detail.get("school")), "Not specified")
+    personal_info = resume_analysis["personal_info"]
+
+    return {
+        "provisional": True,
+        "source": "local",
+        "sections": {
+            "candidate_overview": {
+                "title": "Candidate Overview",
+                "content": resume_analysis["summary"] or "No summary detected in the resume."
+            },
+            "skills_analysis": {
+                "title": "Skills Analysis",
+                "content": (f"Skills Match: {skills_match}%\n"
+                            f"Matching skills: {_listing(matched)}\n"
+                            f"Missing skills: {_listing(missing)}")
+            },
+            "qualification_assessment": {
+                "title": "Qualification Assessment",
+                "content": (f"Overall Match: {overall_match}%\n"
+                            f"Highest degree: {highest_degree}\n"
+                            f"Semantic similarity to the job post: {similarity:.2f}\n"
+                            f"The local screen rates the candidate {'qualified' if qualified else 'not qualified'}.")
+            }
+        },
+        "match_scores": {
+            "overall_match": overall_match,
+            "skills_match": skills_match,
+            "qualified": qualified
+        },
+        "semantic_similarity": similarity,
+        "technical_analysis": {
+            "personal_info": {
+                key: str(personal_info[key]).split("\n")[0]
+                for key in ("name", "email", "phone", "location") if personal_info.get(key)
+            },
+            "education": {"highest_degree": highest_degree, "institution": institution},
+            "experience": {},
+            "skills": {"technical_skills": hard_skills, "soft_skills": soft_skills},
+            "job_match": {
+                "required_skills_match": [f"{skill}: present" for skill in matched]
+                + [f"{skill}: missing" for skill in missing]
+            }
+        },
+        "confidence_score": 0,
+        "device_used": "cpu"
+    }
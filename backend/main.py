@@ -1,31 +1,34 @@
 import sys
 import os
 import fitz
-import torch
-from transformers import AutoTokenizer, AutoModelForMaskedLM
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-import spacy
 import json
 from datetime import datetime
 from collections import Counter
+from functools import lru_cache
 import re
-import nltk
-import ssl
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize, sent_tokenize
-
-# Fix SSL certificate verification issue
-try:
-    _create_unverified_https_context = ssl._create_unverified_context
-except AttributeError:
-    pass
-else:
-    ssl._create_default_https_context = _create_unverified_https_context
+import threading
+from skills import get_skill_matcher
+from embeddings import get_embedding_engine
+from models import get_nlp, get_jobbert
+
+# spaCy, NLTK, torch and transformers are imported on first use rather than at
+# import time, so importing this module stays cheap.
 
 # Download necessary NLTK data
 def download_nltk_data():
     """Download required NLTK data with error handling"""
+    import nltk
+    import ssl
+
+    # Fix SSL certificate verification issue
+    try:
+        _create_unverified_https_context = ssl._create_unverified_context
+    except AttributeError:
+        pass
+    else:
+        ssl._create_default_https_context = _create_unverified_https_context
+
     required_packages = ['punkt', 'stopwords']
     for package in required_packages:
         try:
@@ -36,18 +39,6 @@ def download_nltk_data():
             except Exception as e:
                 print(f"Warning: Failed to download {package}: {str(e)}")
 
-# Attempt to download NLTK data
-download_nltk_data()
-
-# Load spaCy model for NER and parsing
-try:
-    nlp = spacy.load("en_core_web_sm")
-except:
-    print("Downloading spaCy model...")
-    import subprocess
-    subprocess.call(["python", "-m", "spacy", "download", "en_core_web_sm"])
-    nlp = spacy.load("en_core_web_sm")
-
 # Define a fallback stopwords list in case NLTK download still fails
 FALLBACK_STOPWORDS = {
     'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you', "you're", "you've", 
@@ -100,37 +91,46 @@ def extract_text_from_pdf(pdf_path):
         print(f"Error: An unexpected error occurred: {str(e)}")
         return None
 
-def extract_skills_with_jobbert(text):
+# Reference phrases a noun chunk is compared against to classify it
+SKILL_PROTOTYPES = {
+    "hard_skills": "technical skill programming development",
+    "soft_skills": "soft skill communication teamwork"
+}
+SKILL_SIMILARITY_THRESHOLD = 0.5
+
+def normalize_rows(matrix):
+    """Scale rows to unit length so dot products are cosine similarities"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+@lru_cache(maxsize=None)
+def get_skill_prototypes(engine):
+    """Normalized prototype embeddings, computed once per embedding engine"""
+    return normalize_rows(engine.embed(list(SKILL_PROTOTYPES.values())))
+
+def extract_skills_with_jobbert(text, model, tokenizer):
     """Extract skills using JobBERT embeddings"""
-    # Split text into sentences
-    sentences = sent_tokenize(text)
+    analyzed = analyze_text(text)
     skills = {"hard_skills": {}, "soft_skills": {}}
-    
-    # Process each sentence
-    for sentence in sentences:
-        # Get sentence embedding
-        sentence_emb = get_bert_embedding(sentence)
-        
-        # Compare with known skill embeddings
-        doc = nlp(sentence)
-        for chunk in doc.noun_chunks:
-            chunk_text = chunk.text.lower()
-            chunk_emb = get_bert_embedding(chunk_text)
-            
-            # Calculate similarity with technical and soft skill contexts
-            tech_context = get_bert_embedding("technical skill programming development")
-            soft_context = get_bert_embedding("soft skill communication teamwork")
-            
-            tech_sim = cosine_similarity(chunk_emb, tech_context)[0][0]
-            soft_sim = cosine_similarity(chunk_emb, soft_context)[0][0]
-            
-            # Classify based on similarity
-            if tech_sim > 0.5 or soft_sim > 0.5:
-                if tech_sim > soft_sim:
-                    skills["hard_skills"][chunk_text] = skills["hard_skills"].get(chunk_text, 0) + 1
-                else:
-                    skills["soft_skills"][chunk_text] = skills["soft_skills"].get(chunk_text, 0) + 1
-    
+
+    chunk_counts = Counter(chunk.text.lower() for chunk in analyzed.doc.noun_chunks)
+    if not chunk_counts:
+        return skills
+
+    # Embed each distinct chunk once, all in one batch, and score every chunk
+    # against every prototype with a single matrix product
+    engine = get_embedding_engine(model, tokenizer)
+    chunks = list(chunk_counts)
+    similarities = normalize_rows(engine.embed(chunks)) @ get_skill_prototypes(engine).T
+    skill_types = list(SKILL_PROTOTYPES)
+
+    for chunk_text, chunk_similarities in zip(chunks, similarities):
+        # Classify based on similarity
+        best = int(np.argmax(chunk_similarities))
+        if chunk_similarities[best] > SKILL_SIMILARITY_THRESHOLD:
+            skill_type = skill_types[best]
+            skills[skill_type][chunk_text] = skills[skill_type].get(chunk_text, 0) + chunk_counts[chunk_text]
+
     return skills
 
 def simple_sentence_split(text):
@@ -142,18 +142,102 @@ def simple_sentence_split(text):
     # Return sentences, filtering out empty ones
     return [s.strip() for s in text.split('|SPLIT|') if s.strip()]
 
+_punkt_ready = None
+_punkt_lock = threading.Lock()
+
+def ensure_punkt():
+    """Make NLTK's punkt sentence model available, downloading it at most once per process"""
+    global _punkt_ready
+    if _punkt_ready is None:
+        with _punkt_lock:
+            if _punkt_ready is None:
+                from nltk.tokenize import sent_tokenize
+
+                try:
+                    sent_tokenize("Probe.")
+                    _punkt_ready = True
+                except LookupError:
+                    import nltk
+
+                    # NLTK 3.8.2+ reads punkt_tab, older releases punkt
+                    for package in ("punkt", "punkt_tab"):
+                        try:
+                            nltk.download(package, quiet=True)
+                        except Exception as e:
+                            print(f"Warning: Failed to download {package}: {str(e)}")
+                    try:
+                        sent_tokenize("Probe.")
+                        _punkt_ready = True
+                    except LookupError:
+                        print("Warning: NLTK punkt is unavailable; splitting sentences with the regex fallback")
+                        _punkt_ready = False
+    return _punkt_ready
+
+def split_sentences(text):
+    """Sentence tokenization with the regex fallback if punkt is unavailable"""
+    if ensure_punkt():
+        from nltk.tokenize import sent_tokenize
+        return sent_tokenize(text)
+    return simple_sentence_split(text)
+
+class AnalyzedText:
+    """Text parsed once and shared by every extractor.
+
+    The spaCy parse and the sentence split are computed on first use and then
+    reused, so running all extractors over one resume costs a single parse.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self._doc = None
+        self._sentences = None
+        self._sentence_starts = None
+
+    @property
+    def doc(self):
+        if self._doc is None:
+            self._doc = get_nlp()(self.text)
+        return self._doc
+
+    @property
+    def sentences(self):
+        if self._sentences is None:
+            self._sentences = split_sentences(self.text)
+        return self._sentences
+
+    @property
+    def sentence_starts(self):
+        """Character offset of each sentence in the original text"""
+        if self._sentence_starts is None:
+            starts = []
+            position = 0
+            for sentence in self.sentences:
+                start = self.text.find(sentence, position)
+                if start < 0:
+                    start = position
+                starts.append(start)
+                position = start + len(sentence)
+            self._sentence_starts = starts
+        return self._sentence_starts
+
+def analyze_text(text):
+    """Wrap raw text in an AnalyzedText, passing existing ones through"""
+    return text if isinstance(text, AnalyzedText) else AnalyzedText(text)
+
 def perform_resume_analysis(text):
     """Perform comprehensive resume analysis and return formatted results"""
+    # Parse once and hand the same document to every extractor
+    analyzed = analyze_text(text)
     analysis = {
-        "personal_info": extract_personal_info(text),
-        "summary": extract_summary(text),
-        "skills": extract_skills(text),
-        "education": extract_education(text),
-        "experience": extract_experience(text),
-        "certifications": extract_certifications(text),
-        "projects": extract_projects(text),
-        "languages": extract_languages(text),
-        "achievements": extract_achievements(text)
+        "personal_info": extract_personal_info(analyzed),
+        "summary": extract_summary(analyzed),
+        "skills": extract_skills(analyzed),
+        "education": extract_education(analyzed),
+        "experience": extract_experience(analyzed),
+        "certifications": extract_certifications(analyzed),
+        "projects": extract_projects(analyzed),
+        "languages": extract_languages(analyzed),
+        "achievements": extract_achievements(analyzed)
     }
     return analysis
 
@@ -169,40 +253,15 @@ education_keywords = [
 
 def extract_skills(text):
     """Extract skills from text with enhanced detection"""
+    analyzed = analyze_text(text)
+    text = analyzed.text
     skills = {
         "hard_skills": {},
         "soft_skills": {}
     }
     
-    # Common technical skills patterns
-    tech_patterns = [
-        r'\b(?:Python|Java|C\+\+|JavaScript|React|Node\.js|SQL|AWS|Azure|Docker|Kubernetes|Git|REST|API)\b',
-        r'\b(?:Machine Learning|AI|Deep Learning|Data Science|Cloud Computing|DevOps|Full Stack|Backend|Frontend)\b',
-        r'\b(?:HTML5?|CSS3?|MongoDB|MySQL|PostgreSQL|Redis|GraphQL|Jenkins|Linux|Unix|Agile|Scrum)\b'
-    ]
-    
-    # Common soft skills patterns
-    soft_patterns = [
-        r'\b(?:Communication|Leadership|Management|Problem[\s-]Solving|Team[\s-]Work|Collaboration)\b',
-        r'\b(?:Critical[\s-]Thinking|Time[\s-]Management|Project[\s-]Management|Decision[\s-]Making)\b',
-        r'\b(?:Adaptability|Flexibility|Creativity|Innovation|Analysis|Planning|Organization)\b'
-    ]
-    
     # Process text with spaCy for better context understanding
-    doc = nlp(text)
-    
-    # Extract skills using patterns
-    for pattern in tech_patterns:
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
-            skill = match.group(0).lower()
-            skills["hard_skills"][skill] = skills["hard_skills"].get(skill, 0) + 1
-            
-    for pattern in soft_patterns:
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
-            skill = match.group(0).lower()
-            skills["soft_skills"][skill] = skills["soft_skills"].get(skill, 0) + 1
+    doc = analyzed.doc
     
     # Extract additional skills using noun chunks and context
     for chunk in doc.noun_chunks:
@@ -225,10 +284,18 @@ def extract_skills(text):
             if len(k) > 2 and k not in FALLBACK_STOPWORDS
         }
     
+    # Known skills and their aliases, counted under canonical names in one
+    # pass over the text. Dictionary hits skip the cleanup above so short
+    # names like "c#" or "ai" survive.
+    for skill_type, counts in get_skill_matcher().count(text).items():
+        for skill, count in counts.items():
+            skills[skill_type][skill] = skills[skill_type].get(skill, 0) + count
+    
     return skills
 
 def extract_education(text):
     """Enhanced education information extraction"""
+    text = analyze_text(text).text
     education_info = []
     text_lines = text.split('\n')
     current_education = None
@@ -265,9 +332,10 @@ def extract_education(text):
         if any(degree in line.upper() for degree in ["BACHELOR", "BS", "BA", "MASTER", "MS", "PHD", "DOCTORATE"]):
             if current_education:
                 current_education["degree"] = line
-                if "OF" in line.upper() or "IN" in line.upper():
-                    field = line.split("OF" if "OF" in line.upper() else "IN")[1].strip()
-                    current_education["field"] = field
+                # "Bachelor of Science in Software Engineering" -> "Science in Software Engineering"
+                parts = re.split(r'\b(?:of|in)\b', line, maxsplit=1, flags=re.IGNORECASE)
+                if len(parts) > 1 and parts[1].strip():
+                    current_education["field"] = parts[1].strip()
 
         # Extract year information
         year_match = re.search(r'(?:19|20)\d{2}(?:\s*[-–]\s*(?:Present|Current|(?:19|20)\d{2}))?', line)
@@ -319,6 +387,8 @@ job_title_patterns = [
 
 def extract_experience(text):
     """Enhanced work experience extraction"""
+    analyzed = analyze_text(text)
+    text = analyzed.text
     experience_patterns = [
         # Years of experience
         r'(\d+)[\+]?\s*(?:year|yr)s?(?:\sof)?(?:\sexperience)?',
@@ -335,11 +405,7 @@ def extract_experience(text):
     years = []
     positions = []
     dates = []
-    try:
-        sentences = sent_tokenize(text)
-    except:
-        sentences = simple_sentence_split(text)
-    for sentence in sentences:
+    for sentence in analyzed.sentences:
         sent_lower = sentence.lower()
         # Extract years of experience
         for pattern in experience_patterns[:3]:
@@ -352,7 +418,7 @@ def extract_experience(text):
         for pattern in experience_patterns[5:]:
             positions.extend(re.findall(pattern, sentence, re.IGNORECASE))
     # Extract job titles using spaCy
-    doc = nlp(text)
+    doc = analyzed.doc
     for ent in doc.ents:
         if ent.label_ == "PERSON" and any(prefix in ent.text.lower() for prefix in job_prefixes):
             positions.append(ent.text)
@@ -381,6 +447,7 @@ def extract_experience(text):
 
 def extract_personal_info(text):
     """Extract personal information from resume"""
+    text = analyze_text(text).text
     personal_info = {
         "name": None,
         "email": None,
@@ -437,17 +504,14 @@ def extract_personal_info(text):
 
 def extract_certifications(text):
     """Extract certifications from resume"""
+    analyzed = analyze_text(text)
     certification_patterns = [
         r'(?:certification|certificate|certified|cert)(?:\sin|\sas|\s-|\s–|\s—|\s:|:)?\s+([^,.\n]+)',
         r'(?:AWS|Microsoft|Google|CompTIA|Cisco|Oracle|PMI|ITIL|PMP|CISSP|CISA|CEH|CCNA|MCSA|MCSE|MCTS|AZ-|AI-|DP-|SC-)\s*[-:]?\s*\d*\s*[A-Za-z0-9\s]+',
         r'(?:AWS|Azure|GCP)\s+Certified\s+[A-Za-z\s]+'
     ]
     certifications = []
-    try:
-        sentences = sent_tokenize(text)
-    except:
-        sentences = simple_sentence_split(text)
-    for sentence in sentences:
+    for sentence in analyzed.sentences:
         for pattern in certification_patterns:
             matches = re.findall(pattern, sentence, re.IGNORECASE)
             for match in matches:
@@ -460,17 +524,14 @@ def extract_certifications(text):
 
 def extract_projects(text):
     """Extract projects from resume"""
+    analyzed = analyze_text(text)
     project_patterns = [
         r'(?:project|developed|implemented|created|built|designed):?\s+([^.]+)',
         r'(?:project|developed|implemented|created|built|designed)\s+[a-z]*\s+([^.]+)',
         r'project\s+title:?\s+([^.]+)'
     ]
     projects = []
-    try:
-        sentences = sent_tokenize(text)
-    except:
-        sentences = simple_sentence_split(text)
-    for sentence in sentences:
+    for sentence in analyzed.sentences:
         if "project" in sentence.lower():
             for pattern in project_patterns:
                 matches = re.findall(pattern, sentence, re.IGNORECASE)
@@ -483,16 +544,13 @@ def extract_projects(text):
 
 def extract_languages(text):
     """Extract language proficiencies from resume"""
+    analyzed = analyze_text(text)
     language_patterns = [
         r'(?:language|languages|fluent in|proficient in):?\s+([^.]+)',
         r'(?:English|Spanish|French|German|Chinese|Japanese|Italian|Russian|Arabic|Portuguese|Hindi)(?:\s+(?:native|fluent|proficient|advanced|intermediate|beginner))?'
     ]
     languages = []
-    try:
-        sentences = sent_tokenize(text)
-    except:
-        sentences = simple_sentence_split(text)
-    for sentence in sentences:
+    for sentence in analyzed.sentences:
         if "language" in sentence.lower() or any(lang in sentence for lang in ["English", "Spanish", "French", "German"]):
             for pattern in language_patterns:
                 matches = re.findall(pattern, sentence, re.IGNORECASE)
@@ -505,16 +563,18 @@ def extract_languages(text):
 
 def extract_summary(text):
     """Extract professional summary from resume"""
+    analyzed = analyze_text(text)
     summary_patterns = [
         r'(?:summary|profile|objective|about me|professional summary)(?:\s*:\s*|\s*\n\s*)([^.]*(?:\.[^.]*){0,3})',
         r'(?:experienced|skilled|professional|dedicated|results-driven|motivated|detail-oriented)(?:[^.]*(?:\.[^.]*){0,3})'
     ]
-    # Get the first 1000 characters for the summary search
-    first_part = text[:1000]
-    try:
-        sentences = sent_tokenize(first_part)
-    except:
-        sentences = simple_sentence_split(first_part)
+    # Only the first 1000 characters are searched; reuse the shared sentence
+    # split and clip it there instead of tokenizing the prefix again
+    sentences = [
+        sentence[:1000 - start]
+        for sentence, start in zip(analyzed.sentences, analyzed.sentence_starts)
+        if start < 1000
+    ]
     
     # First, look for explicit summary sections
     for sentence in sentences[:5]:  # Only check first few sentences
@@ -533,16 +593,13 @@ def extract_summary(text):
 
 def extract_achievements(text):
     """Extract achievements and awards from resume"""
+    analyzed = analyze_text(text)
     achievement_patterns = [
         r'(?:achievement|accomplishment|award|honor|recognition|won|received|granted|earned):?\s+([^.]+)',
         r'(?:recipient of|awarded)\s+([^.]+)'
     ]
     achievements = []
-    try:
-        sentences = sent_tokenize(text)
-    except:
-        sentences = simple_sentence_split(text)
-    for sentence in sentences:
+    for sentence in analyzed.sentences:
         for pattern in achievement_patterns:
             matches = re.findall(pattern, sentence, re.IGNORECASE)
             for match in matches:
@@ -554,73 +611,25 @@ def extract_achievements(text):
 
 def analyze_job_requirements(text):
     """Extract job requirements from job posting"""
+    analyzed = analyze_text(text)
     return {
-        "skills": extract_skills(text),
-        "education": extract_education(text),
-        "experience": extract_experience(text)
+        "skills": extract_skills(analyzed),
+        "education": extract_education(analyzed),
+        "experience": extract_experience(analyzed)
     }
 
 def get_bert_embedding(text, model, tokenizer):
     """Get BERT embedding for text with proper truncation and chunking"""
-    BERT_MAX_LENGTH = 512  # BERT's maximum sequence length
-    
-    # Tokenize with explicit max length and truncation
-    inputs = tokenizer(
-        text,
-        max_length=BERT_MAX_LENGTH,
-        padding='max_length',
-        truncation=True,
-        return_tensors="pt"
-    )
-    
-    # Process in batches
-    embeddings_list = []
-    with torch.no_grad():
-        # Get embeddings from the hidden states
-        outputs = model(**inputs, output_hidden_states=True)
-        # Use the hidden states from the last layer
-        hidden_states = outputs.hidden_states[-1]
-        # Mean pooling
-        mask = inputs['attention_mask'].unsqueeze(-1)
-        embeddings = torch.sum(hidden_states * mask, dim=1) / torch.sum(mask, dim=1)
-        embeddings_list.append(embeddings)
-
-        # If text is longer than max length, process additional chunks
-        if len(tokenizer.encode(text)) > BERT_MAX_LENGTH:
-            # Split remaining text into chunks
-            words = text.split()
-            chunk_size = BERT_MAX_LENGTH // 2  # Use smaller chunks to ensure fitting
-            for i in range(BERT_MAX_LENGTH, len(words), chunk_size):
-                chunk = ' '.join(words[i:i + chunk_size])
-                if not chunk:
-                    continue
-                    
-                # Process chunk
-                chunk_inputs = tokenizer(
-                    chunk,
-                    max_length=BERT_MAX_LENGTH,
-                    padding='max_length',
-                    truncation=True,
-                    return_tensors="pt"
-                )
-                chunk_outputs = model(**chunk_inputs, output_hidden_states=True)
-                # Use hidden states from last layer for this chunk too
-                chunk_hidden_states = chunk_outputs.hidden_states[-1]
-                chunk_mask = chunk_inputs['attention_mask'].unsqueeze(-1)
-                chunk_embeddings = torch.sum(chunk_hidden_states * chunk_mask, dim=1) / torch.sum(chunk_mask, dim=1)
-                embeddings_list.append(chunk_embeddings)
-
-    # Average all embeddings if we processed multiple chunks
-    if len(embeddings_list) > 1:
-        final_embedding = torch.mean(torch.cat(embeddings_list, dim=0), dim=0, keepdim=True)
-    else:
-        final_embedding = embeddings_list[0]
-        
-    return final_embedding.numpy()
+    # Long texts are split into overlapping 512-token windows and averaged
+    return get_embedding_engine(model, tokenizer).embed([text])
+
+def get_bert_embeddings(texts, model, tokenizer):
+    """Embed many texts in batched forward passes, one row per text"""
+    return get_embedding_engine(model, tokenizer).embed(texts)
 
 def calculate_similarity(embedding1, embedding2):
     """Calculate cosine similarity between embeddings"""
-    return cosine_similarity(embedding1, embedding2)[0][0]
+    return float(normalize_rows(embedding1)[0] @ normalize_rows(embedding2)[0])
 
 def compare_requirements(job_req, resume_info):
     """Enhanced comparison with XGBoost-style binary classification"""
@@ -635,8 +644,10 @@ def compare_requirements(job_req, resume_info):
         "education": 0.4
     }
     
-    # Compare skills
-    required_skills = set([s.lower() for s in job_req["skills"]["hard_skills"].keys()])
+    # Compare skills; a compiled job profile carries its skill set precomputed
+    required_skills = getattr(job_req, "required_skills", None)
+    if required_skills is None:
+        required_skills = set([s.lower() for s in job_req["skills"]["hard_skills"].keys()])
     candidate_skills = set([s.lower() for s in resume_info["skills"]["hard_skills"].keys()])
     matched_skills = required_skills & candidate_skills
     results["skill_match"]["match_percentage"] = len(matched_skills) / len(required_skills) * 100 if required_skills else 100
@@ -684,9 +695,9 @@ if __name__ == "__main__":
     if job_post_content and resume_content:
         # Load JobBERT model and tokenizer
         print("\nLoading natural language processing models...")
+        download_nltk_data()
         try:
-            tokenizer = AutoTokenizer.from_pretrained("jjzha/jobbert-base-cased")
-            model = AutoModelForMaskedLM.from_pretrained("jjzha/jobbert-base-cased")
+            tokenizer, model = get_jobbert()
         except Exception as e:
             print(f"Error loading models: {str(e)}")
             exit(1)
@@ -695,15 +706,23 @@ if __name__ == "__main__":
         print("\nAnalyzing resume...")
         resume_analysis = perform_resume_analysis(resume_content)
         print("\n=== Job Requirements Analysis ===\n")
-        job_requirements = analyze_job_requirements(job_post_content)
+        # Requirements and embedding are compiled once per job post and reused.
+        # Register this script as `main` so jobprofile doesn't load it twice.
+        sys.modules.setdefault("main", sys.modules[__name__])
+        from jobprofile import get_job_profile
+        job_profile = get_job_profile(job_post_content, model, tokenizer)
         
         # Compare requirements with resume
-        comparison_results = compare_requirements(job_requirements, resume_analysis)
+        comparison_results = compare_requirements(job_profile, resume_analysis)
         
         # Get semantic similarity
-        job_embedding = get_bert_embedding(job_post_content, model, tokenizer)
         resume_embedding = get_bert_embedding(resume_content, model, tokenizer)
-        semantic_similarity = calculate_similarity(job_embedding, resume_embedding)
+        semantic_similarity = job_profile.similarity(resume_embedding)
+
+        # Keep the resume embedding for later top-k searches across candidates
+        if os.environ.get("CANDIDATE_INDEX_PATH"):
+            from vectorindex import get_candidate_index
+            get_candidate_index().append([os.path.basename(pdf_path)], resume_embedding)
 
         print("\n=== Qualification Analysis ===")
         print(f"Overall Match Score: {comparison_results['overall_match']['score']:.2f}%")
@@ -0,0 +1,220 @@
+"""In-process metrics in the Prometheus text format, and per-stage timing spans.
+
+Counters, gauges and histograms are plain dicts behind a lock, so recording
+one costs well under a microsecond and the module has no dependencies. Values
+that other components already keep (LLM client, caches, job queue) are read
+by collectors when /metrics is scraped instead of being counted twice.
+
+`span(stage)` times one stage of an evaluation into hireflow_stage_seconds.
+Inside `trace(name)` the spans are also collected per request, and requests
+slower than TIMING_LOG_THRESHOLD seconds are logged as one JSON line with
+their stage breakdown (0 logs every request). Work handed to a thread pool
+joins the caller's trace when submitted through `bind()`.
+
+Metrics are per process: with several gunicorn workers, each scrape shows
+only the worker that answered it. METRICS_ENABLED=0 turns spans into no-ops
+and /metrics off.
+"""
+import bisect
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+TIMING_LOG_THRESHOLD = float(os.environ.get("TIMING_LOG_THRESHOLD", 10))
+
+# Seconds; spans range from sub-millisecond parsing to minute-long LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 60, 120)
+
+# (name, type, help, [(labels, value)]) as returned by a collector
+Family = Tuple[str, str, str, List[Tuple[Dict[str, Any], float]]]
+
+_metrics = []
+_collectors = []
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        _metrics.append(self)
+
+    def _key(self, labels: Dict[str, Any]) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: tuple) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self._labels(key))} {_format_value(value)}" for key, value in values]
+
+
+class Counter(_Metric):
+    """Monotonic count, such as requests served or tokens used"""
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, such as requests in flight"""
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (the last one is +Inf), sum, count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = [(key, list(state[0]), state[1], state[2]) for key, state in self._values.items()]
+        lines = []
+        for key, counts, total, count in values:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+def register_collector(collector: Callable[[], Iterable[Family]]) -> None:
+    """Add a function that reports (name, type, help, samples) families at scrape time"""
+    _collectors.append(collector)
+
+
+def render() -> str:
+    """Every metric and collector in the Prometheus text exposition format"""
+    lines = []
+    for metric in _metrics:
+        samples = metric.render()
+        if samples:
+            lines += [f"# HELP {metric.name} {metric.help}", f"# TYPE {metric.name} {metric.kind}"] + samples
+    for collector in _collectors:
+        try:
+            families = list(collector())
+        except Exception as e:
+            # One broken source (say, a locked database) must not blank the scrape
+            print(f"Warning: Metrics collector {getattr(collector, '__name__', collector)} failed: {str(e)}")
+            continue
+        for name, kind, help, samples in families:
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+            lines += [f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples]
+    return "\n".join(lines) + "\n"
+
+
+STAGE_SECONDS = Histogram("hireflow_stage_seconds", "Time spent in each evaluation stage", ["stage"])
+STAGE_IN_PROGRESS = Gauge("hireflow_stage_in_progress", "Evaluation stages currently running", ["stage"])
+STAGE_ERRORS = Counter("hireflow_stage_errors_total", "Evaluation stages that raised", ["stage"])
+
+_trace = contextvars.ContextVar("hireflow_trace", default=None)
+
+
+@contextmanager
+def span(stage: str):
+    """Time a stage into the stage histogram and the current trace, if any"""
+    if not METRICS_ENABLED:
+        yield
+        return
+    STAGE_IN_PROGRESS.inc(stage=stage)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_IN_PROGRESS.dec(stage=stage)
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        spans = _trace.get()
+        if spans is not None:
+            spans.append((stage, start, elapsed))
+
+
+@contextmanager
+def trace(name: str):
+    """Collect the spans run inside, and log them if the whole took long enough"""
+    if not METRICS_ENABLED:
+        yield
+        return
+    spans = []
+    token = _trace.set(spans)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _trace.reset(token)
+        elapsed = time.perf_counter() - start
+        if elapsed >= TIMING_LOG_THRESHOLD:
+            # Spans from pool threads finish in any order; list them as they started
+            stages = [{"stage": stage, "start": round(started - start, 4), "seconds": round(seconds, 4)}
+                      for stage, started, seconds in sorted(spans, key=lambda span: span[1])]
+            print(f"Timing: {json.dumps({'trace': name, 'seconds': round(elapsed, 4), 'spans': stages})}")
+
+
+def bind(func: Callable) -> Callable:
+    """Wrap func to run in the caller's context, so its spans join the caller's trace"""
+    return functools.partial(contextvars.copy_context().run, func)
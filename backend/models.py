@@ -0,0 +1,103 @@
+"""Lazily loaded NLP models shared across the backend.
+
+Nothing heavy is imported at module import time: spaCy, torch and
+transformers are pulled in the first time an accessor is called, and each
+model is loaded once per process.
+
+Under gunicorn with PRELOAD_MODELS=1, preload_models() runs in the master
+before workers fork, so every worker shares one copy-on-write set of weights.
+"""
+import gc
+import os
+import subprocess
+import sys
+import threading
+
+SPACY_MODEL = "en_core_web_sm"
+# The extractors only use noun chunks (tagger + parser) and entities (ner)
+SPACY_EXCLUDE = ["lemmatizer"]
+
+_nlp = None
+_jobbert = None
+_lock = threading.Lock()
+
+
+def get_nlp():
+    """Return the shared spaCy pipeline, loading (or downloading) it on first use"""
+    global _nlp
+    if _nlp is None:
+        with _lock:
+            if _nlp is None:
+                import spacy
+
+                try:
+                    _nlp = spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+                except OSError:
+                    print("Downloading spaCy model...")
+                    subprocess.call([sys.executable, "-m", "spacy", "download", SPACY_MODEL])
+                    _nlp = spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+    return _nlp
+
+
+def get_jobbert():
+    """Return the shared (tokenizer, model) pair for JobBERT"""
+    global _jobbert
+    if _jobbert is None:
+        with _lock:
+            if _jobbert is None:
+                from embeddings import load_jobbert
+
+                _jobbert = load_jobbert()
+    return _jobbert
+
+
+def preload_models() -> None:
+    """Load every model now and freeze it so forked workers share the pages"""
+    get_nlp()
+    tokenizer, model = get_jobbert()
+
+    from skills import get_skill_matcher
+    get_skill_matcher()
+
+    # The local scoring and ranking paths split sentences with punkt
+    from main import ensure_punkt
+    ensure_punkt()
+
+    # Parsing the vendored tokenizer takes ~0.5 s; better here than on the first request
+    from compaction import get_tokenizer
+    get_tokenizer()
+
+    # Weights are only ever read; make sure nothing writes to them after fork
+    model.eval()
+    model.requires_grad_(False)
+
+    # Move everything allocated so far out of the collector's reach. Otherwise
+    # the first GC pass in each worker touches every object header and copies
+    # the pages those objects live on.
+    gc.collect()
+    gc.freeze()
+
+
+def memory_report() -> dict:
+    """Resident, proportional and unique (private) memory of this process in MB"""
+    fields = {}
+    try:
+        with open("/proc/self/smaps_rollup", "r") as file:
+            for line in file:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        return {"pid": os.getpid(), "available": False}
+
+    def megabytes(*names):
+        return round(sum(fields.get(name, 0) for name in names) / 1024, 1)
+
+    return {
+        "pid": os.getpid(),
+        "available": True,
+        "rss_mb": megabytes("Rss"),
+        "pss_mb": megabytes("Pss"),
+        "unique_mb": megabytes("Private_Clean", "Private_Dirty"),
+        "shared_mb": megabytes("Shared_Clean", "Shared_Dirty")
+    }
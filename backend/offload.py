@@ -0,0 +1,51 @@
+"""Run CPU-bound work off the gevent hub when serving with gevent workers.
+
+Under GUNICORN_WORKER_CLASS=gevent every request is a greenlet in one OS
+thread, so a long PDF parse, tokenization or model forward pass would stall
+every other request in the worker, including the ones only waiting on the
+LLM. run_offloaded() hands such work to the hub's native thread pool and
+parks just the calling greenlet until it finishes. Outside gevent it simply
+calls the function, so the sync and threaded workers behave as before.
+
+Blocking disk work that can wait on another process (SQLite busy timeouts,
+flock) goes through it too. Calls made from code that is already running in
+the pool run inline.
+"""
+import os
+import sys
+import threading
+from typing import Any, Callable
+
+# Native threads for CPU-bound work per worker; sized to the cores by default
+CPU_OFFLOAD_THREADS = int(os.environ.get("CPU_OFFLOAD_THREADS", os.cpu_count() or 4))
+
+# Set only while a pool thread runs offloaded work, and only visible to that thread
+_state = threading.local()
+
+
+def gevent_active() -> bool:
+    """True once gevent has monkey-patched threading in this process"""
+    monkey = sys.modules.get("gevent.monkey")
+    return monkey is not None and monkey.is_module_patched("threading")
+
+
+def run_offloaded(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Call func in the hub's thread pool under gevent, or inline otherwise"""
+    if not gevent_active() or getattr(_state, "offloaded", False):
+        return func(*args, **kwargs)
+
+    from gevent import get_hub
+
+    pool = get_hub().threadpool
+    if pool.maxsize != CPU_OFFLOAD_THREADS:
+        pool.maxsize = CPU_OFFLOAD_THREADS
+    return pool.apply(_call_offloaded, (func, args, kwargs))
+
+
+def _call_offloaded(func: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+    """Run func in a pool thread, marked so nested run_offloaded() calls stay inline"""
+    _state.offloaded = True
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _state.offloaded = False
@@ -0,0 +1,211 @@
+"""Learned candidate ranking over numeric feature vectors.
+
+Each candidate is turned into a fixed-order feature vector (FEATURE_NAMES)
+built from compare_requirements, the experience and education extractors and
+the JobBERT similarity to the job post. All candidates for a job are then
+scored with one vectorized predict call and returned best first.
+
+The scorer is a gradient-boosted classifier trained offline on labeled
+hiring outcomes (scripts/train_ranker.py) and loaded from RANKING_MODEL_PATH.
+Without a trained model, the weighted 0.6/0.4 formula of
+compare_requirements is applied to the whole matrix instead, so rankings
+stay consistent with the per-candidate score.
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from main import compare_requirements, get_bert_embeddings, normalize_rows, perform_resume_analysis
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "ranking_model.joblib")
+
+# Bump when FEATURE_NAMES or how they are computed changes; older models are then ignored
+FEATURE_VERSION = "1"
+FEATURE_NAMES = [
+    "skill_match",
+    "matched_skills",
+    "missing_skills",
+    "hard_skills",
+    "soft_skills",
+    "education_level",
+    "years_experience",
+    "required_years",
+    "years_surplus",
+    "semantic_similarity",
+    "certifications",
+    "heuristic_score"
+]
+FEATURE_INDEX = {name: index for index, name in enumerate(FEATURE_NAMES)}
+
+EDUCATION_RANKS = {"PhD": 3.0, "Master's": 2.0, "Bachelor's": 1.0, "Associate/Diploma": 0.5}
+DEGREES = ("Bachelor's", "Master's", "PhD")
+
+# The regex extractors sometimes read a stray number as years; cap the outliers
+MAX_YEARS = 50
+
+# compare_requirements' fixed weights and threshold, used when no model is trained
+HEURISTIC_WEIGHTS = {"skills": 0.6, "education": 0.4}
+HEURISTIC_THRESHOLD = 0.7
+MODEL_THRESHOLD = float(os.environ.get("RANKING_QUALIFIED_THRESHOLD", 0.5))
+
+
+def candidate_features(profile, resume_analysis: Dict[str, Any], similarity: float) -> np.ndarray:
+    """Feature vector for one candidate against a job profile (see FEATURE_NAMES)"""
+    comparison = compare_requirements(profile, resume_analysis)
+    required_skills = getattr(profile, "required_skills", None)
+    if required_skills is None:
+        required_skills = {skill.lower() for skill in profile["skills"]["hard_skills"]}
+    missing = len(comparison["skill_match"]["missing"])
+
+    levels = resume_analysis["education"]["levels"]
+    years = min(resume_analysis["experience"]["years"], MAX_YEARS)
+    required_years = min(profile["experience"]["years"], MAX_YEARS)
+
+    return np.array([
+        comparison["skill_match"]["match_percentage"] / 100,
+        len(required_skills) - missing,
+        missing,
+        len(resume_analysis["skills"]["hard_skills"]),
+        len(resume_analysis["skills"]["soft_skills"]),
+        max((EDUCATION_RANKS.get(level, 0.0) for level in levels), default=0.0),
+        years,
+        required_years,
+        years - required_years,
+        similarity,
+        len(resume_analysis["certifications"]),
+        comparison["overall_match"]["score"] / 100
+    ], dtype=np.float32)
+
+
+def heuristic_scores(features: np.ndarray) -> np.ndarray:
+    """compare_requirements' weighted score for every row at once, in [0, 1]"""
+    skill = features[:, FEATURE_INDEX["skill_match"]]
+    # Same rule as compare_requirements: any degree scores 1.0, none 0.5
+    education = np.where(features[:, FEATURE_INDEX["education_level"]] >= 1.0, 1.0, 0.5)
+    return skill * HEURISTIC_WEIGHTS["skills"] + education * HEURISTIC_WEIGHTS["education"]
+
+
+class RankingModel:
+    """Gradient-boosted classifier predicting a positive outcome from the features"""
+
+    def __init__(self, estimator=None, metadata: Dict[str, Any] = None):
+        self.estimator = estimator
+        self.metadata = metadata or {}
+
+    @classmethod
+    def train(cls, features: np.ndarray, labels: np.ndarray, **params: Any) -> "RankingModel":
+        from sklearn.ensemble import HistGradientBoostingClassifier
+
+        settings = {"max_iter": 200, "learning_rate": 0.05, "max_leaf_nodes": 15,
+                    "l2_regularization": 1.0, "early_stopping": "auto", "random_state": 0}
+        settings.update(params)
+        estimator = HistGradientBoostingClassifier(**settings)
+        estimator.fit(features, labels)
+        return cls(estimator, {
+            "feature_names": FEATURE_NAMES,
+            "feature_version": FEATURE_VERSION,
+            "trained_at": time.time(),
+            "training_rows": int(len(labels)),
+            "positive_rate": float(np.mean(labels)),
+            "params": settings
+        })
+
+    def score(self, features: np.ndarray) -> np.ndarray:
+        """Probability of a positive outcome for every row, in one call"""
+        return self.estimator.predict_proba(features)[:, 1]
+
+    def save(self, path: str) -> None:
+        import joblib
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump({"estimator": self.estimator, "metadata": self.metadata}, tmp_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["RankingModel"]:
+        """The model at path, or None if it is missing or was trained on other features"""
+        if not os.path.exists(path):
+            return None
+        try:
+            import joblib
+
+            saved = joblib.load(path)
+        except Exception as e:
+            print(f"Warning: Could not load ranking model {path}: {str(e)}")
+            return None
+        metadata = saved.get("metadata", {})
+        if metadata.get("feature_version") != FEATURE_VERSION or metadata.get("feature_names") != FEATURE_NAMES:
+            print(f"Warning: Ignoring ranking model {path}, trained on different features")
+            return None
+        return cls(saved["estimator"], metadata)
+
+
+_model = None
+_model_loaded = False
+_model_lock = threading.Lock()
+
+
+def get_ranking_model() -> Optional[RankingModel]:
+    """Process-wide model from RANKING_MODEL_PATH; None means use the heuristic"""
+    global _model, _model_loaded
+    if not _model_loaded:
+        with _model_lock:
+            if not _model_loaded:
+                _model = RankingModel.load(os.environ.get("RANKING_MODEL_PATH", DEFAULT_MODEL_PATH))
+                _model_loaded = True
+    return _model
+
+
+def rank_features(candidate_ids: Sequence[str], features: np.ndarray,
+                  model: RankingModel = None) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Score and sort every candidate in one pass.
+
+    Returns the scorer used ("model" or "heuristic") and the candidates best
+    first, each with its rank, score, qualified flag and features.
+    """
+    features = np.asarray(features, dtype=np.float32).reshape(-1, len(FEATURE_NAMES))
+    if model is None:
+        model = get_ranking_model()
+    if model is not None:
+        scorer, scores, threshold = "model", model.score(features), MODEL_THRESHOLD
+    else:
+        scorer, scores, threshold = "heuristic", heuristic_scores(features), HEURISTIC_THRESHOLD
+
+    # Stable, so tied candidates keep their submission order
+    order = np.argsort(-scores, kind="stable")
+    ranked = [{
+        "candidate_id": candidate_ids[index],
+        "rank": rank,
+        "score": round(float(scores[index]), 4),
+        "qualified": bool(scores[index] >= threshold),
+        "features": dict(zip(FEATURE_NAMES, features[index].tolist()))
+    } for rank, index in enumerate(order.tolist(), start=1)]
+    return scorer, ranked
+
+
+def resume_features(job_post: str, resume_texts: Sequence[str]) -> np.ndarray:
+    """Feature matrix for resumes against one job post, embedding them in batches"""
+    from jobprofile import get_job_profile
+    from models import get_jobbert
+
+    tokenizer, model = get_jobbert()
+    profile = get_job_profile(job_post, model, tokenizer)
+    analyses = [perform_resume_analysis(text) for text in resume_texts]
+    similarities = normalize_rows(get_bert_embeddings(list(resume_texts), model, tokenizer)) \
+        @ normalize_rows(profile.embedding)[0]
+    return np.stack([
+        candidate_features(profile, analysis, float(similarity))
+        for analysis, similarity in zip(analyses, similarities)
+    ]) if analyses else np.empty((0, len(FEATURE_NAMES)), dtype=np.float32)
+
+
+def rank_resumes(job_post: str, resumes: Sequence[Tuple[str, str]]) -> Dict[str, Any]:
+    """Rank (candidate_id, resume_text) pairs for a job post, best first"""
+    candidate_ids = [candidate_id for candidate_id, _ in resumes]
+    scorer, ranked = rank_features(candidate_ids, resume_features(job_post, [text for _, text in resumes]))
+    return {"scorer": scorer, "candidates": ranked}
@@ -0,0 +1,192 @@
+"""Content-addressed cache for full evaluation results.
+
+Results are keyed on a hash of the normalized resume text, the job post, the
+prompt version and the model, and kept in two tiers: a small in-process LRU
+and a persistent SQLite file shared by every worker on the box. Disk access
+goes through offload.run_offloaded, so under gevent a query waiting on
+another process's write lock parks only the calling greenlet.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from offload import run_offloaded
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "results.sqlite3")
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so cosmetic extraction differences hit the same entry"""
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def make_cache_key(resume_text: str, job_post: str, prompt_version: str, model: str) -> str:
+    """Hash everything that can change the LLM output into a single key"""
+    digest = hashlib.sha256()
+    for part in (prompt_version, model, normalize_text(job_post), normalize_text(resume_text)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Two-tier (memory LRU + SQLite) cache with TTL and size-bounded eviction"""
+
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH, max_memory_items: int = 256,
+                 max_disk_items: int = 10000, ttl: float = 7 * 24 * 3600):
+        self.path = path
+        self.max_memory_items = max_memory_items
+        self.max_disk_items = max_disk_items
+        self.ttl = ttl
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_enabled = False
+        self._conn = None
+        self._conn_pid = None
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "expired": 0
+        }
+
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                conn = self._connect()
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                    "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at)")
+                conn.commit()
+                self._disk_enabled = True
+            except sqlite3.Error as e:
+                print(f"Warning: Result cache disk tier disabled: {str(e)}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Per-process connection; SQLite handles must not be used across a fork"""
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        """Build the cache from RESULT_CACHE_* environment variables"""
+        return cls(
+            path=os.environ.get("RESULT_CACHE_PATH", DEFAULT_CACHE_PATH) or None,
+            max_memory_items=int(os.environ.get("RESULT_CACHE_MEMORY_ITEMS", 256)),
+            max_disk_items=int(os.environ.get("RESULT_CACHE_DISK_ITEMS", 10000)),
+            ttl=float(os.environ.get("RESULT_CACHE_TTL", 7 * 24 * 3600))
+        )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if now - created_at <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return json.loads(value)
+                del self._memory[key]
+                self._counters["expired"] += 1
+
+            if self._disk_enabled:
+                value = run_offloaded(self._get_disk, key, now)
+                if value is not None:
+                    return json.loads(value)
+
+            self._counters["misses"] += 1
+            return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.time()
+        serialized = json.dumps(value)
+        with self._lock:
+            self._remember(key, now, serialized)
+            self._counters["sets"] += 1
+
+            if self._disk_enabled:
+                run_offloaded(self._set_disk, key, serialized, now)
+
+    def _get_disk(self, key: str, now: float) -> Optional[str]:
+        """Read a live entry from the disk tier into memory (lock held)"""
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                value, created_at = row
+                if now - created_at <= self.ttl:
+                    conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+                    conn.commit()
+                    self._remember(key, created_at, value)
+                    self._counters["disk_hits"] += 1
+                    return value
+                conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                conn.commit()
+                self._counters["expired"] += 1
+        except sqlite3.Error as e:
+            print(f"Warning: Result cache read failed: {str(e)}")
+        return None
+
+    def _set_disk(self, key: str, serialized: str, now: float) -> None:
+        """Write an entry to the disk tier and evict expired and excess rows (lock held)"""
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, serialized, now, now)
+            )
+            conn.execute("DELETE FROM results WHERE created_at < ?", (now - self.ttl,))
+            evicted = conn.execute(
+                "DELETE FROM results WHERE key IN ("
+                "SELECT key FROM results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_disk_items,)
+            ).rowcount
+            self._counters["disk_evictions"] += max(evicted, 0)
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"Warning: Result cache write failed: {str(e)}")
+
+    def _remember(self, key: str, created_at: float, value: str) -> None:
+        """Insert into the memory tier, evicting least recently used entries (lock held)"""
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+            self._counters["memory_evictions"] += 1
+
+    def _count_disk(self) -> Optional[int]:
+        try:
+            return self._connect().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        except sqlite3.Error:
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_items"] = len(self._memory)
+            stats["disk_items"] = None
+            if self._disk_enabled:
+                stats["disk_items"] = run_offloaded(self._count_disk)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hits"] = hits
+        stats["hit_ratio"] = hits / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,345 @@
+"""Benchmark the resume pipeline stage by stage, with the LLM replayed from disk.
+
+Runs the PDFs in dataset/ plus a seeded synthetic corpus through PDF text
+extraction (file and in-memory paths), the spaCy parse, every extract_*
+function, get_bert_embedding, compare_requirements, the aianalysis parsers
+and analyze_with_ai end to end. The upstream LLM is replaced by recorded
+responses (scripts/fixtures/llm_responses.json), so no network or API key is
+needed and timings only cover our own code.
+
+For each stage it reports latency (mean, p50, p95), throughput and peak
+Python heap use. Peak memory comes from a separate tracemalloc pass, so the
+latency figures don't pay for tracing; allocations made by torch or other
+native code are not seen by tracemalloc, which is why the run also reports
+the process' max RSS.
+
+    python scripts/benchmark.py [--synthetic N] [--repeats N] [--stages a,b]
+    python scripts/benchmark.py --save-baseline            # writes cache/benchmark_baseline.json
+    python scripts/benchmark.py --compare [PATH] [--tolerance 0.25]
+
+--compare exits with status 1 if any stage's p50 latency or peak memory grew
+by more than the tolerance over the baseline. Baselines are machine-specific;
+compare runs from the same box and corpus only.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET_DIR = os.path.join(BACKEND_DIR, "dataset")
+DEFAULT_RESPONSES = os.path.join(BACKEND_DIR, "scripts", "fixtures", "llm_responses.json")
+DEFAULT_BASELINE = os.path.join(BACKEND_DIR, "cache", "benchmark_baseline.json")
+
+# Differences below these are noise, whatever the relative change
+MIN_LATENCY_DELTA_MS = 0.5
+MIN_MEMORY_DELTA_KB = 64
+
+# The parsers are fast and have a single input, so they get more samples
+PARSE_SAMPLES = 50
+
+FIRST_NAMES = ["Maria", "James", "Wei", "Priya", "Ahmed", "Sofia", "Daniel", "Aisha", "Lucas", "Emma"]
+LAST_NAMES = ["Garcia", "Smith", "Chen", "Patel", "Hassan", "Rossi", "Kim", "Okafor", "Silva", "Novak"]
+CITIES = ["Austin, TX", "Seattle, WA", "Chicago, IL", "Boston, MA", "Denver, CO", "Atlanta, GA"]
+TITLES = ["Software Engineer", "Data Analyst", "Backend Developer", "Mobile Developer", "DevOps Engineer"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Enterprises"]
+DEGREES = ["Bachelor of Science in Computer Science", "Master of Science in Data Science",
+           "Bachelor of Arts in Economics", "PhD in Electrical Engineering"]
+SCHOOLS = ["University of Texas", "Georgia Institute of Technology", "University of Washington",
+           "Boston University", "University of Colorado"]
+VERBS = ["Built", "Led", "Designed", "Migrated", "Automated", "Optimized", "Maintained", "Launched"]
+OBJECTS = ["a payments service", "the data pipeline", "an internal dashboard", "the mobile checkout flow",
+           "CI/CD for 12 services", "a recommendation engine", "the reporting API", "customer onboarding"]
+
+
+def synthetic_resume(rng: random.Random, hard_skills: List[str], soft_skills: List[str]) -> List[str]:
+    """Lines of a plausible resume; longer ones spill over several pages"""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    lines = [
+        name,
+        f"{name.split()[0].lower()}.{name.split()[1].lower()}@example.com | (555) {rng.randint(100, 999)}-"
+        f"{rng.randint(1000, 9999)} | {rng.choice(CITIES)}",
+        "",
+        "SUMMARY",
+        f"{rng.choice(TITLES)} with {rng.randint(2, 15)} years of experience and strong knowledge of "
+        f"{', '.join(rng.sample(hard_skills, 3))}.",
+        "",
+        "SKILLS",
+        f"Technical: {', '.join(rng.sample(hard_skills, rng.randint(6, 14)))}",
+        f"Soft skills: {', '.join(rng.sample(soft_skills, rng.randint(3, 6)))}",
+        "",
+        "EXPERIENCE"
+    ]
+    year = 2024
+    for _ in range(rng.randint(2, 6)):
+        start = year - rng.randint(1, 4)
+        lines.append(f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)} ({start} - {year})")
+        for _ in range(rng.randint(3, 6)):
+            lines.append(f"• {rng.choice(VERBS)} {rng.choice(OBJECTS)} using "
+                         f"{rng.choice(hard_skills)}, improving throughput by {rng.randint(5, 80)}%")
+        year = start
+    lines += ["", "EDUCATION", f"{rng.choice(DEGREES)}, {rng.choice(SCHOOLS)}, {year - rng.randint(0, 3)}",
+              "", "CERTIFICATIONS", f"Certified {rng.choice(hard_skills).title()} Professional",
+              "", "LANGUAGES", f"English, {rng.choice(['Spanish', 'French', 'Mandarin', 'Hindi', 'German'])}"]
+    return lines
+
+
+def render_pdf(lines: List[str], path: str) -> None:
+    """Write lines to a letter-size PDF with a running header and page numbers"""
+    import fitz
+
+    doc = fitz.open()
+    page = None
+    y = 0
+    for line in lines:
+        if page is None or y > 740:
+            page = doc.new_page(width=612, height=792)
+            page.insert_text((72, 40), lines[0], fontsize=8)
+            page.insert_text((290, 770), f"Page {doc.page_count}", fontsize=8)
+            y = 72
+        page.insert_text((72, y), line, fontsize=10)
+        y += 14
+    doc.save(path)
+    doc.close()
+
+
+def build_corpus(synthetic: int, seed: int, workdir: str) -> List[Dict[str, Any]]:
+    """Dataset PDFs plus `synthetic` generated ones, as name/path/bytes records"""
+    paths = sorted(os.path.join(DATASET_DIR, name) for name in os.listdir(DATASET_DIR) if name.endswith(".pdf"))
+
+    with open(os.path.join(BACKEND_DIR, "data", "skills.json"), encoding="utf-8") as f:
+        skills = json.load(f)
+    hard_skills, soft_skills = sorted(skills["hard_skills"]), sorted(skills["soft_skills"])
+    rng = random.Random(seed)
+    for number in range(synthetic):
+        path = os.path.join(workdir, f"synthetic-{number:03d}.pdf")
+        render_pdf(synthetic_resume(rng, hard_skills, soft_skills), path)
+        paths.append(path)
+
+    corpus = []
+    for path in paths:
+        with open(path, "rb") as f:
+            corpus.append({"name": os.path.basename(path), "path": path, "data": f.read()})
+    return corpus
+
+
+class ReplayClient:
+    """Stands in for LLMClient, answering each prompt with its recorded response"""
+
+    def __init__(self, responses: Dict[str, Any]):
+        self.responses = responses
+
+    def chat(self, deadline: float = None, **kwargs: Any):
+        if "response_format" in kwargs:
+            content = self.responses["structured"]
+        elif "HR perspective" in kwargs["messages"][0]["content"]:
+            content = self.responses["hr"]
+        else:
+            content = self.responses["technical"]
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason="stop")],
+            created=self.responses["created"],
+            model=self.responses["model"]
+        )
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_stage(func: Callable[[Any], Any], inputs: List[Any], repeats: int) -> Dict[str, float]:
+    """Time func over every input, then measure its peak heap in one traced pass"""
+    # Warm-up: lazy model loads and caches belong to startup, not to the stage
+    func(inputs[0])
+
+    samples = []
+    for _ in range(repeats):
+        for item in inputs:
+            start = time.perf_counter()
+            func(item)
+            samples.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    for item in inputs:
+        func(item)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "n": len(samples),
+        "mean_ms": statistics.mean(samples) * 1000,
+        "p50_ms": percentile(samples, 0.5) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "throughput": len(samples) / sum(samples),
+        "peak_kb": peak / 1024
+    }
+
+
+def build_stages(corpus: List[Dict[str, Any]], responses: Dict[str, Any]) -> List[tuple]:
+    """(name, func, inputs) for every stage, in pipeline order"""
+    import aianalysis
+    import main
+    from app import read_pdf_text
+    from models import get_jobbert
+
+    texts = [read_pdf_text(document["data"]) for document in corpus]
+
+    # Parse and sentence-split up front so extractors are timed on their own
+    documents = [main.analyze_text(text) for text in texts]
+    for document in documents:
+        document.doc, document.sentence_starts
+    with open(os.path.join(DATASET_DIR, "jobpost.txt"), encoding="utf-8") as f:
+        job_post = f.read()
+    job_requirements = main.analyze_job_requirements(job_post)
+    analyses = [main.perform_resume_analysis(document) for document in documents]
+
+    tokenizer, model = None, None
+
+    def embed(text):
+        nonlocal tokenizer, model
+        if model is None:
+            tokenizer, model = get_jobbert()
+        return main.get_bert_embedding(text, model, tokenizer)
+
+    def evaluate(mode):
+        def run(text):
+            aianalysis.AI_ANALYSIS_MODE = mode
+            return aianalysis.analyze_with_ai(job_post=job_post, resume_text=text)
+        return run
+
+    created, model_name = responses["created"], responses["model"]
+    stages = [
+        ("pdf_text_file", lambda document: main.extract_text_from_pdf(document["path"]), corpus),
+        ("pdf_text_stream", lambda document: read_pdf_text(document["data"]), corpus),
+        ("spacy_parse", lambda text: main.analyze_text(text).doc, texts)
+    ]
+    for extractor in ["personal_info", "summary", "skills", "education", "experience",
+                      "certifications", "projects", "languages", "achievements"]:
+        stages.append((f"extract_{extractor}", getattr(main, f"extract_{extractor}"), documents))
+    stages += [
+        ("perform_resume_analysis", main.perform_resume_analysis, texts),
+        ("get_bert_embedding", embed, texts),
+        ("compare_requirements", lambda analysis: main.compare_requirements(job_requirements, analysis), analyses),
+        ("parse_hr_content", lambda content: aianalysis.parse_hr_content(content, "stop", created, model_name),
+         [responses["hr"]] * PARSE_SAMPLES),
+        ("parse_technical_content", aianalysis.parse_technical_content, [responses["technical"]] * PARSE_SAMPLES),
+        ("parse_structured_content",
+         lambda content: aianalysis.parse_structured_content(content, "stop", created, model_name),
+         [responses["structured"]] * PARSE_SAMPLES),
+        ("analyze_with_ai", evaluate("dual"), texts),
+        ("analyze_with_ai_structured", evaluate("structured"), texts)
+    ]
+    return stages
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Stages whose p50 latency or peak memory regressed past the tolerance"""
+    if baseline.get("corpus") != results["corpus"]:
+        print(f"Warning: Baseline corpus {baseline.get('corpus')} differs from this run's {results['corpus']}")
+    regressions = []
+    for name, current in results["stages"].items():
+        previous = baseline["stages"].get(name)
+        if previous is None:
+            continue
+        for field, unit, floor in (("p50_ms", "ms", MIN_LATENCY_DELTA_MS), ("peak_kb", "KB", MIN_MEMORY_DELTA_KB)):
+            delta = current[field] - previous[field]
+            if delta > floor and current[field] > previous[field] * (1 + tolerance):
+                regressions.append(f"{name}: {field} {previous[field]:.2f} -> {current[field]:.2f} {unit} "
+                                   f"(+{delta / previous[field] * 100 if previous[field] else float('inf'):.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--synthetic", type=int, default=20, help="Generated resumes added to the corpus (default: 20)")
+    parser.add_argument("--seed", type=int, default=13, help="Seed for the synthetic corpus")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed passes over the corpus per stage")
+    parser.add_argument("--stages", help="Comma-separated stage names or prefixes to run (default: all)")
+    parser.add_argument("--model", help="JobBERT model name or path (default: JOBBERT_MODEL)")
+    parser.add_argument("--responses", default=DEFAULT_RESPONSES, help="Recorded LLM responses to replay")
+    parser.add_argument("--output", help="Also write this run's results to a JSON file")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, metavar="PATH",
+                        help=f"Save this run as the baseline (default path: {DEFAULT_BASELINE})")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, metavar="PATH",
+                        help="Compare against a saved baseline and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative growth before a stage counts as regressed (default: 0.25)")
+    args = parser.parse_args()
+
+    # Settings are read at import time, so they go in before the pipeline loads.
+    # The caches are off so every call does the real work.
+    if args.model:
+        os.environ["JOBBERT_MODEL"] = args.model
+    os.environ.setdefault("EMBEDDING_CACHE_ENABLED", "0")
+    os.environ["RESULT_CACHE_ENABLED"] = "0"
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    sys.path.insert(0, BACKEND_DIR)
+
+    import aianalysis
+
+    with open(args.responses, encoding="utf-8") as f:
+        responses = json.load(f)
+    aianalysis.client = ReplayClient(responses)
+
+    with tempfile.TemporaryDirectory(prefix="hireflow-bench-") as workdir:
+        corpus = build_corpus(args.synthetic, args.seed, workdir)
+        print(f"Corpus: {len(corpus)} PDFs ({len(corpus) - args.synthetic} from dataset/, "
+              f"{args.synthetic} synthetic, seed {args.seed})")
+        stages = build_stages(corpus, responses)
+        wanted = args.stages.split(",") if args.stages else None
+
+        results = {
+            "created": time.time(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "corpus": {"dataset": len(corpus) - args.synthetic, "synthetic": args.synthetic, "seed": args.seed},
+            "repeats": args.repeats,
+            "stages": {}
+        }
+        print(f"{'stage':<28}{'n':>6}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'items/s':>10}{'peak KB':>10}")
+        for name, func, inputs in stages:
+            if wanted and not any(name.startswith(prefix) for prefix in wanted):
+                continue
+            stats = run_stage(func, inputs, args.repeats)
+            results["stages"][name] = stats
+            print(f"{name:<28}{stats['n']:>6}{stats['mean_ms']:>10.2f}{stats['p50_ms']:>10.2f}"
+                  f"{stats['p95_ms']:>10.2f}{stats['throughput']:>10.1f}{stats['peak_kb']:>10.0f}")
+
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results["max_rss_mb"] = max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    print(f"Max RSS: {results['max_rss_mb']:.0f} MB")
+
+    # Compare before saving, so --compare and --save-baseline can share a path
+    regressions = []
+    if args.compare:
+        if not os.path.exists(args.compare):
+            sys.exit(f"No baseline at {args.compare}; create one with --save-baseline")
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if not regressions:
+            print(f"No regressions beyond {args.tolerance * 100:.0f}% of {args.compare}")
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {path}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
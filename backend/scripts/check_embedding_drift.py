@@ -0,0 +1,84 @@
+"""Compare a quantized/ONNX embedding backend against fp32 PyTorch.
+
+Embeds the resumes and job post in dataset/ (whole documents plus their
+individual lines, to cover short inputs too) with both backends and reports
+per-text cosine similarity, latency and resident memory of each backend.
+Exits non-zero when the worst cosine similarity falls below --min-cosine.
+
+    python scripts/check_embedding_drift.py --backend int8
+    python scripts/check_embedding_drift.py --backend onnx --model jjzha/jobbert-base-cased
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import numpy as np  # noqa: E402
+
+from embeddings import EMBEDDING_BACKENDS, JOBBERT_MODEL_NAME, EmbeddingEngine, load_jobbert  # noqa: E402
+from main import extract_text_from_pdf, normalize_rows, read_job_post  # noqa: E402
+from models import memory_report  # noqa: E402
+
+
+def load_corpus(dataset_dir: str, max_lines: int):
+    documents = [read_job_post(path) for path in sorted(glob.glob(os.path.join(dataset_dir, "*.txt")))]
+    documents += [extract_text_from_pdf(path) for path in sorted(glob.glob(os.path.join(dataset_dir, "*.pdf")))]
+    documents = [document for document in documents if document]
+    lines = [line.strip() for document in documents for line in document.splitlines() if len(line.strip()) > 20]
+    return documents + lines[:max_lines]
+
+
+def timed_embed(engine: EmbeddingEngine, texts, repeats: int):
+    engine.embed(texts[:2])  # warm-up
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        vectors = engine.embed(texts)
+        best = min(best, time.perf_counter() - start)
+    return vectors, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=[b for b in EMBEDDING_BACKENDS if b != "torch"], default="int8")
+    parser.add_argument("--model", default=JOBBERT_MODEL_NAME)
+    parser.add_argument("--dataset", default=os.path.join(BACKEND_DIR, "dataset"))
+    parser.add_argument("--max-lines", type=int, default=200, help="Short line-level texts to include")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--min-cosine", type=float, default=0.99)
+    args = parser.parse_args()
+
+    texts = load_corpus(args.dataset, args.max_lines)
+    print(f"Corpus: {len(texts)} texts from {args.dataset}")
+
+    results = {}
+    for backend in ("torch", args.backend):
+        before = memory_report().get("rss_mb", 0)
+        tokenizer, model = load_jobbert(args.model, backend=backend)
+        after = memory_report().get("rss_mb", 0)
+        # No cache: every text must really go through this backend
+        engine = EmbeddingEngine(model, tokenizer, cache=None)
+        vectors, seconds = timed_embed(engine, texts, args.repeats)
+        results[backend] = {"vectors": normalize_rows(vectors), "seconds": seconds, "rss_mb": after - before}
+
+    cosine = np.sum(results["torch"]["vectors"] * results[args.backend]["vectors"], axis=1)
+    worst = int(np.argmin(cosine))
+    for backend, result in results.items():
+        print(f"{backend:>10}: {result['seconds'] * 1000:8.1f} ms for {len(texts)} texts, "
+              f"+{result['rss_mb']:.0f} MB RSS on load")
+    print(f"Speedup: {results['torch']['seconds'] / results[args.backend]['seconds']:.2f}x")
+    print(f"Cosine vs fp32: mean {cosine.mean():.5f}, min {cosine.min():.5f}, "
+          f"p01 {np.percentile(cosine, 1):.5f}")
+    print(f"Worst text: {texts[worst][:80]!r}")
+
+    if cosine.min() < args.min_cosine:
+        print(f"FAIL: minimum cosine {cosine.min():.5f} below {args.min_cosine}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Check that booting the web app stays cheap.
+
+Imports `app` in a fresh interpreter, reports how long it took, and fails if
+the import exceeds the budget or pulled in any of the heavy ML dependencies
+that should only load on first use.
+
+    python scripts/check_import_time.py [--budget SECONDS] [--module app]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must not be imported just by booting the web app
+HEAVY_MODULES = ["torch", "transformers", "spacy", "sklearn", "nltk", "scipy"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = sorted(name for name in {heavy!r} if name in sys.modules)
+print(json.dumps({{"seconds": elapsed, "heavy_modules": heavy, "modules_loaded": len(sys.modules)}}))
+"""
+
+
+def measure(module: str) -> dict:
+    env = dict(os.environ)
+    # Keep the probe from touching the real caches
+    env.setdefault("RESULT_CACHE_ENABLED", "0")
+    env.setdefault("OPENAI_API_KEY", "import-time-probe")
+    process = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if process.returncode != 0:
+        sys.exit(f"import {module} failed:\n{process.stderr}")
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app", help="Module to import (default: app)")
+    parser.add_argument("--budget", type=float, default=float(os.environ.get("IMPORT_TIME_BUDGET", 2.0)),
+                        help="Maximum import time in seconds (default: 2.0 or IMPORT_TIME_BUDGET)")
+    parser.add_argument("--runs", type=int, default=3, help="Take the best of this many cold imports")
+    args = parser.parse_args()
+
+    results = [measure(args.module) for _ in range(args.runs)]
+    best = min(results, key=lambda result: result["seconds"])
+    print(f"import {args.module}: {best['seconds'] * 1000:.0f} ms "
+          f"({best['modules_loaded']} modules, budget {args.budget * 1000:.0f} ms)")
+
+    failed = False
+    if best["heavy_modules"]:
+        print(f"FAIL: heavy modules imported eagerly: {', '.join(best['heavy_modules'])}")
+        failed = True
+    if best["seconds"] > args.budget:
+        print("FAIL: import time over budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""Local stand-in for the DeepSeek chat-completions API, for load tests.
+
+Serves POST /v1/chat/completions (plain and streamed) with the recorded
+responses in scripts/fixtures/llm_responses.json, picked the way the real
+model would answer: JSON for response_format requests, the HR sections for the
+HR prompt and the technical sections otherwise. Latency is drawn from a
+configurable distribution, and a share of requests can fail with HTTP errors
+or hang past the client's timeout, so retries and deadlines are exercised too.
+GET /stats reports what the server has seen.
+
+    python scripts/fake_llm_server.py [--port 8765] [--latency lognormal --latency-mean 2.0 --latency-spread 0.5]
+                                      [--error-rate 0.05 --error-codes 429,500,503] [--hang-rate 0.01]
+
+Point the app at it with OPENAI_API_BASE=http://127.0.0.1:8765/v1.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_RESPONSES = os.path.join(BACKEND_DIR, "scripts", "fixtures", "llm_responses.json")
+
+LATENCY_DISTRIBUTIONS = ["fixed", "uniform", "normal", "lognormal", "exponential"]
+
+
+def draw_latency(rng: random.Random, distribution: str, mean: float, spread: float) -> float:
+    """Seconds before the first byte; spread is the std dev (sigma for lognormal)"""
+    if distribution == "uniform":
+        return rng.uniform(max(mean - spread, 0), mean + spread)
+    if distribution == "normal":
+        return max(rng.gauss(mean, spread), 0)
+    if distribution == "lognormal":
+        # Pick mu so the distribution's mean is `mean`; latencies are long-tailed
+        return rng.lognormvariate(math.log(mean) - spread ** 2 / 2, spread) if mean > 0 else 0
+    if distribution == "exponential":
+        return rng.expovariate(1 / mean) if mean > 0 else 0
+    return mean
+
+
+class FakeLLM:
+    """Response selection, fault injection and counters shared by all handler threads"""
+
+    def __init__(self, responses: dict, args: argparse.Namespace):
+        self.responses = responses
+        self.args = args
+        self._rng = random.Random(args.seed)
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "streamed": 0,
+            "errors": {},
+            "hung": 0,
+            "in_flight": 0,
+            "peak_in_flight": 0,
+            "completion_tokens": 0
+        }
+
+    def content_for(self, request: dict) -> str:
+        if (request.get("response_format") or {}).get("type") == "json_object":
+            return self.responses["structured"]
+        prompt = request["messages"][-1]["content"]
+        return self.responses["hr"] if "HR perspective" in prompt else self.responses["technical"]
+
+    def plan(self):
+        """Decide one request's fate: (latency, error status or None, hang)"""
+        with self._lock:
+            latency = draw_latency(self._rng, self.args.latency, self.args.latency_mean, self.args.latency_spread)
+            roll = self._rng.random()
+            status = None
+            if roll < self.args.error_rate:
+                status = self._rng.choice(self.args.error_codes)
+            hang = self.args.error_rate <= roll < self.args.error_rate + self.args.hang_rate
+        return latency, status, hang
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.stats[name] += amount
+            if name == "in_flight":
+                self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.stats["in_flight"])
+
+    def count_error(self, status: int) -> None:
+        with self._lock:
+            self.stats["errors"][str(status)] = self.stats["errors"].get(str(status), 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return json.loads(json.dumps(self.stats))
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    fake: FakeLLM = None
+
+    def log_message(self, format, *args):
+        if self.fake.args.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, body: dict, headers: dict = None) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            self._send_json(200, self.fake.snapshot())
+        elif self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": self.fake.responses["model"], "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": f"No route for {self.path}"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"No route for {self.path}"}})
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        fake = self.fake
+        fake.count("requests")
+        fake.count("in_flight")
+        try:
+            latency, status, hang = fake.plan()
+            if hang:
+                # Outlast the client's timeout, then drop the connection
+                fake.count("hung")
+                time.sleep(fake.args.hang_seconds)
+                self.close_connection = True
+                return
+            time.sleep(latency)
+            if status is not None:
+                fake.count_error(status)
+                headers = {"Retry-After": str(fake.args.retry_after)} if status == 429 else {}
+                self._send_json(status, {"error": {"message": f"Injected {status}", "type": "fake_error"}}, headers)
+                return
+
+            content = fake.content_for(request)
+            words = content.split(" ")
+            fake.count("completion_tokens", len(words))
+            if request.get("stream"):
+                fake.count("streamed")
+                self._stream(request, words)
+            else:
+                self._send_json(200, {
+                    "id": f"chatcmpl-{uuid.uuid4().hex}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", fake.responses["model"]),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop"
+                    }],
+                    "usage": {
+                        "prompt_tokens": len(request["messages"][-1]["content"].split()),
+                        "completion_tokens": len(words),
+                        "total_tokens": len(request["messages"][-1]["content"].split()) + len(words)
+                    }
+                })
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (deadline or cancelled stream)
+            pass
+        finally:
+            fake.count("in_flight", -1)
+
+    def _stream(self, request: dict, words: list) -> None:
+        """Send the content word by word as SSE chunks at --stream-rate words/s"""
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        model = request.get("model", self.fake.responses["model"])
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def event(delta: dict, finish_reason=None) -> bytes:
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }
+            return f"data: {json.dumps(chunk)}\n\n".encode()
+
+        rate = self.fake.args.stream_rate
+        for index, word in enumerate(words):
+            self._write_chunk(event({"content": word if index == len(words) - 1 else word + " "}))
+            if rate > 0:
+                time.sleep(1 / rate)
+        self._write_chunk(event({}, "stop"))
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--responses", default=DEFAULT_RESPONSES, help="Recorded responses to serve")
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal",
+                        help="Time-to-first-byte distribution (default: lognormal)")
+    parser.add_argument("--latency-mean", type=float, default=2.0, help="Mean latency in seconds (default: 2.0)")
+    parser.add_argument("--latency-spread", type=float, default=0.5,
+                        help="Std dev in seconds, or sigma for lognormal (default: 0.5)")
+    parser.add_argument("--stream-rate", type=float, default=200, help="Streamed words per second (default: 200)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with an error")
+    parser.add_argument("--error-codes", default="429,500,503", help="Error statuses to pick from (default: 429,500,503)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="Share of requests that never answer")
+    parser.add_argument("--hang-seconds", type=float, default=600, help="How long a hung request holds on")
+    parser.add_argument("--seed", type=int, help="Seed for latency and fault draws")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+    args.error_codes = [int(code) for code in args.error_codes.split(",") if code]
+
+    with open(args.responses, encoding="utf-8") as f:
+        Handler.fake = FakeLLM(json.load(f), args)
+
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    server.daemon_threads = True
+    print(f"Fake LLM on http://{args.host}:{server.server_port}/v1 ({args.latency} latency, "
+          f"mean {args.latency_mean}s, error rate {args.error_rate}, hang rate {args.hang_rate})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
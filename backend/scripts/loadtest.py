@@ -0,0 +1,223 @@
+"""Load-test /api/evaluate under the real gunicorn config against a fake LLM.
+
+Starts scripts/fake_llm_server.py and `gunicorn app:app -c gunicorn.conf.py`
+pointed at it, then, for each concurrency level, keeps that many clients
+posting multipart uploads (the dataset PDFs and jobpost.txt) for a fixed
+time. For every level it reports throughput, p50/p95/p99 latency and the
+error rate, so worker counts can be sized from measurements.
+
+    python scripts/loadtest.py [--concurrency 1,2,4,8,16] [--duration 30] [--workers 2] [--worker-class gevent]
+                               [--llm-latency 2.0] [--llm-error-rate 0.02] [--gunicorn-args "--threads 4"]
+    python scripts/loadtest.py --target http://127.0.0.1:10000   # an app that is already running
+
+The result cache is disabled in the spawned app unless --cache is given;
+otherwise every request after the first few would be a cache hit.
+"""
+import argparse
+import json
+import os
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET_DIR = os.path.join(BACKEND_DIR, "dataset")
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def wait_until_up(url: str, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            sys.exit(f"Process for {url} exited with status {process.returncode}")
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    sys.exit(f"{url} did not come up within {timeout:.0f}s")
+
+
+def start_fake_llm(args: argparse.Namespace) -> subprocess.Popen:
+    command = [
+        sys.executable, os.path.join(BACKEND_DIR, "scripts", "fake_llm_server.py"),
+        "--port", str(args.llm_port),
+        "--latency", args.llm_distribution,
+        "--latency-mean", str(args.llm_latency),
+        "--latency-spread", str(args.llm_spread),
+        "--error-rate", str(args.llm_error_rate),
+        "--seed", "1"
+    ]
+    process = subprocess.Popen(command)
+    wait_until_up(f"http://127.0.0.1:{args.llm_port}/stats", process, 15)
+    return process
+
+
+def start_app(args: argparse.Namespace, llm_base: str) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "PORT": str(args.port),
+        "WEB_CONCURRENCY": str(args.workers),
+        "GUNICORN_WORKER_CLASS": args.worker_class,
+        "OPENAI_API_BASE": llm_base,
+        "OPENAI_API_KEY": env.get("OPENAI_API_KEY", "loadtest"),
+        # Queue workers would compete with request threads for the LLM slots
+        "EVALUATION_QUEUE_WORKERS": "0"
+    })
+    if not args.cache:
+        env["RESULT_CACHE_ENABLED"] = "0"
+    command = [sys.executable, "-m", "gunicorn", "app:app", "-c", "gunicorn.conf.py"]
+    command += shlex.split(args.gunicorn_args or "")
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+    wait_until_up(f"http://127.0.0.1:{args.port}/test", process, args.startup_timeout)
+    return process
+
+
+def load_inputs() -> tuple:
+    resumes = []
+    for name in sorted(os.listdir(DATASET_DIR)):
+        if name.endswith(".pdf"):
+            with open(os.path.join(DATASET_DIR, name), "rb") as f:
+                resumes.append((name, f.read()))
+    with open(os.path.join(DATASET_DIR, "jobpost.txt"), encoding="utf-8") as f:
+        job_post = f.read()
+    return resumes, job_post
+
+
+def run_level(url: str, concurrency: int, duration: float, resumes: list, job_post: str,
+              timeout: float, form: Dict[str, str]) -> Dict[str, Any]:
+    """Keep `concurrency` clients busy for `duration` seconds and collect every outcome"""
+    latencies, errors = [], {}
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client(number: int) -> None:
+        sent = number
+        with httpx.Client(timeout=timeout) as http:
+            while time.monotonic() < stop_at:
+                name, data = resumes[sent % len(resumes)]
+                sent += concurrency
+                start = time.perf_counter()
+                try:
+                    response = http.post(url, files={"resume": (name, data, "application/pdf")},
+                                         data={"jobPost": job_post, **form})
+                    elapsed = time.perf_counter() - start
+                    if response.status_code != 200:
+                        error = f"HTTP {response.status_code}"
+                    else:
+                        body = response.json()
+                        # A 200 can still carry a failed analysis
+                        error = "analysis error" if body.get("error") or not body.get("technical_analysis") else None
+                except httpx.HTTPError as e:
+                    elapsed = time.perf_counter() - start
+                    error = type(e).__name__
+                with lock:
+                    if error:
+                        errors[error] = errors.get(error, 0) + 1
+                    else:
+                        latencies.append(elapsed)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(client, range(concurrency)))
+    elapsed = time.monotonic() - started
+
+    total = len(latencies) + sum(errors.values())
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "ok": len(latencies),
+        "errors": errors,
+        "error_rate": sum(errors.values()) / total if total else 0,
+        "throughput": len(latencies) / elapsed,
+        "p50_s": percentile(latencies, 0.5),
+        "p95_s": percentile(latencies, 0.95),
+        "p99_s": percentile(latencies, 0.99),
+        "elapsed_s": elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="1,2,4,8,16", help="Comma-separated client counts to step through")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds per concurrency level (default: 30)")
+    parser.add_argument("--timeout", type=float, default=180, help="Client timeout per request in seconds")
+    parser.add_argument("--target", help="Base URL of a running app; skips starting gunicorn and the fake LLM")
+    parser.add_argument("--port", type=int, default=10080, help="Port for the spawned app")
+    parser.add_argument("--workers", type=int, default=2, help="Gunicorn workers (WEB_CONCURRENCY)")
+    parser.add_argument("--worker-class", default=os.environ.get("GUNICORN_WORKER_CLASS", "sync"),
+                        help="Gunicorn worker class, e.g. sync or gevent (default: GUNICORN_WORKER_CLASS or sync)")
+    parser.add_argument("--gunicorn-args", help="Extra gunicorn arguments, e.g. \"--threads 4\"")
+    parser.add_argument("--startup-timeout", type=float, default=120, help="Seconds to wait for the app to boot")
+    parser.add_argument("--cache", action="store_true", help="Keep the result cache enabled")
+    parser.add_argument("--latency-budget", type=float, help="Send latencyBudget with every request")
+    parser.add_argument("--llm-base", help="Use this LLM API base instead of starting the fake server")
+    parser.add_argument("--llm-port", type=int, default=8765)
+    parser.add_argument("--llm-distribution", default="lognormal", help="Fake LLM latency distribution")
+    parser.add_argument("--llm-latency", type=float, default=2.0, help="Fake LLM mean latency in seconds")
+    parser.add_argument("--llm-spread", type=float, default=0.5, help="Fake LLM latency spread")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="Share of fake LLM calls that fail")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    processes = []
+    try:
+        base = args.target
+        if base is None:
+            llm_base = args.llm_base
+            if llm_base is None:
+                processes.append(start_fake_llm(args))
+                llm_base = f"http://127.0.0.1:{args.llm_port}/v1"
+            processes.append(start_app(args, llm_base))
+            base = f"http://127.0.0.1:{args.port}"
+        else:
+            wait_until_up(f"{base.rstrip('/')}/test", None, args.startup_timeout)
+
+        resumes, job_post = load_inputs()
+        form = {"latencyBudget": str(args.latency_budget)} if args.latency_budget else {}
+        url = f"{base.rstrip('/')}/api/evaluate"
+
+        results = []
+        print(f"{'clients':>8}{'requests':>10}{'req/s':>9}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}{'errors':>9}")
+        for concurrency in [int(level) for level in args.concurrency.split(",")]:
+            level = run_level(url, concurrency, args.duration, resumes, job_post, args.timeout, form)
+            results.append(level)
+            print(f"{concurrency:>8}{level['requests']:>10}{level['throughput']:>9.2f}{level['p50_s']:>9.2f}"
+                  f"{level['p95_s']:>9.2f}{level['p99_s']:>9.2f}{level['error_rate'] * 100:>8.1f}%", flush=True)
+            if level["errors"]:
+                print(f"{'':>8}errors: {level['errors']}")
+
+        try:
+            llm_stats = httpx.get(f"{base.rstrip('/')}/api/llm/stats", timeout=5).json()
+            print(f"LLM client stats (one worker): {llm_stats}")
+        except (httpx.HTTPError, ValueError):
+            llm_stats = None
+
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump({"workers": args.workers, "worker_class": args.worker_class, "gunicorn_args": args.gunicorn_args,
+                           "llm_latency": args.llm_latency, "levels": results, "llm_stats": llm_stats}, f, indent=2)
+            print(f"Wrote {args.output}")
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+if __name__ == "__main__":
+    main()
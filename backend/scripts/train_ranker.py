@@ -0,0 +1,133 @@
+"""Train the candidate ranking model from labeled hiring outcomes.
+
+Outcomes are JSON lines, one per candidate screened for a job:
+
+    {"job_post": "jobs/backend.txt", "resume": "resumes/jane.pdf", "label": 1}
+
+job_post and resume are paths (a .pdf resume is read with fitz, anything else
+as text) or the text itself; label is 1 for a positive outcome (interviewed,
+hired) and 0 otherwise. Features are computed with the same code the app
+ranks with, grouped by job post so each profile is built once, and can be
+cached with --features so retraining skips the NLP pipeline.
+
+A stratified holdout compares the model with the 0.6/0.4 heuristic on ROC
+AUC and average precision before the model is saved.
+
+    python scripts/train_ranker.py --data outcomes.jsonl [--features cache/ranker_features.npz]
+                                   [--output cache/ranking_model.joblib] [--holdout 0.2]
+"""
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from ranking import DEFAULT_MODEL_PATH, FEATURE_NAMES, FEATURE_VERSION, RankingModel, heuristic_scores  # noqa: E402
+
+# Fewer examples than this per class can't support a meaningful holdout
+MIN_PER_CLASS = 10
+
+
+def read_input(value: str, base_dir: str) -> str:
+    path = value if os.path.isabs(value) else os.path.join(base_dir, value)
+    if not os.path.isfile(path):
+        return value
+    if path.lower().endswith(".pdf"):
+        import fitz
+
+        with fitz.open(path) as doc:
+            return "\f".join(page.get_text() for page in doc)
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def load_outcomes(path: str):
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    for number, row in enumerate(rows, start=1):
+        if not {"job_post", "resume", "label"} <= row.keys():
+            sys.exit(f"{path}:{number}: each line needs job_post, resume and label")
+    return rows
+
+
+def compute_features(rows, base_dir: str) -> np.ndarray:
+    from ranking import resume_features
+
+    by_job = defaultdict(list)
+    for index, row in enumerate(rows):
+        by_job[row["job_post"]].append(index)
+
+    features = np.zeros((len(rows), len(FEATURE_NAMES)), dtype=np.float32)
+    for number, (job_post, indices) in enumerate(by_job.items(), start=1):
+        print(f"Job {number}/{len(by_job)}: {len(indices)} candidates")
+        texts = [read_input(rows[index]["resume"], base_dir) for index in indices]
+        features[indices] = resume_features(read_input(job_post, base_dir), texts)
+    return features
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", help="Labeled outcomes, one JSON object per line")
+    parser.add_argument("--features", help="Feature cache (.npz): read if it exists, else written after extraction")
+    parser.add_argument("--output", default=os.environ.get("RANKING_MODEL_PATH", DEFAULT_MODEL_PATH),
+                        help="Where to save the model (default: RANKING_MODEL_PATH or cache/ranking_model.joblib)")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Share of rows held out for evaluation")
+    parser.add_argument("--max-iter", type=int, default=200, help="Boosting iterations")
+    parser.add_argument("--learning-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.features and os.path.exists(args.features):
+        cached = np.load(args.features, allow_pickle=False)
+        if str(cached["feature_version"]) != FEATURE_VERSION or list(cached["feature_names"]) != FEATURE_NAMES:
+            sys.exit(f"{args.features} was built with other features; delete it to recompute")
+        features, labels = cached["features"], cached["labels"]
+        print(f"Loaded {len(labels)} feature rows from {args.features}")
+    elif args.data:
+        rows = load_outcomes(args.data)
+        features = compute_features(rows, os.path.dirname(os.path.abspath(args.data)))
+        labels = np.array([int(bool(row["label"])) for row in rows], dtype=np.int8)
+        if args.features:
+            np.savez(args.features, features=features, labels=labels,
+                     feature_names=np.array(FEATURE_NAMES), feature_version=np.array(FEATURE_VERSION))
+            print(f"Wrote {args.features}")
+    else:
+        sys.exit("Pass --data, or --features pointing at an existing feature cache")
+
+    positives = int(labels.sum())
+    if min(positives, len(labels) - positives) < MIN_PER_CLASS:
+        sys.exit(f"Need at least {MIN_PER_CLASS} positive and negative outcomes, "
+                 f"got {positives} and {len(labels) - positives}")
+
+    from sklearn.metrics import average_precision_score, roc_auc_score
+    from sklearn.model_selection import train_test_split
+
+    train_x, test_x, train_y, test_y = train_test_split(
+        features, labels, test_size=args.holdout, stratify=labels, random_state=args.seed
+    )
+    params = {"max_iter": args.max_iter, "learning_rate": args.learning_rate, "random_state": args.seed}
+    model = RankingModel.train(train_x, train_y, **params)
+
+    evaluation = {}
+    for name, scores in (("model", model.score(test_x)), ("heuristic", heuristic_scores(test_x))):
+        evaluation[name] = {
+            "roc_auc": float(roc_auc_score(test_y, scores)),
+            "average_precision": float(average_precision_score(test_y, scores))
+        }
+        print(f"{name:<10} ROC AUC {evaluation[name]['roc_auc']:.3f}  "
+              f"average precision {evaluation[name]['average_precision']:.3f}  ({len(test_y)} held out)")
+
+    # Ship a model trained on everything; the holdout only vouches for the settings
+    final = RankingModel.train(features, labels, **params)
+    final.metadata["holdout"] = evaluation
+    final.save(args.output)
+    print(f"Saved {args.output} ({len(labels)} rows, {positives} positive)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Dictionary-driven skill matching.
+
+The skill taxonomy (canonical names plus aliases) is loaded from JSON and
+compiled into a single Aho-Corasick automaton, so a resume is scanned once
+and the cost stays linear in its length however large the dictionary gets.
+Every alias is reported under its canonical name.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import deque
+from typing import Dict, List, Tuple
+
+DEFAULT_SKILL_DICTIONARY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "skills.json")
+
+SKILL_CATEGORIES = ("hard_skills", "soft_skills")
+
+# Spaces, hyphens and underscores are interchangeable inside skill names
+_SEPARATORS = re.compile(r"[\s\-_]+")
+
+
+def normalize_skill_text(text: str) -> str:
+    """Lowercase and collapse separators so `Problem-Solving` matches `problem solving`"""
+    return _SEPARATORS.sub(" ", text.lower())
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum()
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over a skill dictionary"""
+
+    def __init__(self, dictionary: Dict[str, Dict[str, List[str]]]):
+        # Fingerprint of the dictionary, for caches of anything derived from matches
+        self.version = hashlib.sha256(json.dumps(dictionary, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        # Trie transitions, failure links and outputs, indexed by state
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self.size = 0
+
+        for category in SKILL_CATEGORIES:
+            for canonical, aliases in dictionary.get(category, {}).items():
+                canonical = normalize_skill_text(canonical).strip()
+                for term in [canonical] + list(aliases or []):
+                    term = normalize_skill_text(term).strip()
+                    if term:
+                        self._add(term, category, canonical)
+        self._build_failure_links()
+
+    @classmethod
+    def from_file(cls, path: str) -> "SkillMatcher":
+        with open(path, "r", encoding="utf-8") as file:
+            return cls(json.load(file))
+
+    def _add(self, term: str, category: str, canonical: str) -> None:
+        state = 0
+        for ch in term:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(term), category, canonical))
+        self.size += 1
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                # Inherit matches that end here via a shorter suffix
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find(self, text: str) -> List[Tuple[int, int, str, str]]:
+        """
+        Return (start, end, category, canonical) for every skill mention in
+        normalized text, keeping the leftmost-longest match where they overlap.
+        """
+        text = normalize_skill_text(text)
+        goto, fail, output = self._goto, self._fail, self._output
+        length = len(text)
+        candidates = []
+
+        state = 0
+        for end, ch in enumerate(text, 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for term_length, category, canonical in output[state]:
+                start = end - term_length
+                # Whole-word matches only, like \b in the old regexes
+                if start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]):
+                    continue
+                if end < length and _is_word_char(text[end]) and _is_word_char(text[end - 1]):
+                    continue
+                candidates.append((start, end, category, canonical))
+
+        candidates.sort(key=lambda match: (match[0], match[0] - match[1]))
+        matches = []
+        last_end = 0
+        for match in candidates:
+            if match[0] >= last_end:
+                matches.append(match)
+                last_end = match[1]
+        return matches
+
+    def count(self, text: str) -> Dict[str, Dict[str, int]]:
+        """Count canonical skill mentions per category"""
+        counts = {category: {} for category in SKILL_CATEGORIES}
+        for _, _, category, canonical in self.find(text):
+            counts[category][canonical] = counts[category].get(canonical, 0) + 1
+        return counts
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def get_skill_matcher() -> SkillMatcher:
+    """Load and compile the dictionary at SKILL_DICTIONARY_PATH once per process"""
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                path = os.environ.get("SKILL_DICTIONARY_PATH", DEFAULT_SKILL_DICTIONARY)
+                _matcher = SkillMatcher.from_file(path)
+    return _matcher
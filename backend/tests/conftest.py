@@ -0,0 +1,13 @@
+"""Shared pytest setup: backend modules are imported flat, as the app does."""
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Never let a test touch the real caches or reach the LLM provider
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("RESULT_CACHE_ENABLED", "0")
+os.environ.setdefault("EMBEDDING_CACHE_ENABLED", "0")
+os.environ.setdefault("EVALUATION_QUEUE_WORKERS", "0")
+os.environ.setdefault("METRICS_ENABLED", "1")
@@ -0,0 +1,47 @@
+import pytest
+
+import aianalysis
+from resultcache import ResultCache
+
+HR = {"sections": {}, "match_scores": {}, "confidence_score": True}
+TECHNICAL = {"skills": ["python"]}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ResultCache(path=None)
+    monkeypatch.setattr(aianalysis, "result_cache", cache)
+    monkeypatch.setattr(aianalysis, "PROMPT_COMPACTION", False)
+    monkeypatch.setattr(aianalysis, "analyze_hr_with_ai", lambda job_post, resume_text: dict(HR))
+    monkeypatch.setattr(aianalysis, "analyze_technical_details", lambda job_post, resume_text: dict(TECHNICAL))
+    return cache
+
+
+def test_dual_result_is_cached_under_the_dual_key(cache, monkeypatch):
+    monkeypatch.setattr(aianalysis, "AI_ANALYSIS_MODE", "dual")
+    result = aianalysis.analyze_with_ai("job", "resume", concurrent=False)
+    assert cache.get(aianalysis.result_cache_key("job", "resume", mode="dual")) == result
+
+
+def test_structured_result_is_cached_under_the_structured_key(cache, monkeypatch):
+    monkeypatch.setattr(aianalysis, "AI_ANALYSIS_MODE", "structured")
+    monkeypatch.setattr(aianalysis, "analyze_structured", lambda job_post, resume_text: ({**HR, "via": "structured"}, TECHNICAL))
+    result = aianalysis.analyze_with_ai("job", "resume")
+    assert result["via"] == "structured"
+    assert cache.get(aianalysis.result_cache_key("job", "resume", mode="structured")) == result
+
+
+def test_structured_fallback_is_not_filed_as_structured(cache, monkeypatch):
+    monkeypatch.setattr(aianalysis, "AI_ANALYSIS_MODE", "structured")
+    monkeypatch.setattr(aianalysis, "analyze_structured", lambda job_post, resume_text: None)
+    result = aianalysis.analyze_with_ai("job", "resume", concurrent=False)
+
+    assert cache.get(aianalysis.result_cache_key("job", "resume", mode="structured")) is None
+    assert cache.get(aianalysis.result_cache_key("job", "resume", mode="dual")) == result
+
+
+def test_failed_technical_analysis_is_not_cached(cache, monkeypatch):
+    monkeypatch.setattr(aianalysis, "AI_ANALYSIS_MODE", "dual")
+    monkeypatch.setattr(aianalysis, "analyze_technical_details", lambda job_post, resume_text: {})
+    aianalysis.analyze_with_ai("job", "resume", concurrent=False)
+    assert cache.get(aianalysis.result_cache_key("job", "resume")) is None
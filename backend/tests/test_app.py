@@ -0,0 +1,168 @@
+import io
+import json
+import sys
+import threading
+import time
+import types
+
+import fitz
+import pytest
+
+import app as app_module
+
+
+def make_pdf(text):
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+@pytest.fixture
+def client():
+    app_module.app.config['TESTING'] = True
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def fake_analysis(monkeypatch):
+    calls = []
+
+    def analyze_with_ai(job_post, resume_text):
+        calls.append(resume_text)
+        return {'technical_analysis': {'score': 1}}
+
+    monkeypatch.setattr(app_module, 'analyze_with_ai', analyze_with_ai)
+    return calls
+
+
+def test_batch_names_the_unreadable_file(client, fake_analysis):
+    response = client.post('/api/evaluate/batch', data={
+        'jobPost': 'Python developer',
+        'resumes': [(io.BytesIO(make_pdf('Jane Doe, Python')), 'jane.pdf'),
+                    (io.BytesIO(b'not a pdf'), 'broken.pdf')]
+    }, content_type='multipart/form-data')
+
+    lines = sorted((json.loads(line) for line in response.data.decode().splitlines()), key=lambda line: line['index'])
+    assert lines[0]['result'] == {'technical_analysis': {'score': 1}}
+    assert 'broken.pdf' in lines[1]['error']
+    assert len(fake_analysis) == 1
+
+
+def test_rank_rejects_an_unreadable_file(client):
+    response = client.post('/api/rank', data={
+        'jobPost': 'Python developer',
+        'resumes': [(io.BytesIO(b'not a pdf'), 'broken.pdf')]
+    }, content_type='multipart/form-data')
+    assert response.status_code == 400
+    assert 'broken.pdf' in response.json['error']
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    """Stub both evaluators: the LLM waits for release() and returns whatever is set"""
+    import aianalysis
+    from resultcache import ResultCache
+
+    cache = ResultCache(None)
+    monkeypatch.setattr(app_module, 'result_cache', cache)
+    monkeypatch.setattr(aianalysis, 'PROMPT_COMPACTION', False)
+    state = types.SimpleNamespace(cache=cache, released=threading.Event(), done=threading.Event(),
+                                  result={'technical_analysis': {'score': 90}}, cache_result=True)
+
+    def analyze_with_ai(job_post, resume_text):
+        try:
+            state.released.wait(5)
+            if isinstance(state.result, Exception):
+                raise state.result
+            if state.cache_result:
+                cache.set(aianalysis.evaluation_cache_key(job_post, resume_text), state.result)
+            return state.result
+        finally:
+            state.done.set()
+
+    def release(result=None):
+        if result is not None:
+            state.result = result
+        state.released.set()
+        state.done.wait(5)
+        # The done callback runs right after the call returns
+        time.sleep(0.05)
+
+    state.release = release
+    monkeypatch.setattr(app_module, 'analyze_with_ai', analyze_with_ai)
+    monkeypatch.setitem(sys.modules, 'localscoring', types.SimpleNamespace(
+        local_evaluation=lambda job_post, text: {'technical_analysis': {'score': 50}, 'provisional': True}))
+    return state
+
+
+def evaluate(client, latency_budget):
+    return client.post('/api/evaluate', data={
+        'jobPost': 'Python developer',
+        'resume': (io.BytesIO(make_pdf('Jane Doe, Python')), 'jane.pdf'),
+        'latencyBudget': str(latency_budget)
+    }, content_type='multipart/form-data')
+
+
+def test_llm_result_in_time_wins(client, budget):
+    budget.released.set()
+    response = evaluate(client, 5)
+    assert response.json == {'technical_analysis': {'score': 90}}
+
+
+def test_llm_error_in_time_returns_local_result(client, budget):
+    budget.result = {'error': 'rate limited'}
+    budget.released.set()
+    response = evaluate(client, 5)
+    assert response.json['provisional'] is True
+    assert response.json['llm_error'] == 'rate limited'
+    assert 'result_url' not in response.json
+
+
+def test_budget_expiry_returns_local_result_then_upgrades(client, budget):
+    response = evaluate(client, 0.05)
+    assert response.json['provisional'] is True
+    result_url = response.json['result_url']
+    assert client.get(result_url).status_code == 202
+
+    budget.release()
+    response = client.get(result_url)
+    assert response.status_code == 200
+    assert response.json == {'technical_analysis': {'score': 90}}
+
+
+@pytest.mark.parametrize('result', [
+    {'error': 'rate limited'},
+    {'technical_analysis': {}},
+    RuntimeError('connection reset')
+])
+def test_late_failure_is_reported(client, budget, result):
+    budget.cache_result = False
+    result_url = evaluate(client, 0.05).json['result_url']
+    budget.release(result)
+    response = client.get(result_url)
+    assert response.status_code == 502
+    assert response.json['status'] == 'failed'
+
+
+def test_late_result_cached_under_another_key_is_served(client, budget):
+    # As after a structured-mode fallback, which files the result under the dual key
+    budget.cache_result = False
+    result_url = evaluate(client, 0.05).json['result_url']
+    budget.release()
+    response = client.get(result_url)
+    assert response.status_code == 200
+    assert response.json == {'technical_analysis': {'score': 90}}
+
+
+def test_stale_pending_result_is_reported_failed(client, budget, monkeypatch):
+    result_url = evaluate(client, 0.05).json['result_url']
+    monkeypatch.setitem(app_module.app.config, 'EVALUATE_UPGRADE_TIMEOUT', 0)
+    time.sleep(0.01)
+    assert client.get(result_url).status_code == 502
+    budget.release()
+
+
+def test_unknown_result_key_is_404(client, budget):
+    assert client.get('/api/evaluate/results/' + 'f' * 64).status_code == 404
@@ -0,0 +1,97 @@
+import re
+
+import pytest
+
+import compaction
+from compaction import compact_inputs, compact_text, count_tokens, get_tokenizer, truncate_to_budget
+
+# Code, identifiers and non-English text tokenize well above 4 characters per token
+MIXED_LINES = [
+    "Senior Software Engineer, Acme Corp (2019 - Present)",
+    "def rebalance_partitions(consumer_group_id, max_inflight_requests=5): return None",
+    "Desarrollé microservicios en Kubernetes con observabilidad distribuida",
+    "负责设计和实现高并发的分布式缓存系统",
+    "kafka.consumer.ConsumerRebalanceListener#onPartitionsRevoked",
+    "- Led migration of 40 services to gRPC with zero downtime"
+]
+
+
+@pytest.fixture
+def tokenizer_setting(monkeypatch):
+    """Reload the tokenizer for the given COMPACTION_TOKENIZER value"""
+    def use(value):
+        if value is None:
+            monkeypatch.delenv("COMPACTION_TOKENIZER", raising=False)
+        else:
+            monkeypatch.setenv("COMPACTION_TOKENIZER", value)
+        monkeypatch.setattr(compaction, "_tokenizer", None)
+        monkeypatch.setattr(compaction, "_tokenizer_name", None)
+    yield use
+    monkeypatch.setattr(compaction, "_tokenizer", None)
+    monkeypatch.setattr(compaction, "_tokenizer_name", None)
+
+
+def real_count(text):
+    return len(get_tokenizer().encode(text, add_special_tokens=False).ids)
+
+
+def test_vendored_tokenizer_is_the_default(tokenizer_setting):
+    tokenizer_setting(None)
+    assert get_tokenizer() is not None
+    assert compaction._tokenizer_name == "deepseek_v3_tokenizer.json.gz"
+    # The estimate would say 8 here
+    assert count_tokens("def foo_bar_baz(x): return x**2") == 11
+
+
+@pytest.mark.parametrize("budget", [7, 50, 300])
+def test_compacted_output_stays_within_budget(tokenizer_setting, budget):
+    tokenizer_setting(None)
+    text = "\n".join(MIXED_LINES * 40)
+    compacted, stats = compact_text(text, budget, set())
+    assert stats["truncated"]
+    assert real_count(compacted) <= budget
+    assert stats["tokens_after"] == real_count(compacted)
+    if budget > real_count(MIXED_LINES[0]):
+        # Cut at a line boundary once a whole line fits
+        whole_lines = {re.sub(r"^- ", "• ", line) for line in MIXED_LINES}
+        assert set(compacted.splitlines()) <= whole_lines
+
+
+def test_budget_holds_where_the_estimate_undercounts(tokenizer_setting):
+    tokenizer_setting(None)
+    text = "\n".join(MIXED_LINES[1:5] * 20)
+    budget = 100
+    assert -(-len(text) // compaction.CHARS_PER_TOKEN) > budget
+    compacted, _ = truncate_to_budget(text, budget)
+    assert real_count(compacted) <= budget
+    # What the estimate would have let through
+    estimated_cut = text[:budget * compaction.CHARS_PER_TOKEN]
+    assert real_count(estimated_cut) > budget
+
+
+def test_short_text_is_untouched(tokenizer_setting):
+    tokenizer_setting(None)
+    assert truncate_to_budget("Python developer", 10) == ("Python developer", False)
+
+
+def test_estimate_is_opt_in(tokenizer_setting):
+    tokenizer_setting("estimate")
+    assert get_tokenizer() is None
+    assert count_tokens("x" * 10) == 3
+
+
+def test_broken_setting_fails_loudly(tokenizer_setting, tmp_path):
+    tokenizer_setting(str(tmp_path / "missing.json"))
+    with pytest.raises(RuntimeError, match="missing.json"):
+        get_tokenizer()
+
+
+def test_compaction_drops_furniture_and_irrelevant_sections(tokenizer_setting):
+    tokenizer_setting(None)
+    pages = ["Jane Doe\nExperience\nPython developer at Acme\nPage 1 of 2",
+             "Jane Doe\nHobbies\nChess\nEducation\nBSc Computer Science\nPage 2 of 2"]
+    resume, job_post, report = compact_inputs("\f".join(pages), "Python developer\n\nBenefits\nFree lunch")
+    assert resume.splitlines() == ["Jane Doe", "Experience", "Python developer at Acme", "Education",
+                                   "BSc Computer Science"]
+    assert job_post == "Python developer"
+    assert report["tokens_saved"] > 0
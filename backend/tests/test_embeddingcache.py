@@ -0,0 +1,50 @@
+import numpy as np
+
+from embeddingcache import EmbeddingCache, make_embedding_key
+
+
+def vectors(count, dim=8, seed=0):
+    return np.random.default_rng(seed).normal(size=(count, dim)).astype(np.float32)
+
+
+def test_key_covers_model_and_pooling():
+    key = make_embedding_key("Python developer", "jobbert", "mean")
+    assert key != make_embedding_key("Python developer", "other-model", "mean")
+    assert key != make_embedding_key("Python developer", "jobbert", "mean:backend=int8")
+
+
+def test_reload_from_disk(tmp_path):
+    stored = vectors(3)
+    EmbeddingCache(str(tmp_path)).put_many(["a", "b", "c"], stored)
+
+    reloaded = EmbeddingCache(str(tmp_path))
+    found = reloaded.get_many(["a", "c", "missing"])
+    assert sorted(found) == ["a", "c"]
+    # Stored as float16 on disk
+    np.testing.assert_allclose(found["a"], stored[0], atol=1e-2)
+    np.testing.assert_allclose(found["c"], stored[2], atol=1e-2)
+    assert reloaded.stats() == {"hits": 2, "misses": 1, "memory_items": 2, "disk_items": 3}
+
+
+def test_sees_vectors_appended_by_another_instance(tmp_path):
+    reader = EmbeddingCache(str(tmp_path))
+    assert reader.get_many(["a"]) == {}
+    EmbeddingCache(str(tmp_path)).put_many(["a"], vectors(1))
+    assert list(reader.get_many(["a"])) == ["a"]
+
+
+def test_existing_keys_are_not_appended_twice(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put_many(["a"], vectors(1))
+    size = (tmp_path / "vectors.f16").stat().st_size
+    cache.put_many(["a"], vectors(1, seed=1))
+    assert (tmp_path / "vectors.f16").stat().st_size == size
+    assert len((tmp_path / "index.tsv").read_text().splitlines()) == 1
+
+
+def test_memory_tier_is_bounded(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), max_memory_items=2)
+    cache.put_many(["a", "b", "c"], vectors(3))
+    assert cache.stats()["memory_items"] == 2
+    # Evicted from memory, still served from disk
+    assert list(cache.get_many(["a"])) == ["a"]
@@ -0,0 +1,58 @@
+import pytest
+
+from main import extract_education
+
+
+def resume(degree):
+    return f"Jane Doe\nEXPERIENCE\nAcme Corp\n\nEDUCATION\nState University\n{degree}\n2015 - 2019\nGPA: 3.8\n"
+
+
+def field_before_fix(degree):
+    """The field as extract_education computed it before the whole-word split"""
+    upper = degree.upper()
+    if "OF" in upper or "IN" in upper:
+        return degree.split("OF" if "OF" in upper else "IN")[1].strip()
+    return None
+
+
+# Degree line, field before the fix (IndexError where it crashed), field now
+CASES = [
+    # All-caps lines were already split correctly and must not change
+    ("BACHELOR OF SCIENCE IN COMPUTER SCIENCE", "SCIENCE IN COMPUTER SCIENCE", "SCIENCE IN COMPUTER SCIENCE"),
+    ("MASTER OF BUSINESS ADMINISTRATION", "BUSINESS ADMINISTRATION", "BUSINESS ADMINISTRATION"),
+    ("BS Computer Science", None, None),
+    # Mixed case made the case-sensitive split find nothing
+    ("Bachelor of Science in Software Engineering", IndexError, "Science in Software Engineering"),
+    ("Master of Professional Studies", IndexError, "Professional Studies"),
+    ("BS in Information Technology", IndexError, "Information Technology"),
+    ("Bachelor of Arts", IndexError, "Arts"),
+    # "in" inside a word is not a separator
+    ("PhD, Mining Engineering", IndexError, None),
+    ("BS IN INFORMATION TECHNOLOGY", "", "INFORMATION TECHNOLOGY"),
+]
+
+
+@pytest.mark.parametrize("degree,before,after", CASES)
+def test_education_field_before_and_after(degree, before, after):
+    if before is IndexError:
+        with pytest.raises(IndexError):
+            field_before_fix(degree)
+    else:
+        assert field_before_fix(degree) == before
+
+    details = extract_education(resume(degree))["details"]
+    assert details == [{
+        "text": "State University",
+        "school": "State University",
+        "degree": degree,
+        "field": after,
+        "year": "2015 - 2019",
+        "gpa": "3.8"
+    }]
+
+
+def test_education_without_a_field_keeps_the_rest():
+    details = extract_education("EDUCATION\nState College\nMasters\n2020")["details"]
+    assert details[0]["degree"] == "Masters"
+    assert details[0]["field"] is None
+    assert details[0]["year"] == "2020"
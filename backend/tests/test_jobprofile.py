@@ -0,0 +1,46 @@
+import jobprofile
+
+
+def fake_requirements(job_post):
+    return {"skills": {"hard_skills": {"Python": 1}, "soft_skills": {}}, "source": job_post}
+
+
+def test_profiles_are_persisted_and_reused(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobprofile, "_profiles", jobprofile.OrderedDict())
+    calls = []
+    monkeypatch.setattr(jobprofile, "analyze_job_requirements", lambda job_post: calls.append(job_post) or fake_requirements(job_post))
+
+    profile = jobprofile.get_job_profile("Python developer", profile_dir=str(tmp_path))
+    assert profile.required_skills == {"python"}
+    assert jobprofile.get_job_profile("Python   developer", profile_dir=str(tmp_path)) is profile
+
+    jobprofile._profiles.clear()
+    reloaded = jobprofile.get_job_profile("Python developer", profile_dir=str(tmp_path))
+    assert reloaded.requirements == profile.requirements
+    assert calls == ["Python developer"]
+
+
+def test_memory_is_bounded_lru(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobprofile, "_profiles", jobprofile.OrderedDict())
+    monkeypatch.setattr(jobprofile, "MAX_MEMORY_PROFILES", 2)
+    monkeypatch.setattr(jobprofile, "analyze_job_requirements", fake_requirements)
+
+    first = jobprofile.get_job_profile("job one", profile_dir=str(tmp_path))
+    jobprofile.get_job_profile("job two", profile_dir=str(tmp_path))
+    # Touch the first so the second is the least recently used
+    jobprofile.get_job_profile("job one", profile_dir=str(tmp_path))
+    jobprofile.get_job_profile("job three", profile_dir=str(tmp_path))
+
+    assert len(jobprofile._profiles) == 2
+    assert jobprofile.job_post_hash("job two") not in jobprofile._profiles
+    assert jobprofile._profiles[jobprofile.job_post_hash("job one")] is first
+
+
+def test_key_depends_on_skill_dictionary(monkeypatch):
+    key = jobprofile.job_post_hash("Python developer")
+
+    class OtherDictionary:
+        version = "other"
+
+    monkeypatch.setattr(jobprofile, "get_skill_matcher", lambda: OtherDictionary())
+    assert jobprofile.job_post_hash("Python developer") != key
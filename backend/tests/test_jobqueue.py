@@ -0,0 +1,155 @@
+import sqlite3
+import time
+
+import pytest
+
+import jobqueue
+from jobqueue import DONE, FAILED, QUEUED, RUNNING, JobQueue, JobWorkers, PermanentJobError
+
+
+class Clock:
+    """Stand-in for time.time that tests move forward by hand"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(jobqueue.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return JobQueue(str(tmp_path / "jobs.sqlite3"), visibility_timeout=60, max_attempts=3, retry_backoff=10)
+
+
+def failures(kind):
+    return jobqueue.JOB_FAILURES._values.get((kind,), 0)
+
+
+def queue_errors(operation):
+    return jobqueue.JOB_QUEUE_ERRORS._values.get((operation,), 0)
+
+
+def test_claim_complete(queue):
+    job_id = queue.enqueue({"n": 1}, b"pdf")
+    job = queue.claim()
+    assert (job["id"], job["payload"], job["data"], job["attempt"]) == (job_id, {"n": 1}, b"pdf", 1)
+    assert queue.get(job_id)["status"] == RUNNING
+    # Leased jobs are not handed out twice
+    assert queue.claim() is None
+
+    assert queue.complete(job, {"score": 1})
+    assert queue.get(job_id) == {**queue.get(job_id), "status": DONE, "result": {"score": 1}}
+
+
+def test_claims_oldest_first(queue, clock):
+    first = queue.enqueue({"n": 1})
+    clock.now += 1
+    queue.enqueue({"n": 2})
+    assert queue.claim()["id"] == first
+
+
+def test_retry_backoff_doubles(queue, clock):
+    job_id = queue.enqueue({})
+    for attempt, delay in ((1, 10), (2, 20)):
+        job = queue.claim()
+        assert job["attempt"] == attempt
+        queue.fail(job, "LLM timed out")
+        assert queue.get(job_id)["status"] == QUEUED
+        assert queue.get(job_id)["error"] == "LLM timed out"
+        clock.now += delay - 1
+        assert queue.claim() is None
+        clock.now += 1
+
+    job = queue.claim()
+    queue.fail(job, "LLM timed out")
+    assert queue.get(job_id)["status"] == FAILED
+    assert queue.get(job_id)["attempts"] == 3
+
+
+def test_fail_without_retry_is_final(queue):
+    job_id = queue.enqueue({})
+    queue.fail(queue.claim(), "Unreadable PDF", retry=False)
+    assert queue.get(job_id)["status"] == FAILED
+    assert queue.claim() is None
+
+
+def test_expired_lease_is_reclaimed_and_old_worker_loses_it(queue, clock):
+    job_id = queue.enqueue({})
+    stale = queue.claim()
+    clock.now += 61
+    fresh = queue.claim()
+    assert fresh["id"] == job_id and fresh["attempt"] == 2
+
+    assert not queue.complete(stale, {"late": True})
+    assert queue.complete(fresh, {"ok": True})
+    assert queue.get(job_id)["result"] == {"ok": True}
+
+
+def test_expired_lease_on_last_attempt_fails_the_job(queue, clock):
+    job_id = queue.enqueue({})
+    for _ in range(3):
+        assert queue.claim() is not None
+        clock.now += 61
+    assert queue.claim() is None
+    assert queue.get(job_id)["status"] == FAILED
+
+
+def test_permanent_error_is_not_retried(queue):
+    job_id = queue.enqueue({})
+    before = failures("permanent")
+
+    def handler(payload, data):
+        raise PermanentJobError("No text could be extracted from cv.pdf")
+
+    JobWorkers(queue, handler)._process(queue.claim())
+    job = queue.get(job_id)
+    assert (job["status"], job["attempts"], job["error"]) == (FAILED, 1, "No text could be extracted from cv.pdf")
+    assert failures("permanent") == before + 1
+
+
+def test_transient_error_is_retried(queue):
+    job_id = queue.enqueue({})
+    before = failures("retryable")
+
+    def handler(payload, data):
+        raise RuntimeError("LLM unavailable")
+
+    JobWorkers(queue, handler)._process(queue.claim())
+    assert queue.get(job_id)["status"] == QUEUED
+    assert failures("retryable") == before + 1
+
+
+def test_database_error_while_recording_is_survived(queue, monkeypatch):
+    job_id = queue.enqueue({})
+    before = queue_errors("complete")
+
+    def locked(job, result):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(queue, "complete", locked)
+    JobWorkers(queue, lambda payload, data: {"ok": True})._process(queue.claim())
+    # Still leased; it reruns once the lease expires
+    assert queue.get(job_id)["status"] == RUNNING
+    assert queue_errors("complete") == before + 1
+
+
+def test_workers_drain_the_queue(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    job_ids = [queue.enqueue({"n": n}) for n in range(3)]
+    workers = JobWorkers(queue, lambda payload, data: {"double": payload["n"] * 2}, concurrency=2, poll_interval=0.05)
+    workers.start()
+    try:
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and any(queue.get(job_id)["status"] != DONE for job_id in job_ids):
+            time.sleep(0.02)
+    finally:
+        workers.stop(timeout=2)
+    assert [queue.get(job_id)["result"] for job_id in job_ids] == [{"double": 0}, {"double": 2}, {"double": 4}]
@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs under gevent in its own process: a blocked disk call must leave the hub
+# free, or the greenlet that releases the lock never runs
+SCRIPT = textwrap.dedent("""
+    from gevent import monkey
+    monkey.patch_all()
+
+    import fcntl
+    import sqlite3
+    import sys
+    import time
+
+    import gevent
+    import numpy as np
+
+    from embeddingcache import EmbeddingCache
+    from jobqueue import JobQueue
+    from offload import run_offloaded
+    from resultcache import ResultCache
+
+    directory = sys.argv[1]
+    queue = JobQueue(directory + "/jobs.sqlite3")
+    queue.enqueue({"filename": "a.pdf"})
+    cache = ResultCache(directory + "/results.sqlite3")
+    embeddings = EmbeddingCache(directory + "/embeddings")
+
+    def hold_sqlite(path):
+        conn = sqlite3.connect(path, isolation_level=None)
+        conn.execute("BEGIN IMMEDIATE")
+        return lambda: conn.execute("COMMIT")
+
+    def hold_flock():
+        lock_file = open(embeddings.lock_path, "a")
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return lambda: fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    cases = [
+        ("claim", lambda: hold_sqlite(queue.path), queue.claim),
+        ("cache set", lambda: hold_sqlite(cache.path), lambda: cache.set("key", {"a": 1})),
+        ("embedding append", hold_flock, lambda: embeddings.put_many(["key"], np.ones((1, 4)))),
+    ]
+    for name, hold, call in cases:
+        release = hold()
+        ticks = []
+        ticker = gevent.spawn(lambda: [ticks.append(gevent.sleep(0.01)) for _ in range(20)])
+        started = time.monotonic()
+        waiting = gevent.spawn(call)
+        gevent.sleep(0.2)
+        release()
+        waiting.get(timeout=5)
+        ticker.join()
+        assert len(ticks) == 20 and time.monotonic() - started < 2, name
+
+    # Offloaded work that offloads again runs inline instead of deadlocking
+    assert run_offloaded(run_offloaded, lambda: 42) == 42
+    print("ok")
+""")
+
+
+def test_blocking_disk_calls_leave_the_gevent_hub_free(tmp_path):
+    result = subprocess.run([sys.executable, "-c", SCRIPT, str(tmp_path)], cwd=BACKEND_DIR,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "ok"
@@ -0,0 +1,44 @@
+import time
+
+from resultcache import ResultCache, make_cache_key
+
+
+def test_key_ignores_whitespace_but_not_content():
+    key = make_cache_key("Python  developer\n", "Backend job", "1", "model")
+    assert key == make_cache_key("Python developer", " Backend   job ", "1", "model")
+    assert key != make_cache_key("Java developer", "Backend job", "1", "model")
+    assert key != make_cache_key("Python developer", "Backend job", "2", "model")
+
+
+def test_get_returns_a_copy():
+    cache = ResultCache(path=None)
+    cache.set("k", {"scores": [1, 2]})
+    first = cache.get("k")
+    first["scores"].append(3)
+    assert cache.get("k") == {"scores": [1, 2]}
+
+
+def test_disk_tier_is_shared_across_instances(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    ResultCache(path=path).set("k", {"ok": True})
+    other = ResultCache(path=path)
+    assert other.get("k") == {"ok": True}
+    assert other.stats()["disk_hits"] == 1
+
+
+def test_memory_tier_is_bounded():
+    cache = ResultCache(path=None, max_memory_items=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, {"key": key})
+    assert cache.get("a") is None
+    assert cache.get("c") == {"key": "c"}
+    assert cache.stats()["memory_evictions"] == 1
+
+
+def test_expired_entries_are_misses(tmp_path, monkeypatch):
+    cache = ResultCache(path=str(tmp_path / "results.sqlite3"), ttl=60)
+    cache.set("k", {"ok": True})
+    later = time.time() + 120
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert cache.get("k") is None
+    assert cache.stats()["expired"] >= 1
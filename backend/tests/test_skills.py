@@ -0,0 +1,65 @@
+import pytest
+
+from skills import DEFAULT_SKILL_DICTIONARY, SkillMatcher, normalize_skill_text
+
+DICTIONARY = {
+    "hard_skills": {
+        "machine learning": ["ml"],
+        "machine": [],
+        "javascript": ["js", "ecmascript"],
+        "java": [],
+        "c++": ["cpp"],
+        "node.js": ["nodejs", "node"]
+    },
+    "soft_skills": {
+        "problem solving": ["problem-solving"]
+    }
+}
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return SkillMatcher(DICTIONARY)
+
+
+def canonicals(matcher, text):
+    return [canonical for _, _, _, canonical in matcher.find(text)]
+
+
+def test_leftmost_longest_match_wins(matcher):
+    assert canonicals(matcher, "Built machine learning pipelines") == ["machine learning"]
+    assert canonicals(matcher, "machine operator") == ["machine"]
+
+
+def test_aliases_report_the_canonical_name(matcher):
+    assert canonicals(matcher, "ML, JS and cpp") == ["machine learning", "javascript", "c++"]
+    assert canonicals(matcher, "NodeJS and node") == ["node.js", "node.js"]
+
+
+def test_whole_words_only(matcher):
+    # "java" inside "javascript", "js" inside "jsonify"
+    assert canonicals(matcher, "javascript") == ["javascript"]
+    assert canonicals(matcher, "jsonify") == []
+    assert canonicals(matcher, "Java.") == ["java"]
+
+
+def test_separators_are_interchangeable(matcher):
+    assert normalize_skill_text("Problem-Solving") == "problem solving"
+    assert matcher.count("Problem_Solving, problem solving")["soft_skills"] == {"problem solving": 2}
+
+
+def test_find_returns_spans_in_normalized_text(matcher):
+    text = "Senior C++ developer"
+    start, end, category, canonical = matcher.find(text)[0]
+    assert normalize_skill_text(text)[start:end] == "c++"
+    assert (category, canonical) == ("hard_skills", "c++")
+
+
+def test_version_tracks_the_dictionary(matcher):
+    assert matcher.version == SkillMatcher(dict(DICTIONARY)).version
+    assert matcher.version != SkillMatcher({"hard_skills": {"rust": []}}).version
+
+
+def test_shipped_dictionary_loads():
+    matcher = SkillMatcher.from_file(DEFAULT_SKILL_DICTIONARY)
+    assert matcher.count("Python3 and ECMAScript")["hard_skills"] == {"python": 1, "javascript": 1}
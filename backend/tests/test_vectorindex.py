@@ -0,0 +1,79 @@
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from conftest import BACKEND_DIR
+from vectorindex import CandidateIndex
+
+DIM = 16
+QUERY = np.eye(DIM)[0]
+
+WRITER = """
+import sys
+import numpy as np
+from vectorindex import CandidateIndex
+path, dtype, ids = sys.argv[1], sys.argv[2], sys.argv[3].split(",")
+vectors = np.random.default_rng(0).normal(size=(len(ids), {dim}))
+vectors[0] = np.eye({dim})[0]
+CandidateIndex(path, dtype=dtype).append(ids, vectors)
+"""
+
+
+def append_elsewhere(path, dtype, ids):
+    """Append from another process, the way a second gunicorn worker would"""
+    subprocess.run([sys.executable, "-c", WRITER.format(dim=DIM), str(path), dtype, ",".join(ids)],
+                   cwd=BACKEND_DIR, check=True)
+
+
+@pytest.mark.parametrize("dtype", ["int8", "float16"])
+def test_reader_opened_before_first_append(tmp_path, dtype):
+    path = tmp_path / "candidates"
+    # Default dtype on purpose: the reader must adopt whatever the writer chose
+    reader = CandidateIndex(str(path))
+    assert len(reader) == 0
+    assert reader.top_k(QUERY) == []
+
+    append_elsewhere(path, dtype, ["a", "b", "c"])
+    assert len(reader) == 3
+    assert (reader.dim, reader.dtype) == (DIM, dtype)
+    best_id, best_score = reader.top_k(QUERY, k=1)[0]
+    assert best_id == "a" and best_score > 0.99
+
+
+@pytest.mark.parametrize("dtype", ["int8", "float16"])
+def test_readding_an_id_supersedes_its_row(tmp_path, dtype):
+    index = CandidateIndex(str(tmp_path / "candidates"), dtype=dtype)
+    index.append(["a", "b"], np.stack([QUERY, np.eye(DIM)[1]]))
+    index.append(["a"], np.eye(DIM)[2:3])
+    assert len(index) == 2
+    # The old row for "a" matched QUERY exactly; only the new one may count
+    assert all(score < 0.5 for _, score in index.top_k(QUERY))
+    assert index.top_k(np.eye(DIM)[2], k=1)[0][0] == "a"
+
+
+def test_late_instance_writes_in_the_index_dtype(tmp_path):
+    path = tmp_path / "candidates"
+    late = CandidateIndex(str(path))
+    append_elsewhere(path, "float16", ["a"])
+    late.append(["b"], np.ones((1, DIM)))
+    assert late.dtype == "float16"
+    assert len(late) == 2
+    assert len(CandidateIndex(str(path))) == 2
+
+
+def test_top_k_orders_by_cosine(tmp_path):
+    index = CandidateIndex(str(tmp_path / "candidates"), dtype="float16")
+    vectors = np.stack([np.eye(DIM)[1], QUERY + 0.5 * np.eye(DIM)[1], QUERY])
+    index.append(["far", "near", "exact"], vectors)
+    results = index.top_k(QUERY, k=2)
+    assert [candidate_id for candidate_id, _ in results] == ["exact", "near"]
+    assert results[0][1] == pytest.approx(1.0, abs=1e-3)
+
+
+def test_dimension_mismatch_is_rejected(tmp_path):
+    path = str(tmp_path / "candidates")
+    CandidateIndex(path).append(["a"], QUERY[None])
+    with pytest.raises(ValueError):
+        CandidateIndex(path, dim=DIM * 2)
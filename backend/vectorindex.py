@@ -0,0 +1,210 @@
+"""Memory-mapped candidate embedding index.
+
+Resume embeddings are stored L2-normalized as a flat int8 (default) or
+float16 matrix in `<path>.vectors`, with one candidate ID per line in
+`<path>.ids` and the dimension/dtype in `<path>.meta.json`. Readers memory-map the matrix, so
+every gunicorn worker shares the same page-cache copy, and a top-k query is
+one vectorized matrix-vector product over it. Appends take an exclusive file
+lock and only ever add to the end of both files.
+
+The index is CLI-only for now. `python main.py` appends each analyzed resume
+when CANDIDATE_INDEX_PATH is set, and `python vectorindex.py jobpost.txt [k]`
+lists the stored candidates closest to a job post. No web endpoint or queue
+handler reads or writes it.
+"""
+import fcntl
+import json
+import os
+import sys
+import threading
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "candidates")
+
+SUPPORTED_DTYPES = ("float16", "int8")
+INT8_SCALE = 127.0
+
+# Rows scored per block; small blocks keep the float32 scratch copy in cache
+BLOCK_ROWS = 1024
+
+
+class CandidateIndex:
+    """Append-only, memory-mapped matrix of normalized resume embeddings"""
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH, dim: Optional[int] = None, dtype: str = "int8"):
+        self.path = path
+        self.vectors_path = f"{path}.vectors"
+        self.ids_path = f"{path}.ids"
+        self.meta_path = f"{path}.meta.json"
+        self.lock_path = f"{path}.lock"
+
+        self.dim = dim
+        self.dtype = dtype
+        self._load_meta()
+        if self.dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported index dtype: {self.dtype}")
+
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._matrix_bytes = -1
+        self._ids = []
+        self._ids_offset = 0
+        self._latest = {}
+        self._stale = np.zeros(0, dtype=bool)
+
+    def _load_meta(self) -> bool:
+        """Adopt the dim and dtype of an existing index; False if none was written yet"""
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as file:
+                meta = json.load(file)
+        except FileNotFoundError:
+            return False
+        if self.dim is not None and self.dim != meta["dim"]:
+            raise ValueError(f"Index {self.path} holds {meta['dim']}-d vectors, not {self.dim}-d")
+        self.dim = meta["dim"]
+        self.dtype = meta["dtype"]
+        return True
+
+    @property
+    def _row_bytes(self) -> int:
+        return self.dim * np.dtype(self.dtype).itemsize
+
+    def _quantize(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        if self.dtype == "int8":
+            return np.clip(np.rint(vectors * INT8_SCALE), -127, 127).astype(np.int8)
+        return vectors.astype(np.float16)
+
+    def append(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        """Add one row per ID; re-adding an ID supersedes its earlier row"""
+        ids = [str(candidate_id) for candidate_id in ids]
+        if any("\n" in candidate_id for candidate_id in ids):
+            raise ValueError("Candidate IDs cannot contain newlines")
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # Another process may have created the index since this one was opened
+                if not self._load_meta():
+                    if self.dim is None:
+                        self.dim = int(np.asarray(vectors).reshape(len(ids), -1).shape[1])
+                    with open(self.meta_path, "w", encoding="utf-8") as file:
+                        json.dump({"dim": self.dim, "dtype": self.dtype}, file)
+                rows = self._quantize(vectors)
+                if len(rows) != len(ids):
+                    raise ValueError(f"Got {len(ids)} IDs for {len(rows)} vectors")
+                # Vectors first: readers size the index by the ID file, so a
+                # row only becomes visible once its ID line has been written
+                with open(self.vectors_path, "ab") as file:
+                    file.write(rows.tobytes())
+                with open(self.ids_path, "a", encoding="utf-8") as file:
+                    file.write("".join(f"{candidate_id}\n" for candidate_id in ids))
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self) -> None:
+        """Pick up rows appended by any process since the last query (lock held)"""
+        if not os.path.exists(self.ids_path):
+            return
+        # Opened before the first append anywhere: the writer has since set dim and dtype
+        if self._matrix_bytes <= 0 and not self._load_meta():
+            return
+
+        with open(self.ids_path, "rb") as file:
+            file.seek(self._ids_offset)
+            chunk = file.read()
+        # Ignore a trailing partial line from an append still in progress
+        complete = chunk[:chunk.rfind(b"\n") + 1]
+        if complete:
+            self._ids_offset += len(complete)
+            new_ids = complete.decode("utf-8").splitlines()
+            start = len(self._ids)
+            self._ids.extend(new_ids)
+            self._stale = np.concatenate([self._stale, np.zeros(len(new_ids), dtype=bool)])
+            for row, candidate_id in enumerate(new_ids, start):
+                previous = self._latest.get(candidate_id)
+                if previous is not None:
+                    self._stale[previous] = True
+                self._latest[candidate_id] = row
+
+        size = os.path.getsize(self.vectors_path)
+        if size != self._matrix_bytes:
+            rows = size // self._row_bytes
+            self._matrix = np.memmap(self.vectors_path, dtype=self.dtype, mode="r", shape=(rows, self.dim)) if rows else None
+            self._matrix_bytes = size
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._latest)
+
+    def top_k(self, query_vector: np.ndarray, k: int = 50) -> List[Tuple[str, float]]:
+        """Return the k (id, cosine similarity) pairs closest to the query, best first"""
+        with self._lock:
+            self._refresh()
+            if self._matrix is None or not self._ids:
+                return []
+            count = min(len(self._ids), len(self._matrix))
+            matrix = self._matrix[:count]
+            ids = self._ids
+            stale = self._stale[:count]
+
+        query = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        if self.dtype == "int8":
+            query = query / INT8_SCALE
+
+        scores = np.empty(count, dtype=np.float32)
+        for start in range(0, count, BLOCK_ROWS):
+            block = matrix[start:start + BLOCK_ROWS]
+            scores[start:start + len(block)] = block.astype(np.float32) @ query
+        scores[stale] = -np.inf
+
+        k = min(k, count - int(stale.sum()))
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [(ids[row], float(scores[row])) for row in best]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_candidate_index() -> CandidateIndex:
+    """Process-wide index at CANDIDATE_INDEX_PATH, stored as CANDIDATE_INDEX_DTYPE"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = CandidateIndex(
+                    os.environ.get("CANDIDATE_INDEX_PATH", DEFAULT_INDEX_PATH),
+                    dtype=os.environ.get("CANDIDATE_INDEX_DTYPE", "int8")
+                )
+    return _index
+
+
+def top_candidates_for_job(job_post: str, model, tokenizer, k: int = 50,
+                           index: CandidateIndex = None) -> List[Tuple[str, float]]:
+    """Rank stored candidates against a job post's (cached) profile embedding"""
+    from jobprofile import get_job_profile
+
+    profile = get_job_profile(job_post, model, tokenizer)
+    return (index or get_candidate_index()).top_k(profile.embedding, k)
+
+
+if __name__ == "__main__":
+    from main import read_job_post
+    from models import get_jobbert
+
+    if len(sys.argv) < 2:
+        sys.exit("Usage: python vectorindex.py <job post file> [k]")
+    tokenizer, model = get_jobbert()
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    for rank, (candidate_id, score) in enumerate(top_candidates_for_job(read_job_post(sys.argv[1]), model, tokenizer, k), 1):
+        print(f"{rank:>3}. {score:.4f}  {candidate_id}")